@@ -1,44 +1,136 @@
-from flask import Flask, request, redirect, url_for, flash, render_template, jsonify, make_response, send_file
+from flask import Flask, request, redirect, url_for, flash, render_template, jsonify, make_response, send_file, session, Response, stream_with_context, abort
+import io
 import os
+import hmac
+import sqlite3
+import json
+import mimetypes
+import time
+from functools import wraps
 from werkzeug.utils import secure_filename
-from utils.parser import get_text_from_file
-from utils.resume_db import init_db, save_analysis, get_dashboard_stats, get_history, delete_history_item, get_analysis_by_id
-from utils.analyzer import (
-    calculate_similarity, 
-    identify_missing_skills, 
-    get_recommendations,
-    calculate_score_breakdown,
-    analyze_power_words,
-    check_resume_health,
-    analyze_resume_stats,
-    analyze_section_coverage,
-    calculate_keyword_coverage,
-    calculate_ats_readiness,
-    build_action_checklist,
-    get_top_keywords
-)
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from werkzeug.exceptions import TooManyRequests, ServiceUnavailable
+from utils.parser import get_analysis_text, truncate_text
+from utils.resume_db import init_db, save_analysis, get_dashboard_stats, get_history, delete_history_item, get_analysis_by_id, analysis_exists, get_analysis_by_content_hash, get_score_trends, get_top_skill_gaps, SKILL_KINDS, iter_history_export, import_history_records, read_import_lines, HistoryImportError, search_history, select_analysis_ids, create_analysis_job, claim_analysis_job
+from utils import maintenance, dedup, bulk_export, native_threads, admission, live_analytics, memprofile, skills_kb, candidate_index
+from utils.live_analytics import BUILDER_SECTIONS
+from utils.pipeline import analyze_texts, iter_stages, split_stages, Budget, budget_stats
+from utils.report import generate_pdf_report, render_report
+from utils import report_cache, page_cache, assets, shadow, upload_store
 from datetime import datetime
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev_secret_key_change_me")
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
 # Initialize DB on start
 init_db()
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Uploads used to be saved under static/uploads; no history row refers to those files
+LEGACY_UPLOADS = os.path.join(app.static_folder, 'uploads')
+if os.path.isdir(LEGACY_UPLOADS) and os.listdir(LEGACY_UPLOADS):
+    print(f"Warning: {LEGACY_UPLOADS} still holds old uploads. They are no longer served; delete the folder.")
+
+# Fingerprint and precompress static files; unchanged files are reused from the last boot
+ASSET_MANIFEST = assets.build(app.static_folder) if assets.ENABLED else {}
+_FINGERPRINTED = set(ASSET_MANIFEST.values())
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """url_for('static', filename='css/style.css') -> /static/css/style.<hash>.css"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = ASSET_MANIFEST.get(values['filename'], values['filename'])
+
+def serve_static(filename):
+    """Flask's static view, plus immutable, precompressed responses for fingerprinted names."""
+    if filename.split('/', 1)[0] == 'uploads':
+        abort(404)
+    if filename not in _FINGERPRINTED:
+        return app.send_static_file(filename)
+    path, encoding = assets.precompressed(
+        os.path.join(app.static_folder, assets.DIST_DIR, filename), request.headers.get('Accept-Encoding'),
+    )
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], conditional=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = assets.IMMUTABLE
+    return response
+
+app.view_functions['static'] = serve_static
 
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
+@app.after_request
+def compress_response(response):
+    return assets.compress_response(response, request.headers.get('Accept-Encoding'))
+
+@app.before_request
+def schedule_maintenance():
+    maintenance.schedule()
+
+@app.before_request
+def start_memory_accounting():
+    memprofile.begin()
+
+@app.after_request
+def report_memory(response):
+    # Streamed responses do their work after this hook; they report at the end of the stream
+    if memprofile.ENABLED and not response.is_streamed:
+        summary = memprofile.end(request.endpoint)
+        if summary:
+            response.headers['X-Memory-Peak-KB'] = str(summary['peak_kb'])
+            response.headers['X-RSS-KB'] = str(summary['rss_kb'])
+            app.logger.info(
+                "%s %s peak %.1f KB, rss %s KB, stages %s", request.method, request.path,
+                summary['peak_kb'], summary['rss_kb'],
+                {name: values['peak_kb'] for name, values in summary['stages'].items()},
+            )
+    return response
+
+def cached_page(view):
+    """Serve a GET page from the shared page cache until the history changes."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Pages carrying one-off flash messages are never cached or served from cache
+        if not page_cache.ENABLED or request.method != 'GET' or session.get('_flashes'):
+            return view(*args, **kwargs)
+        key = request.full_path
+        # Read the version before the DB so a concurrent write can only retire this page, never hide
+        try:
+            version, body = page_cache.lookup(key)
+        except sqlite3.Error as e:
+            # The cache is an optimization: a locked or broken cache file means rendering live
+            app.logger.warning("Page cache lookup failed for %s: %s", key, e)
+            return view(*args, **kwargs)
+        if body is not None:
+            response = make_response(body)
+            response.headers['X-Page-Cache'] = 'hit'
+            return response
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and response.mimetype == 'text/html' and not session.get('_flashes'):
+            try:
+                page_cache.store(key, version, response.get_data())
+            except sqlite3.Error as e:
+                app.logger.warning("Page cache store failed for %s: %s", key, e)
+        response.headers['X-Page-Cache'] = 'miss'
+        return response
+    return wrapper
+
+def admin_api(view):
+    """Operator-only JSON API: needs `Authorization: Bearer $ADMIN_TOKEN`, or without a token, a direct local client."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if ADMIN_TOKEN:
+            allowed = hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {ADMIN_TOKEN}")
+        else:
+            # A request relayed by a proxy on this host looks local too; the forwarding header gives it away
+            allowed = request.remote_addr in ('127.0.0.1', '::1') and 'X-Forwarded-For' not in request.headers
+        if not allowed:
+            return jsonify({'error': 'Forbidden'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -47,26 +139,169 @@ def index():
     return redirect(url_for('dashboard'))
 
 @app.route('/dashboard')
+@cached_page
 def dashboard():
     stats = get_dashboard_stats()
     return render_template('dashboard.html', stats=stats)
 
+@app.route('/api/trends')
+def api_trends():
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    return jsonify(get_score_trends(days))
+
+@app.route('/api/skill-gaps')
+def api_skill_gaps():
+    days = min(max(request.args.get('days', 30, type=int), 0), 365)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+    kind = request.args.get('kind', 'missing')
+    if kind not in SKILL_KINDS:
+        return jsonify({'error': f"kind must be one of {', '.join(SKILL_KINDS)}"}), 400
+    return jsonify({'days': days, 'kind': kind, 'skills': get_top_skill_gaps(days, limit, kind)})
+
+@app.route('/api/history/export')
+def export_history():
+    """Stream the whole history as NDJSON, one analysis per line."""
+    def generate():
+        started = time.perf_counter()
+        count = 0
+        for record in iter_history_export():
+            count += 1
+            yield json.dumps(record) + '\n'
+        elapsed = time.perf_counter() - started
+        app.logger.info("Exported %d rows in %.2fs (%d rows/s)", count, elapsed, count / elapsed if elapsed else count)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': f"attachment; filename=resume_history_{datetime.now().strftime('%Y%m%d')}.ndjson"},
+    )
+
+@app.route('/api/history/import', methods=['POST'])
+def import_history():
+    """Bulk-import an NDJSON export, sent as the `file` field or the raw body.
+
+    Rows are committed in batches, so on a bad line the error says how many
+    rows before it were already imported.
+    """
+    stream = request.files['file'].stream if 'file' in request.files else request.stream
+    try:
+        stats = import_history_records(read_import_lines(stream))
+    except HistoryImportError as e:
+        return jsonify({'error': f"Invalid NDJSON: {e}", 'rows_imported': e.rows}), 400
+    app.logger.info("Imported %d rows (%d rows/s)", stats['rows'], stats['rows_per_sec'])
+    return jsonify(stats)
+
+@app.route('/history/export-reports', methods=['GET', 'POST'])
+def export_reports():
+    """Stream a ZIP of PDF reports for the selected ids, or for every analysis matching the filters."""
+    source = request.form if request.method == 'POST' else request.args
+    ids = [int(i) for value in source.getlist('ids') for i in value.split(',') if i.strip().isdigit()]
+    ids = select_analysis_ids(
+        ids=ids or None,
+        query=source.get('q', '').strip(),
+        days=source.get('days', 0, type=int),
+        min_score=source.get('min_score', type=float),
+        max_score=source.get('max_score', type=float),
+        limit=bulk_export.MAX_EXPORT_REPORTS,
+    )
+    if not ids:
+        flash('No analyses match that selection.')
+        return redirect(url_for('history'))
+
+    job_id = source.get('job', '')
+    if not bulk_export.JOB_ID_RE.match(job_id):
+        job_id = None
+    return Response(
+        bulk_export.stream_reports_zip(ids, job_id),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f"attachment; filename=resume_reports_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+            'X-Report-Count': str(len(ids)),
+        },
+    )
+
+@app.route('/api/report-export/<job_id>')
+def report_export_progress(job_id):
+    job = bulk_export.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown export job'}), 404
+    return jsonify(job)
+
+@app.route('/api/diagnostics')
+@admin_api
+def diagnostics():
+    """Per-worker runtime facts: thread budget and BLAS/OpenMP pools, admission, time budget, memory peaks, knowledge base, candidate index, shadow sampling."""
+    return jsonify(dict(
+        native_threads.diagnostics(),
+        admission=admission.stats(),
+        time_budget=budget_stats(),
+        memory=memprofile.stats(),
+        skills_kb=skills_kb.current().summary(),
+        candidate_index=candidate_index.stats(),
+        shadow=shadow.stats(),
+    ))
+
+@app.route('/api/shadow')
+@admin_api
+def shadow_report():
+    """Shadow engine comparison summary; filter with `engine` and `days` (default SHADOW_SUMMARY_DAYS, 0 for all)."""
+    engine = request.args.get('engine') or None
+    days = max(request.args.get('days', shadow.SUMMARY_DAYS, type=int), 0)
+    return jsonify({'engine': engine, 'days': days, 'sampling': shadow.stats(), 'report': shadow.summary(engine, days)})
+
 @app.route('/analyze_page')
 def analyze_page():
     return render_template('index.html')
 
 @app.route('/history')
+@cached_page
 def history():
-    history_data = get_history()
-    return render_template('history.html', history=history_data)
+    query = request.args.get('q', '').strip()
+    history_data = search_history(query, limit=50) if query else get_history()
+    return render_template('history.html', history=history_data, query=query)
+
+@app.route('/api/search')
+def api_search():
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    return jsonify({'query': query, 'results': search_history(query, limit)})
+
+@app.route('/api/candidates', methods=['POST'])
+def match_candidates():
+    """Top-k stored resumes for a job description, sent as JSON or form fields `job_description` and `k`."""
+    payload = request.get_json(silent=True)
+    source = payload if isinstance(payload, dict) else request.form
+    job_description = source.get('job_description')
+    if not isinstance(job_description, str) or not job_description.strip():
+        return jsonify({'error': 'job_description is required'}), 400
+    try:
+        k = min(max(int(source.get('k', 10)), 1), candidate_index.MAX_K)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be an integer'}), 400
+    started = time.perf_counter()
+    job_description, _ = truncate_text(job_description)
+    candidates = candidate_index.top_k(job_description, k)
+    return jsonify({
+        'k': k,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        'candidates': candidates,
+    })
 
 @app.route('/settings')
 def settings():
-    return render_template('settings.html')
+    return render_template('settings.html', db_health=maintenance.get_db_health())
+
+@app.route('/settings/maintenance', methods=['POST'])
+@admin_api
+def run_maintenance():
+    result = maintenance.run_maintenance()
+    flash(f"Maintenance complete: archived {result['archived']} analyses, "
+          f"reclaimed {result['freed_pages']} free pages in {result['seconds']}s.")
+    return redirect(url_for('settings'))
 
 @app.route('/create_resume')
 def create_resume():
-    return render_template('create_resume.html')
+    return render_template('create_resume.html', builder_sections=BUILDER_SECTIONS)
 
 @app.route('/generate_resume', methods=['POST'])
 def generate_resume():
@@ -87,37 +322,39 @@ def generate_resume():
         'template': request.form.get('template', 'modern')
     }
 
-    # Add analytics for preview
-    text = " ".join([
-        resume_data.get('summary', ''),
-        resume_data.get('experience', ''),
-        resume_data.get('education', ''),
-        resume_data.get('projects', ''),
-        resume_data.get('skills', ''),
-        resume_data.get('certifications', '')
-    ])
-    from utils.analyzer import analyze_resume_stats, analyze_power_words, get_top_keywords
-    stats = analyze_resume_stats(text)
-    power_word_count, power_words = analyze_power_words(text)
-    keywords = get_top_keywords(text, limit=10)
-
-    resume_data['word_count'] = stats.get('word_count')
-    resume_data['char_count'] = stats.get('char_count')
-    resume_data['avg_words_per_sentence'] = stats.get('avg_words_per_sentence')
-    resume_data['bullet_count'] = stats.get('bullet_count')
-    resume_data['power_word_count'] = power_word_count
-    resume_data['power_words'] = power_words
-    resume_data['keywords'] = keywords
+    # Same per-section partials as the live panel on the builder, so the preview agrees with it
+    _, analytics = live_analytics.update({section: resume_data[section] for section in BUILDER_SECTIONS}, {})
+    resume_data.update(analytics)
 
     return render_template('resume_preview.html', resume=resume_data)
 
+@app.route('/api/resume-builder/analytics', methods=['POST'])
+def resume_builder_analytics():
+    """Live builder analytics: recompute the edited sections and merge with the client's stored partials."""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    sections = payload.get('sections') or {}
+    partials = payload.get('partials') or {}
+    if not isinstance(sections, dict) or not isinstance(partials, dict) or not all(
+        isinstance(text, str) for text in sections.values()
+    ):
+        return jsonify({'error': 'Expected {"sections": {name: text}, "partials": {name: partial}}'}), 400
+    try:
+        fresh, analytics = live_analytics.update(sections, partials)
+    except ValueError as e:
+        return jsonify({'error': f"Invalid partial: {e}"}), 400
+    return jsonify({'partials': fresh, 'analytics': analytics})
+
 @app.route('/delete/<int:item_id>')
 def delete_item(item_id):
     delete_history_item(item_id)
+    report_cache.invalidate([item_id])
     flash('Analysis record deleted.')
     return redirect(url_for('history'))
 
 @app.route('/view/<int:item_id>')
+@cached_page
 def view_analysis(item_id):
     results = get_analysis_by_id(item_id)
     if results:
@@ -125,320 +362,255 @@ def view_analysis(item_id):
     flash('Analysis not found.')
     return redirect(url_for('history'))
 
-@app.route('/analyze', methods=['POST'])
-def analyze():
+def validate_upload():
+    """Validate the analyze form without storing anything; returns (file, filename, jd_text) or None after flashing."""
     if 'resume' not in request.files:
         flash('No file part')
-        return redirect(url_for('analyze_page'))
+        return None
     
     file = request.files['resume']
     jd_text = request.form.get('job_description')
 
     if file.filename == '':
         flash('No selected file')
-        return redirect(url_for('analyze_page'))
+        return None
     
     if not jd_text or len(jd_text.strip()) < 20:
         flash('Please provide a valid job description.')
-        return redirect(url_for('analyze_page'))
+        return None
 
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        
-        # Extract text
-        resume_text = get_text_from_file(file_path)
-        
-        if not resume_text:
-            flash('Could not extract text from the resume.')
-            return redirect(url_for('analyze_page'))
-            
-        # Analyze
-        score = calculate_similarity(resume_text, jd_text)
-        missing_skills = identify_missing_skills(resume_text, jd_text)
-        recommendations = get_recommendations(missing_skills)
-        
-        # New Analysis Features
-        score_breakdown = calculate_score_breakdown(missing_skills, score)
-        power_word_count, power_words = analyze_power_words(resume_text)
-        health_score, health_issues = check_resume_health(resume_text)
-        resume_stats = analyze_resume_stats(resume_text)
-        section_coverage = analyze_section_coverage(resume_text)
-        keyword_coverage = calculate_keyword_coverage(resume_text, jd_text)
-        ats_score = calculate_ats_readiness(health_score, missing_skills, resume_stats)
-        action_checklist = build_action_checklist(health_issues, missing_skills, resume_stats, section_coverage)
-        jd_top_keywords = get_top_keywords(jd_text, limit=12)
-        
-        results = {
-            'score': score, 
-            'missing_skills': missing_skills,
-            'recommendations': recommendations,
-            'score_breakdown': score_breakdown,
-            'power_word_count': power_word_count,
-            'power_words': power_words,
-            'health_score': health_score,
-            'health_issues': health_issues,
-            'resume_stats': resume_stats,
-            'section_coverage': section_coverage,
-            'keyword_coverage': keyword_coverage,
-            'ats_score': ats_score,
-            'action_checklist': action_checklist,
-            'jd_top_keywords': jd_top_keywords,
-            'filename': filename
-        }
-
-        # Save to DB and capture ID so we can link to PDF route
-        analysis_id = save_analysis(filename, score, ats_score, health_score, missing_skills, results)
-        results['analysis_id'] = analysis_id
-        
-        return render_template('result.html', **results)
-    else:
+    if not allowed_file(file.filename):
         flash('Allowed file types are PDF and DOCX')
+        return None
+
+    return file, secure_filename(file.filename), jd_text
+
+def store_upload(file, filename, jd_text):
+    """Store an admitted upload; returns (filename, path, jd_text, sha256)."""
+    # Stored by content outside static/, so identical uploads share a file and names cannot collide
+    sha256, file_path = upload_store.put(file.stream, os.path.splitext(filename)[1])
+    return filename, file_path, jd_text, sha256
+
+def client_address():
+    if admission.CLIENT_HEADER and request.headers.get(admission.CLIENT_HEADER):
+        # The proxy closest to us appends the address it saw last
+        return request.headers[admission.CLIENT_HEADER].split(',')[-1].strip()
+    return request.remote_addr
+
+def shed(busy):
+    """Turn an admission rejection into 429 (client over its allowance) or 503 (server saturated)."""
+    error = TooManyRequests if isinstance(busy, admission.RateLimited) else ServiceUnavailable
+    return error(description=f"{busy} Please try again in {busy.retry_after} seconds.", retry_after=busy.retry_after)
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    upload = validate_upload()
+    if upload is None:
         return redirect(url_for('analyze_page'))
+    try:
+        # Shed requests before the upload touches the disk or the upload store's write lock
+        admission.charge(client_address())
+        with admission.analysis_slot():
+            return analyze_upload(*store_upload(*upload))
+    except admission.Busy as busy:
+        raise shed(busy) from None
 
-def generate_pdf_report(results):
-    """Generate a professional PDF report using ReportLab."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, 
-        pagesize=letter,
-        rightMargin=0.75*inch, 
-        leftMargin=0.75*inch,
-        topMargin=0.75*inch, 
-        bottomMargin=0.75*inch
-    )
-    
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=colors.HexColor('#2ECC71'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold',
-        leading=32
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#34495E'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold',
-        borderWidth=1,
-        borderColor=colors.HexColor('#2ECC71'),
-        borderPadding=8,
-        backColor=colors.HexColor('#F0F8F5')
-    )
-    
-    subheading_style = ParagraphStyle(
-        'SubHeading',
-        parent=styles['Heading3'],
-        fontSize=12,
-        textColor=colors.HexColor('#16A085'),
-        spaceAfter=8,
-        spaceBefore=8,
-        fontName='Helvetica-Bold'
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6,
-        alignment=TA_LEFT,
-        leading=14
-    )
-    
-    # Header
-    story.append(Paragraph("📄 Resume Analysis Report", title_style))
-    story.append(Spacer(1, 0.1*inch))
-    
-    # Date and filename
-    date_text = f"<b>Report Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
-    story.append(Paragraph(date_text, body_style))
-    if results.get('filename'):
-        story.append(Paragraph(f"<b>Resume File:</b> {results.get('filename')}", body_style))
-    story.append(Spacer(1, 0.3*inch))
-    
-    # === SCORE SUMMARY ===
-    story.append(Paragraph("📊 Score Summary", heading_style))
-    story.append(Spacer(1, 0.1*inch))
-    
-    scores_data = [
-        ['Metric', 'Score', 'Status'],
-        [
-            'Match Score', 
-            f"{results.get('score', 0):.1f}%",
-            '✓ Good' if results.get('score', 0) >= 70 else '⚠ Needs Work'
-        ],
-        [
-            'ATS Readiness', 
-            f"{results.get('ats_score', 0):.1f}%",
-            '✓ Good' if results.get('ats_score', 0) >= 70 else '⚠ Needs Work'
-        ],
-        [
-            'Resume Health', 
-            f"{results.get('health_score', 0):.1f}%",
-            '✓ Good' if results.get('health_score', 0) >= 70 else '⚠ Needs Work'
-        ],
-    ]
-    
-    scores_table = Table(scores_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-    scores_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ECC71')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')]),
-    ]))
-    story.append(scores_table)
-    story.append(Spacer(1, 0.3*inch))
-    
-    # === MISSING SKILLS ===
-    if results.get('missing_skills') and len(results.get('missing_skills')) > 0:
-        story.append(Paragraph("🎯 Missing Skills (Add These!)", heading_style))
-        story.append(Spacer(1, 0.1*inch))
-        
-        missing_skills = results.get('missing_skills', [])
-        for idx, skill in enumerate(missing_skills[:15], 1):
-            story.append(Paragraph(f"{idx}. <b>{skill.upper()}</b>", body_style))
-        
-        if len(missing_skills) > 15:
-            story.append(Paragraph(f"<i>...and {len(missing_skills) - 15} more</i>", body_style))
-        
-        story.append(Spacer(1, 0.2*inch))
-    
-    # === RESUME STATISTICS ===
-    if results.get('resume_stats'):
-        story.append(Paragraph("📈 Resume Statistics", heading_style))
-        story.append(Spacer(1, 0.1*inch))
-        
-        stats = results.get('resume_stats', {})
-        stats_data = [
-            ['Metric', 'Value'],
-            ['Word Count', str(stats.get('word_count', 0))],
-            ['Character Count', str(stats.get('char_count', 0))],
-            ['Bullet Points', str(stats.get('bullet_count', 0))],
-            ['Avg Words/Sentence', str(stats.get('avg_words_per_sentence', 0))],
-        ]
-        
-        stats_table = Table(stats_data, colWidths=[3*inch, 2.5*inch])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')]),
-        ]))
-        story.append(stats_table)
-        story.append(Spacer(1, 0.2*inch))
-    
-    # === HEALTH ISSUES ===
-    if results.get('health_issues') and len(results.get('health_issues')) > 0:
-        story.append(Paragraph("⚠️ Health Issues to Fix", heading_style))
-        story.append(Spacer(1, 0.1*inch))
-        
-        health_issues = results.get('health_issues', [])
-        for idx, issue in enumerate(health_issues[:10], 1):
-            story.append(Paragraph(f"{idx}. {issue}", body_style))
-        story.append(Spacer(1, 0.2*inch))
-    
-    # === TOP KEYWORDS ===
-    if results.get('jd_top_keywords'):
-        story.append(Paragraph("🔑 Top Keywords from Job Description", heading_style))
-        story.append(Spacer(1, 0.1*inch))
-        
-        keywords = results.get('jd_top_keywords', [])
-        keywords_text = " • ".join([f"<b>{kw}</b>" for kw in keywords[:20]])
-        story.append(Paragraph(keywords_text, body_style))
-        story.append(Spacer(1, 0.2*inch))
+def extract_for_analysis(file_path, jd_text):
+    """Parse the upload and cap both texts at MAX_ANALYSIS_CHARS; returns (resume_text, jd_text, truncated)."""
+    with memprofile.stage('parse'):
+        resume_text, resume_truncated = get_analysis_text(file_path)
+    jd_text, jd_truncated = truncate_text(jd_text)
+    return resume_text, jd_text, resume_truncated or jd_truncated
+
+def reusable_analysis(fingerprint):
+    """A stored analysis of the same resume and JD, unless it was degraded to fit its time budget."""
+    cached = get_analysis_by_content_hash(fingerprint['content_hash'])
+    return None if cached is None or cached.get('degraded') else cached
+
+def analyze_upload(filename, file_path, jd_text, upload_sha256):
+    budget = Budget()  # Parsing counts against the time budget too
+    # Extract text
+    resume_text, jd_text, truncated = extract_for_analysis(file_path, jd_text)
     
-    # === ACTION CHECKLIST ===
-    if results.get('action_checklist'):
-        story.append(Paragraph("✅ Action Checklist", heading_style))
-        story.append(Spacer(1, 0.1*inch))
+    if not resume_text:
+        flash('Could not extract text from the resume.')
+        return redirect(url_for('analyze_page'))
         
-        action_checklist = results.get('action_checklist', [])
-        if isinstance(action_checklist, list):
-            for idx, item in enumerate(action_checklist[:12], 1):
-                story.append(Paragraph(f"☐ {item}", body_style))
-        elif isinstance(action_checklist, dict):
-            for category, items in action_checklist.items():
-                if items:
-                    story.append(Paragraph(f"<b>{category.replace('_', ' ').title()}:</b>", subheading_style))
-                    for item in items[:5]:
-                        story.append(Paragraph(f"  ☐ {item}", body_style))
+    # Identical resume + JD: reuse the stored results instead of re-running the analyzers
+    fingerprint = dedup.fingerprint(resume_text, jd_text)
+    near_duplicate = dedup.find_near_duplicate(fingerprint)
+    cached = reusable_analysis(fingerprint)
+    if cached:
+        results = {k: v for k, v in cached.items() if k != 'analysis_id'}
+        results['filename'] = filename
+    else:
+        results = analyze_texts(resume_text, jd_text, filename, budget)
+    results['near_duplicate'] = near_duplicate
+    results['input_truncated'] = truncated
+
+    # Save to DB and capture ID so we can link to PDF route
+    with memprofile.stage('save'):
+        analysis_id = save_analysis(
+            filename, results['score'], results['ats_score'], results['health_score'], results['missing_skills'],
+            results, resume_text=resume_text, fingerprint=fingerprint, upload_sha256=upload_sha256,
+        )
+    results['analysis_id'] = analysis_id
+    report_cache.prerender(analysis_id, results)
+    if not cached:
+        shadow.maybe_compare(resume_text, jd_text, analysis_id)
     
-    # Footer
-    story.append(Spacer(1, 0.4*inch))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#7F8C8D'),
-        alignment=TA_CENTER
+    return render_template('result.html', **results)
+
+def sse_event(event, data, retry_ms=None):
+    # `retry:` sets how long EventSource waits before it reconnects on its own
+    retry = f"retry: {retry_ms}\n" if retry_ms else ""
+    return f"{retry}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Store the upload and return the progressive results page straight away."""
+    upload = validate_upload()
+    if upload is None:
+        return redirect(url_for('analyze_page'))
+    try:
+        admission.charge(client_address())
+    except admission.Busy as busy:
+        raise shed(busy) from None
+    filename, file_path, jd_text, sha256 = store_upload(*upload)
+    job_id = create_analysis_job(filename, file_path, jd_text, sha256)
+    return render_template('analyze_stream.html', job_id=job_id, filename=filename)
+
+@app.route('/analyze/stream/<job_id>/events')
+def analyze_events(job_id):
+    """Server-Sent Events: one event per pipeline stage as it finishes, then `done` with the saved id."""
+    def generate():
+        # The job is only claimed once admitted, so a `busy` client can reconnect and try again
+        try:
+            with admission.analysis_slot():
+                yield from run_job(claim_analysis_job(job_id))
+        except admission.Busy as busy:
+            yield sse_event('busy', {'error': str(busy), 'retry_after': busy.retry_after}, retry_ms=busy.retry_after * 1000)
+
+    def run_job(job):
+        if job is None:
+            yield sse_event('failed', {'error': 'This analysis has already run or expired. Please upload the resume again.'})
+            return
+        memprofile.begin()
+        started = time.perf_counter()
+        budget = Budget(started=started)
+        yield sse_event('started', {'filename': job['filename']})
+
+        resume_text, jd_text, truncated = extract_for_analysis(job['file_path'], job['jd_text'])
+        if not resume_text:
+            yield sse_event('failed', {'error': 'Could not extract text from the resume.'})
+            return
+        parse_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        fingerprint = dedup.fingerprint(resume_text, jd_text)
+        near_duplicate = dedup.find_near_duplicate(fingerprint)
+        cached = reusable_analysis(fingerprint)
+        stages = split_stages(cached) if cached else iter_stages(resume_text, jd_text, budget)
+
+        results = {}
+        for stage, output, elapsed_ms in stages:
+            results.update(output)
+            payload = dict(output, elapsed_ms=elapsed_ms)
+            if stage == 'extraction':
+                payload.update(parse_ms=parse_ms, characters=len(resume_text), truncated=truncated)
+            if memprofile.sample(stage):
+                payload['memory'] = memprofile.sample(stage)
+            if stage in budget.degraded:
+                payload['degraded'] = budget.degraded[stage]
+            yield sse_event(stage, payload)
+
+        results['filename'] = job['filename']
+        results['degraded'] = budget.degraded
+        results['near_duplicate'] = near_duplicate
+        results['input_truncated'] = truncated
+        with memprofile.stage('save'):
+            analysis_id = save_analysis(
+                job['filename'], results['score'], results['ats_score'], results['health_score'], results['missing_skills'],
+                results, resume_text=resume_text, fingerprint=fingerprint, upload_sha256=job['upload_sha256'],
+            )
+        report_cache.prerender(analysis_id, results)
+        if not cached:
+            shadow.maybe_compare(resume_text, jd_text, analysis_id)
+        yield sse_event('done', {
+            'analysis_id': analysis_id,
+            'near_duplicate': near_duplicate,
+            'reused': cached is not None,
+            'degraded': budget.degraded,
+            'total_ms': round((time.perf_counter() - started) * 1000, 1),
+            'result_url': url_for('view_analysis', item_id=analysis_id),
+            'report_url': url_for('download_report', analysis_id=analysis_id),
+            'memory': memprofile.end(request.endpoint),
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        # Proxies such as nginx must pass each event through as soon as it is written
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
     )
-    story.append(Paragraph("—" * 50, footer_style))
-    story.append(Paragraph("Generated by ResumeFlexx - Your AI Resume Assistant", footer_style))
-    
-    # Build PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.getvalue()
 
 @app.route("/download-report/<int:analysis_id>")
 def download_report(analysis_id: int):
-    """Generate and download a PDF report."""
-    with open('endpoint_calls.log', 'a') as f:
-        f.write(f"[CALL] download_report({analysis_id})\n")
-    
+    """Serve the PDF report, rendering it into the report cache on first use."""
     try:
-        results = get_analysis_by_id(analysis_id)
-        with open('endpoint_calls.log', 'a') as f:
-            f.write(f"[RESULTS] Found: {results is not None}\n")
-        
-        if not results:
+        # The cached file alone is not proof: the analysis may have been deleted or the database restored
+        if not analysis_exists(analysis_id):
             flash("Analysis not found.")
             return redirect(url_for("history"))
+        report = report_cache.open_report(analysis_id)
+        if report is None:
+            results = get_analysis_by_id(analysis_id)
+            if not results:
+                flash("Analysis not found.")
+                return redirect(url_for("history"))
 
-        pdf_bytes = generate_pdf_report(results)
-        with open('endpoint_calls.log', 'a') as f:
-            f.write(f"[PDF] Generated {len(pdf_bytes)} bytes\n")
-        
+            pdf_bytes = render_report(results)
+            report_cache.put(analysis_id, pdf_bytes)
+            # Another worker's eviction may already have removed it; the bytes are still here
+            report = report_cache.open_report(analysis_id) or (io.BytesIO(pdf_bytes), time.time())
+
+        file, mtime = report
         return send_file(
-            BytesIO(pdf_bytes),
+            file,
             mimetype="application/pdf",
             as_attachment=True,
-            download_name=f"Resume_Analysis_Report_{analysis_id}.pdf"
+            download_name=f"Resume_Analysis_Report_{analysis_id}.pdf",
+            conditional=True,
+            etag=f"{analysis_id}-{report_cache.cache_tag()}-{int(mtime)}",
+            last_modified=mtime,
+            max_age=0,
         )
     except Exception as e:
-        import traceback
-        error_msg = f"Error generating PDF: {str(e)}\nTraceback:\n{traceback.format_exc()}"
-        with open('pdf_error.log', 'a') as f:
-            f.write(f"\n{datetime.now()}\n{error_msg}\n---\n")
+        app.logger.exception("Error generating PDF for analysis %s", analysis_id)
         flash(f"Error generating PDF: {str(e)}")
         return redirect(url_for("history"))
 
+WARM_UP_TEXT = (
+    "Experience: Software engineer building Python, SQL and Docker services on AWS. "
+    "Education: BSc Computer Science. Skills: Python, Flask, Kubernetes, leadership."
+)
+
+def warm_up():
+    """Run one throwaway analysis and report so lazy imports, regexes and styles load now.
+
+    Under `gunicorn --preload` this happens once in the master, and workers
+    inherit the loaded modules copy-on-write instead of each paying for them
+    on their first request.
+    """
+    results = analyze_texts(WARM_UP_TEXT, WARM_UP_TEXT, 'warm-up.pdf')
+    render_report(results)
+    app.jinja_env.get_template('result.html')
+    app.jinja_env.get_template('analyze_stream.html')
+
+def create_app():
+    """Application factory used by gunicorn.conf.py (`app:create_app()`)."""
+    warm_up()
+    return app
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
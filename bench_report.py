@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Compare PDF report engines: render latency and output size.
+
+    python bench_report.py                # every available engine, 50 renders each
+    python bench_report.py -n 200 --skills 40
+
+The first render of each engine is timed separately: it includes building
+styles, parsing the stylesheet and loading fonts, which later renders reuse.
+"""
+import argparse
+import statistics
+import time
+
+from utils import report_html
+from utils.report import REPORT_ENGINES, render_report
+
+def sample_results(skills):
+    return {
+        'filename': 'senior_backend_engineer.pdf',
+        'score': 68.4, 'ats_score': 74.0, 'health_score': 81.5,
+        'missing_skills': [f"skill-{i}" for i in range(skills)],
+        'resume_stats': {'word_count': 612, 'char_count': 3980, 'bullet_count': 18, 'avg_words_per_sentence': 15.2},
+        'health_issues': ['Add a professional summary', 'Quantify achievements in recent roles', 'Remove photo'],
+        'jd_top_keywords': ['python', 'kubernetes', 'aws', 'terraform', 'postgresql', 'kafka', 'docker', 'grpc'],
+        'action_checklist': {
+            'critical_fixes': ['Add missing keywords: kubernetes, terraform'],
+            'skill_building': [f"Learn skill-{i}" for i in range(5)],
+            'formatting': ['Use consistent bullet points', 'Keep it to two pages'],
+        },
+    }
+
+def bench(engine, results, runs):
+    started = time.perf_counter()
+    pdf = render_report(results, engine=engine)
+    cold_ms = (time.perf_counter() - started) * 1000
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        render_report(results, engine=engine)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        'cold_ms': cold_ms,
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'bytes': len(pdf),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--runs', type=int, default=50, help="Warm renders per engine")
+    parser.add_argument('--skills', type=int, default=20, help="Missing skills in the sample report")
+    parser.add_argument('--engine', choices=REPORT_ENGINES, action='append', help="Limit to these engines")
+    args = parser.parse_args(argv)
+
+    results = sample_results(args.skills)
+    print(f"{'engine':<12}{'cold ms':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'bytes':>10}")
+    for engine in args.engine or REPORT_ENGINES:
+        if engine == 'weasyprint' and not report_html.AVAILABLE:
+            print(f"{engine:<12}  skipped: WeasyPrint (or Pango) is not installed")
+            continue
+        r = bench(engine, results, args.runs)
+        print(f"{engine:<12}{r['cold_ms']:>10.1f}{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['bytes']:>10}")
+
+if __name__ == '__main__':
+    main()
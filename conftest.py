@@ -0,0 +1,19 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def no_background_work(monkeypatch, tmp_path):
+    """Tests point resume_db.DB_PATH and the report cache at temp paths, so keep
+    background work (scheduled maintenance, report pre-rendering) from running
+    after a test has finished and swapped those paths for the next one. Each
+    test also gets fresh admission buckets and slots, so analyses made by
+    earlier tests never count against its rate limit."""
+    from utils import maintenance, report_cache, admission
+    for thread in threading.enumerate():
+        if thread.name == 'history-maintenance':
+            thread.join()
+    monkeypatch.setattr(maintenance, '_next_check', float('inf'))
+    monkeypatch.setattr(report_cache, 'PRERENDER', False)
+    monkeypatch.setattr(admission, 'ADMISSION_DIR', str(tmp_path / 'admission'))
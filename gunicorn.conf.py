@@ -0,0 +1,54 @@
+"""Gunicorn settings for ResumeFlexx: `gunicorn -c gunicorn.conf.py`.
+
+The app is imported and warmed up once in the master (`preload_app`), so the
+spaCy model, scikit-learn, ReportLab and compiled templates are loaded before
+forking and shared copy-on-write by every worker. `gc.freeze()` moves those
+objects out of the collector's reach so its reference-count writes do not
+copy the shared pages into each worker. Per-process pools and threads are
+reset in the children via os.register_at_fork; the database layer opens a
+connection per call, so no handle crosses the fork. Each worker also caps
+its BLAS/OpenMP threads (utils/native_threads.py) so workers do not
+oversubscribe the cores.
+"""
+import gc
+import multiprocessing
+import os
+
+from utils import native_threads
+
+wsgi_app = 'app:create_app()'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+workers = int(os.environ.get('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count() + 1)))
+# The app derives each worker's native thread budget from this, so publish the resolved count
+os.environ['WEB_CONCURRENCY'] = str(workers)
+# Must happen before the preloaded app imports numpy/scipy/sklearn
+native_threads.export_env_defaults()
+# Threads let a worker keep serving while it streams SSE analyses and ZIP exports
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+# Admission control keeps one of these threads free for cheap pages (utils/admission.py)
+os.environ['GUNICORN_THREADS'] = str(threads)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers to cap heap fragmentation; replacements fork from the warm master
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+# Heartbeat files on tmpfs, not a possibly slow container overlay filesystem
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+
+def when_ready(server):
+    server.log.info("Master ready (pid %s); app preloaded, forking %s workers", os.getpid(), workers)
+
+def pre_fork(server, worker):
+    # Everything allocated so far is long-lived; keep the GC from touching (and un-sharing) it
+    gc.freeze()
+
+def post_fork(server, worker):
+    budget = native_threads.apply_worker_budget()
+    server.log.info("Worker %s booted with %s objects frozen, %s native threads", worker.pid, gc.get_freeze_count(), budget)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+"""Load-test the whole app under gunicorn with a mix of routes at a target rate.
+
+    python loadtest.py                                   # 20 req/s for 30s, default mix
+    python loadtest.py --rps 50 --duration 60 --workers 4
+    python loadtest.py --mix analyze=1,dashboard=5,report=2 --json run.json
+    python loadtest.py --url http://127.0.0.1:8080       # an already running server
+
+Everything runs offline: resumes (PDF and DOCX) and job descriptions are
+generated locally, and the server gets a scratch database seeded with
+analyses, so /view and /download-report have ids to hit. Requests are sent
+open-loop at the target rate. Latency is measured from when a request was
+due, not from when a client thread was free, so a server that falls behind
+shows it in the tail instead of quietly lowering the offered load. 429/503
+answers from admission control are counted as shed, not as errors. The
+per-client rate limit is off by default, because all traffic comes from one
+address. Other server settings (PAGE_CACHE, ANALYSIS_CONCURRENCY, ...) are
+taken from the environment as usual.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import docx
+import requests
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+ROUTES = ('analyze', 'dashboard', 'history', 'view', 'report')
+DEFAULT_MIX = 'analyze=1,dashboard=4,history=2,view=3,report=2'
+
+SKILLS = ['python', 'java', 'javascript', 'react', 'django', 'flask', 'sql', 'postgresql', 'docker', 'kubernetes',
+          'aws', 'azure', 'terraform', 'kafka', 'spark', 'machine learning', 'tensorflow', 'git', 'linux', 'graphql']
+VERBS = ['Architected', 'Engineered', 'Optimized', 'Automated', 'Led', 'Built', 'Designed', 'Scaled', 'Deployed']
+TITLES = ['Backend Engineer', 'Data Scientist', 'Full Stack Developer', 'DevOps Engineer', 'ML Engineer']
+
+def make_resume(rng):
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    lines = [
+        f"{rng.choice(['Alex', 'Sam', 'Priya', 'Chen', 'Maria'])} {rng.choice(['Smith', 'Kumar', 'Li', 'Garcia'])}",
+        f"{rng.choice(TITLES)} | candidate{rng.randint(1, 9999)}@example.com | +1 555 010 {rng.randint(1000, 9999)}",
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience building reliable systems.",
+        "Experience",
+    ]
+    for _ in range(rng.randint(4, 10)):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(skills)} services, improving throughput by {rng.randint(10, 80)}%.")
+    lines += ["Education", "BSc Computer Science, State University", "Skills", ", ".join(skills), "Projects",
+              f"- {rng.choice(VERBS)} an internal {rng.choice(skills)} platform used by {rng.randint(3, 40)} teams."]
+    return lines
+
+def make_jd(rng):
+    skills = rng.sample(SKILLS, rng.randint(4, 8))
+    return (f"We are hiring a {rng.choice(TITLES)} to join our platform team. "
+            f"You should be comfortable with {', '.join(skills)}. "
+            f"Experience with {rng.choice(SKILLS)} and mentoring engineers is a plus.")
+
+def pdf_bytes(lines):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    y = 800
+    for line in lines:
+        pdf.drawString(50, y, line)
+        y -= 16
+    pdf.save()
+    return buffer.getvalue()
+
+def docx_bytes(lines):
+    buffer = io.BytesIO()
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(buffer)
+    return buffer.getvalue()
+
+def build_corpus(size, seed):
+    """(filename, file bytes, job description, resume lines) tuples, alternating PDF and DOCX."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        lines = make_resume(rng)
+        if i % 2:
+            corpus.append((f"resume_{i}.docx", docx_bytes(lines), make_jd(rng), lines))
+        else:
+            corpus.append((f"resume_{i}.pdf", pdf_bytes(lines), make_jd(rng), lines))
+    return corpus
+
+def seed_database(db_path, corpus, count):
+    """Store `count` analyses of the corpus so /view and /download-report have ids; returns them."""
+    os.environ['RESUME_DB_PATH'] = db_path
+    from utils import resume_db
+    from utils.pipeline import analyze_texts
+    resume_db.DB_PATH = db_path
+    resume_db.init_db()
+    records = []
+    for i in range(count):
+        filename, _, jd_text, lines = corpus[i % len(corpus)]
+        text = "\n".join(lines)
+        results = analyze_texts(text, jd_text, filename)
+        records.append({
+            'filename': filename, 'score': results['score'], 'ats_score': results['ats_score'],
+            'health_score': results['health_score'], 'missing_skills': results['missing_skills'],
+            'results': results, 'resume_text': text,
+        })
+    resume_db.import_history_records(records)
+    return list(range(1, count + 1))
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(workdir, workers, log):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        RESUME_DB_PATH=os.path.join(workdir, 'history.db'),
+        UPLOAD_FOLDER=os.path.join(workdir, 'uploads'),
+        REPORT_CACHE_DIR=os.path.join(workdir, 'reports'),
+        ADMISSION_DIR=os.path.join(workdir, 'admission'),
+        HISTORY_ARCHIVE_PATH=os.path.join(workdir, 'archive.ndjson.gz'),
+    )
+    env.setdefault('ANALYSIS_RATE_PER_MINUTE', '0')
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    os.makedirs(env['UPLOAD_FOLDER'], exist_ok=True)
+    # Run from the scratch directory so the app's relative log files land there too
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [repo, env.get('PYTHONPATH')]))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(repo, 'gunicorn.conf.py'), '--access-logfile', os.devnull],
+        cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {server.returncode}; see {log.name}")
+        try:
+            requests.get(url + '/dashboard', timeout=2)
+            return server, url
+        except requests.ConnectionError:
+            time.sleep(0.25)
+    server.terminate()
+    raise SystemExit(f"gunicorn did not start within 120s; see {log.name}")
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        route, _, weight = part.partition('=')
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"unknown route {route!r}; choose from {', '.join(ROUTES)}")
+        mix[route] = float(weight or 1)
+    return mix
+
+class Client:
+    """Sends one request per call; each thread keeps its own keep-alive session."""
+    def __init__(self, url, corpus, ids, rng):
+        self.url, self.corpus, self.ids, self.rng = url, corpus, ids, rng
+        self.local = threading.local()
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, route):
+        http = self.session()
+        if route == 'analyze':
+            filename, data, jd_text, _ = self.rng.choice(self.corpus)
+            return http.post(f"{self.url}/analyze", files={'resume': (filename, data)},
+                             data={'job_description': jd_text}, allow_redirects=False, timeout=120)
+        if route == 'dashboard':
+            return http.get(f"{self.url}/dashboard", timeout=60)
+        if route == 'history':
+            return http.get(f"{self.url}/history", timeout=60)
+        if route == 'view':
+            return http.get(f"{self.url}/view/{self.rng.choice(self.ids)}", allow_redirects=False, timeout=60)
+        return http.get(f"{self.url}/download-report/{self.rng.choice(self.ids)}", allow_redirects=False, timeout=120)
+
+def run(client, mix, rps, duration, warmup, concurrency, rng):
+    samples = defaultdict(list)  # route -> [(status or None, latency seconds)]
+    lock = threading.Lock()
+    routes, weights = zip(*mix.items())
+    started = time.monotonic()
+    measure_from = started + warmup
+
+    def fire(route, due):
+        try:
+            status = client.send(route).status_code
+        except requests.RequestException:
+            status = None
+        finished = time.monotonic()
+        if due >= measure_from:
+            with lock:
+                samples[route].append((status, finished - due))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        due = started
+        end = started + warmup + duration
+        while due < end:
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire, rng.choices(routes, weights)[0], due)
+            # Poisson arrivals: bursts and lulls like real traffic, averaging the target rate
+            due += rng.expovariate(rps)
+    return samples, duration
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+def summarize(samples, duration):
+    rows = {}
+    for route in list(ROUTES) + ['total']:
+        entries = [s for r in ROUTES for s in samples.get(r, [])] if route == 'total' else samples.get(route, [])
+        if not entries:
+            continue
+        ok = sorted(latency for status, latency in entries if status is not None and 200 <= status < 300)
+        shed = sum(1 for status, _ in entries if status in (429, 503))
+        errors = len(entries) - len(ok) - shed
+        rows[route] = {
+            'requests': len(entries),
+            'throughput_rps': round(len(ok) / duration, 2),
+            'error_rate': round(errors / len(entries), 4),
+            'shed_rate': round(shed / len(entries), 4),
+            'p50_ms': round(percentile(ok, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(ok, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(ok, 0.99) * 1000, 1),
+        }
+    return rows
+
+def print_table(rows):
+    print(f"{'route':<11}{'requests':>9}{'ok/s':>8}{'errors':>8}{'shed':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in rows.items():
+        print(f"{route:<11}{r['requests']:>9}{r['throughput_rps']:>8.1f}{r['error_rate']:>8.1%}{r['shed_rate']:>8.1%}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rps', type=float, default=20, help="Target request rate (default: %(default)s)")
+    parser.add_argument('--duration', type=float, default=30, help="Measured seconds (default: %(default)s)")
+    parser.add_argument('--warmup', type=float, default=5, help="Unmeasured seconds first (default: %(default)s)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Route weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--workers', type=int, help="Gunicorn workers (default: gunicorn.conf.py's)")
+    parser.add_argument('--concurrency', type=int, default=64, help="Client threads (default: %(default)s)")
+    parser.add_argument('--corpus', type=int, default=24, help="Generated resume/JD pairs (default: %(default)s)")
+    parser.add_argument('--seed-analyses', type=int, default=100, help="Analyses stored before the run (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for the corpus and traffic")
+    parser.add_argument('--url', help="Test a running server instead; it must already have analyses 1..--seed-analyses")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"Generating {args.corpus} resumes and job descriptions...")
+    corpus = build_corpus(args.corpus, args.seed)
+    server = None
+    with tempfile.TemporaryDirectory(prefix='resumeflexx-load-') as workdir:
+        log_path = os.path.join(workdir, 'gunicorn.log')
+        with open(log_path, 'w') as log:
+            if args.url:
+                url, ids = args.url.rstrip('/'), list(range(1, args.seed_analyses + 1))
+            else:
+                print(f"Seeding {args.seed_analyses} analyses...")
+                ids = seed_database(os.path.join(workdir, 'history.db'), corpus, args.seed_analyses)
+                server, url = start_server(workdir, args.workers, log)
+                print(f"gunicorn listening on {url}")
+            try:
+                print(f"Driving {args.rps:g} req/s for {args.warmup:g}s warm-up + {args.duration:g}s...")
+                client = Client(url, corpus, ids, rng)
+                samples, duration = run(client, args.mix, args.rps, args.duration, args.warmup, args.concurrency, rng)
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=30)
+        rows = summarize(samples, duration)
+        print_table(rows)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'rps': args.rps, 'duration': duration, 'mix': args.mix, 'routes': rows}, f, indent=2)
+        errors = rows.get('total', {}).get('error_rate', 0)
+        if errors and server is not None:
+            with open(log_path) as f:
+                print("\nLast server log lines:\n" + "".join(f.readlines()[-20:]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""Command-line maintenance tasks for the ResumeFlexx history database.
+
+    python manage.py export history.ndjson
+    python manage.py import history.ndjson
+    python manage.py maintain --retention-days 365
+    python manage.py maintain --vacuum
+    python manage.py stats
+    python manage.py check-kb data/skills_kb.json
+    python manage.py reindex
+    python manage.py shadow-report --days 7
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+
+from utils import resume_db, maintenance, skills_kb, candidate_index, shadow
+
+def cmd_export(args):
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    started = time.perf_counter()
+    count = 0
+    try:
+        for record in resume_db.iter_history_export(batch_size=args.batch_size):
+            out.write(json.dumps(record) + '\n')
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else count
+    print(f"Exported {count} rows in {elapsed:.2f}s ({rate:.0f} rows/s)", file=sys.stderr)
+
+def cmd_import(args):
+    if args.input == '-':
+        src = sys.stdin
+    elif args.input.endswith('.gz'):
+        # Retention archives are gzip NDJSON in the export format
+        src = gzip.open(args.input, 'rt', encoding='utf-8')
+    else:
+        src = open(args.input, encoding='utf-8')
+    try:
+        stats = resume_db.import_history_records(resume_db.read_import_lines(src), batch_size=args.batch_size)
+    except resume_db.HistoryImportError as e:
+        sys.exit(f"Invalid NDJSON: {e} ({e.rows} rows before it were already imported)")
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(f"Imported {stats['rows']} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']} rows/s)", file=sys.stderr)
+
+def cmd_maintain(args):
+    result = maintenance.run_maintenance(args.retention_days, args.max_rows, args.archive, vacuum=args.vacuum)
+    print(f"Archived {result['archived']} rows, reclaimed {result['freed_pages']} free pages in {result['seconds']:.2f}s",
+          file=sys.stderr)
+
+def cmd_stats(args):
+    for key, value in maintenance.get_db_health().items():
+        print(f"{key:>16}: {value}")
+
+def cmd_check_kb(args):
+    try:
+        started = time.perf_counter()
+        snapshot = skills_kb.load(args.path)
+    except (OSError, skills_kb.KnowledgeBaseError) as e:
+        sys.exit(f"{args.path}: {e}")
+    elapsed = (time.perf_counter() - started) * 1000
+    summary = snapshot.summary()
+    print(f"{args.path}: version {summary['version']}, {summary['skills']} skills, {summary['aliases']} aliases "
+          f"(loaded in {elapsed:.1f} ms)")
+
+def cmd_reindex(args):
+    started = time.perf_counter()
+    count = candidate_index.rebuild(batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Indexed {count} resumes into {candidate_index.index_dir()} in {elapsed:.2f}s", file=sys.stderr)
+
+def cmd_shadow_report(args):
+    report = shadow.summary(args.engine, args.days)
+    if not report:
+        print(f"No shadow comparisons recorded in {shadow.db_path()}", file=sys.stderr)
+        return
+    print(f"{'engine':<16} {'function':<28} {'runs':>6} {'errors':>6} {'changed':>8} {'mean |d|':>9} "
+          f"{'max |d|':>8} {'live p50':>9} {'cand p50':>9} {'speedup':>8}")
+    for row in report:
+        print(f"{row['engine']:<16} {row['function']:<28} {row['runs']:>6} {row['errors']:>6} "
+              f"{_fmt(row['changed_pct'], '%'):>8} {_fmt(row['mean_abs_delta']):>9} {_fmt(row['max_abs_delta']):>8} "
+              f"{_fmt(row['live_ms']['p50'], 'ms'):>9} {_fmt(row['candidate_ms']['p50'], 'ms'):>9} "
+              f"{_fmt(row['speedup'], 'x'):>8}")
+        for label, key in (('only live', 'top_only_live'), ('only candidate', 'top_only_candidate')):
+            if row[key]:
+                print(f"{'':<17}{label}: " + ', '.join(f"{item} ({count})" for item, count in row[key]))
+
+def _fmt(value, unit=''):
+    return '-' if value is None else f"{value:g}{unit}"
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default=resume_db.DB_PATH, help="SQLite database path (default: %(default)s)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export = sub.add_parser('export', help="Stream history rows as NDJSON")
+    export.add_argument('output', nargs='?', default='-', help="Output file, '-' for stdout")
+    export.add_argument('--batch-size', type=int, default=500)
+    export.set_defaults(func=cmd_export)
+
+    imp = sub.add_parser('import', help="Bulk-load an NDJSON export")
+    imp.add_argument('input', nargs='?', default='-', help="Input file, '-' for stdin")
+    imp.add_argument('--batch-size', type=int, default=5000, help="Rows per transaction")
+    imp.set_defaults(func=cmd_import)
+
+    maintain = sub.add_parser('maintain', help="Archive expired rows, vacuum and analyze")
+    maintain.add_argument('--retention-days', type=int, help="Archive rows older than this (default: HISTORY_RETENTION_DAYS)")
+    maintain.add_argument('--max-rows', type=int, help="Keep only the newest N rows (default: HISTORY_MAX_ROWS)")
+    maintain.add_argument('--archive', help="Archive file (default: HISTORY_ARCHIVE_PATH)")
+    maintain.add_argument('--vacuum', action='store_true',
+                          help="Switch an older database to incremental auto-vacuum (one full VACUUM; stop the app first)")
+    maintain.set_defaults(func=cmd_maintain)
+
+    stats = sub.add_parser('stats', help="Show database size and fragmentation")
+    stats.set_defaults(func=cmd_stats)
+
+    check_kb = sub.add_parser('check-kb', help="Validate a skills knowledge-base file")
+    check_kb.add_argument('path', nargs='?', default=skills_kb.KB_PATH)
+    check_kb.set_defaults(func=cmd_check_kb)
+
+    reindex = sub.add_parser('reindex', help="Rebuild the candidate retrieval index from stored resumes")
+    reindex.add_argument('--batch-size', type=int, default=5000, help="Resumes per index segment")
+    reindex.set_defaults(func=cmd_reindex)
+
+    shadow_report = sub.add_parser('shadow-report', help="Summarize shadow engine comparisons")
+    shadow_report.add_argument('--engine', help="Only this engine (default: all)")
+    shadow_report.add_argument('--days', type=int, default=shadow.SUMMARY_DAYS,
+                               help="Only comparisons from the last N days, 0 for all (default: %(default)s)")
+    shadow_report.set_defaults(func=cmd_shadow_report)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    resume_db.DB_PATH = args.db
+    resume_db.init_db()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""Screen a directory of resumes against one or more job descriptions, offline.
+
+    python screen.py resumes/ --jd backend.txt --jd data.txt -o results.csv
+    python screen.py resumes/ --jd backend.txt -o results.ndjson --save --workers 8
+
+Every PDF/DOCX under the directory is analyzed against every job
+description across a pool of processes (default: one per core). Rows are
+appended to the output (CSV or NDJSON, by extension or --format), and
+--save also stores each analysis in the history database. Progress is
+checkpointed in <output>.checkpoint: run the same command again after an
+interruption and it carries on without redoing finished files. Pass
+--restart to start over.
+"""
+import argparse
+import sys
+
+from utils import resume_db, screening
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('resume_dir', help="Directory of PDF/DOCX resumes (searched recursively)")
+    parser.add_argument('--jd', action='append', required=True, help="Job description text file (repeatable)")
+    parser.add_argument('-o', '--output', required=True, help="Results file, .csv or .ndjson")
+    parser.add_argument('--format', choices=('csv', 'ndjson'), help="Output format (default: from the extension)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per core)")
+    parser.add_argument('--save', action='store_true', help="Also store every analysis in the history database")
+    parser.add_argument('--db', default=resume_db.DB_PATH, help="SQLite database path for --save (default: %(default)s)")
+    parser.add_argument('--batch-size', type=int, default=100, help="Resumes per checkpoint and per history transaction")
+    parser.add_argument('--time-budget-ms', type=float, default=0, help="Per-analysis time budget (default: none)")
+    parser.add_argument('--restart', action='store_true', help="Discard the output and checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    if args.save:
+        resume_db.DB_PATH = args.db
+        resume_db.init_db()
+    try:
+        stats = screening.run(
+            args.resume_dir, args.jd, args.output, fmt=args.format, workers=args.workers, save=args.save,
+            batch_size=args.batch_size, time_budget_ms=args.time_budget_ms, restart=args.restart,
+        )
+    except (OSError, ValueError) as e:
+        sys.exit(f"screen.py: {e}")
+    print(f"Screened {stats['resumes']} resumes ({stats['skipped']} already done) into {stats['rows']} rows, "
+          f"{stats['errors']} errors, {stats['saved']} saved, in {stats['seconds']:.1f}s "
+          f"({stats['resumes_per_sec']} resumes/s)", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
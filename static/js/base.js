@@ -0,0 +1,73 @@
+// Read while this script is executing; document.currentScript is null inside callbacks
+const analyzePageUrl = document.currentScript.dataset.analyzeUrl;
+
+(function () {
+    const btn = document.getElementById('jobOffersBtn');
+    const dropdown = document.getElementById('jobOffersDropdown');
+    const menuToggle = document.getElementById('menuToggle');
+    const sidebar = document.querySelector('.sidebar');
+    const overlay = document.getElementById('sidebarOverlay');
+
+    if (menuToggle && sidebar && overlay) {
+        menuToggle.addEventListener('click', () => {
+            sidebar.classList.toggle('active');
+            overlay.classList.toggle('active');
+        });
+
+        overlay.addEventListener('click', () => {
+            sidebar.classList.remove('active');
+            overlay.classList.remove('active');
+        });
+    }
+
+    if (btn && dropdown) {
+        btn.addEventListener('click', (e) => {
+            e.preventDefault();
+            e.stopPropagation();
+            dropdown.classList.toggle('active');
+        });
+
+        document.addEventListener('click', () => {
+            dropdown.classList.remove('active');
+        });
+
+        dropdown.addEventListener('click', (e) => {
+            e.stopPropagation();
+        });
+    }
+})();
+
+const jds = {
+    'software-engineer': "SOFTWARE ENGINEER\n\nExperience: 3+ years of full-stack development.\nSkills: React.js, Node.js, Python, SQL, REST APIs, Git.\nCloud: Familiarity with AWS or Azure.\nEducation: CS degree or equivalent.\nAbility to work in agile teams and lead small features.",
+    'data-scientist': "DATA SCIENTIST\n\nExperience: 2+ years in data analytics/ML.\nSkills: Python (Pandas, Scikit-learn), SQL, Jupyter, Plotly.\nMath: Strong statistics and probability background.\nNLP: Knowledge of LLMs and vector databases is a plus.\nCreative problem solver with data-driven mindset.",
+    'ui-ux-designer': "UI/UX DESIGNER\n\nExperience: 2+ years in digital product design.\nTools: Figma, Adobe Creative Suite, Sketch.\nSkills: Wireframing, Prototyping, User Research, Design Systems.\nPortfolio: Strong visual design portfolio required.\nFocus on accessibility and user-centered design principles.",
+    'marketing-manager': "MARKETING MANAGER\n\nExperience: 5+ years in digital marketing.\nSkills: SEO, SEM, Paid Social, Email Marketing, Content Strategy.\nTools: Google Analytics, HubSpot, Mailchimp.\nLeadership: Experience managing budgets and small teams.\nAnalytical: Data-driven decision making and reporting.",
+    'qa-engineer': "QA ENGINEER\n\nExperience: 3+ years in software testing.\nAutomation: Selenium, Cypress, or Appium.\nTools: Jira, TestRail, Postman.\nSkills: Manual testing, Regression, Unit testing, Performance testing.\nDeep understanding of SDLC and bug lifecycle.",
+    'data-analyst': "DATA ANALYST\n\nExperience: 1-3 years in business intelligence.\nSkills: Excel (Advanced), SQL, Tableau/Power BI, Python basics.\nMath: Data cleaning, exploratory analysis, reporting.\nCommunication: Translating data into actionable business insights.\nAttention to detail and accuracy.",
+    'product-manager': "PRODUCT MANAGER\n\nExperience: 4+ years in SaaS product management.\nSkills: Strategic roadmap planning, User stories, GTM strategy.\nTools: Jira, Confluence, Mixpanel.\nCollaboration: Engineering, Design, and Marketing.\nExcellent communication and stakeholders management.",
+    'cyber-security': "CYBER SECURITY ANALYST\n\nExperience: 3+ years in information security.\nSkills: Network Security, Incident Response, Pentesting, Firewalls.\nTools: Wireshark, Metasploit, SIEM (Splunk/ELK).\nCertifications: CISSP, CEH, or CompTIA Security+.\nUnderstanding of NIST and ISO frameworks.",
+    'hr-manager': "HR MANAGER\n\nExperience: 5+ years in Human Resources.\nSkills: Strategic HR Planning, Talent Acquisition, Compliance, Employee Relations.\nTools: Workday, BambooHR, LinkedIn Recruiter.\nLeadership: Experience leading HR teams and policy development.\nStrong communication and conflict resolution skills.",
+    'backend-developer': "BACKEND DEVELOPER\n\nExperience: 4+ years in backend system design.\nLanguages: Python (FastAPI/Django), Go, or Java (Spring Boot).\nDatabases: PostgreSQL, Redis, MongoDB.\nArchitectures: Microservices, Event-driven, REST/gRPC.\nTools: Docker, Kubernetes, Git, CI/CD pipelines.\nPerformance: SQL optimization, caching strategies, system scalability.",
+    'frontend-developer': "FRONTEND DEVELOPER\n\nExperience: 3+ years in modern web development.\nFrameworks: React.js, Vue.js, or Angular.\nLanguages: TypeScript, JavaScript (ES6+), CSS3 (Tailwind/Sass).\nTools: Webpack/Vite, Jest/Cypress, Redux/Zustand.\nSkills: Responsive Design, Web Accessibility (a11y), Performance Tuning.\nDesign: Collaboration with Figma and UI/UX designers.",
+    'devops-engineer': "DEVOPS ENGINEER\n\nExperience: 3+ years in infrastructure automation.\nCloud: AWS (EC2, S3, RDS), Azure, or GCP.\nTools: Terraform, Ansible, Jenkins, GitHub Actions.\nContainerization: Kubernetes, Docker, Helm.\nMonitoring: Prometheus, Grafana, ELK Stack.\nSecurity: Cloud security best practices, IAM, VPC networking.",
+    'mobile-developer': "MOBILE APP DEVELOPER\n\nExperience: 3+ years in iOS or Android development.\nTech: Swift/SwiftUI, Kotlin/Jetpack Compose, or Flutter/React Native.\nIntegration: REST APIs, Firebase, GraphQL.\nPublishing: Experience with App Store and Play Store releases.\nUX: Deep understanding of mobile UI patterns and animations.\nDebugging: Crashlytics, Instruments, performance profiling.",
+    'financial-analyst': "FINANCIAL ANALYST\n\nExperience: 2-4 years in corporate finance.\nSkills: Financial Modeling, P&L Analysis, Budgeting, Forecasting.\nTools: Advanced Excel (VBA/PowerQuery), SAP, Oracle, Tableau.\nMath: ROI, NPV, IRR analysis, statistical forecasting.\nCommunication: Preparing reports for senior management and stakeholders.\nDetail-oriented: Ensuring data accuracy and compliance."
+};
+
+function copyJD(role) {
+    const text = jds[role];
+    const textarea = document.querySelector('textarea[name="job_description"]');
+
+    if (textarea) {
+        textarea.value = text;
+        // Scroll to textarea for better UX
+        textarea.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        // Optional: visual feedback
+        textarea.parentElement.style.borderColor = 'var(--primary-color)';
+    } else {
+        navigator.clipboard.writeText(text).then(() => {
+            alert('Sample description copied to clipboard! Navigating to Analyzer...');
+            window.location.href = analyzePageUrl;
+        });
+    }
+}
@@ -0,0 +1,85 @@
+import fcntl
+import io
+import os
+import threading
+
+import pytest
+
+from utils import admission, resume_db, upload_store
+
+
+def test_admission(tmp_path, monkeypatch):
+    from app import app
+    print("Testing admission control...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+    monkeypatch.setattr(admission, 'ANALYSIS_CONCURRENCY', 1)
+    monkeypatch.setattr(admission, 'ANALYSIS_QUEUE_TIMEOUT', 0.2)
+    monkeypatch.setenv('GUNICORN_THREADS', '2')
+    client = app.test_client()
+    form = {'job_description': 'A job description that is long enough to pass validation.'}
+
+    # 1. With the only slot taken and no room to queue, analyses are shed at once while pages still load
+    assert admission.queue_depth() == 0
+    with admission.analysis_slot():
+        with pytest.raises(admission.Busy):
+            with admission.analysis_slot():
+                pass
+        response = client.post('/analyze', data=dict(form, resume=(io.BytesIO(b'%PDF-1.4'), 'cv.pdf')))
+        assert response.status_code == 503 and int(response.headers['Retry-After']) >= 1
+        assert upload_store.stats()['files'] == 0  # Shed before the upload was stored
+        assert client.get('/dashboard').status_code == 200
+        # The live page is told to back off, and its job stays unclaimed for the retry
+        job_id = resume_db.create_analysis_job('cv.pdf', str(tmp_path / 'cv.pdf'), form['job_description'])
+        body = client.get(f'/analyze/stream/{job_id}/events').get_data(as_text=True)
+        assert body.startswith('retry: ') and 'event: busy' in body
+        assert resume_db.claim_analysis_job(job_id) is not None
+    print(f"[✓] 503 with Retry-After {response.headers['Retry-After']}s; SSE told to retry; dashboard unaffected")
+
+    # 2. A queued analysis runs as soon as the slot frees up
+    monkeypatch.setenv('GUNICORN_THREADS', '3')
+    monkeypatch.setattr(admission, 'ANALYSIS_QUEUE_TIMEOUT', 5)
+    admitted = threading.Event()
+    with admission.analysis_slot():
+        def queued():
+            with admission.analysis_slot():
+                admitted.set()
+        waiter = threading.Thread(target=queued)
+        waiter.start()
+        assert not admitted.wait(0.2)
+    assert admitted.wait(5)
+    waiter.join()
+    print("[✓] Queued analysis admitted when the slot was released")
+
+    # 3. Slots held by other processes count against the instance limit
+    monkeypatch.setattr(admission, 'ANALYSIS_QUEUE_TIMEOUT', 0.2)
+    monkeypatch.setattr(admission, 'ANALYSIS_INSTANCE_SLOTS', 2)
+    os.makedirs(admission.ADMISSION_DIR, exist_ok=True)
+    others = [open(os.path.join(admission.ADMISSION_DIR, f"slot-{i}.lock"), 'a') for i in range(2)]
+    fcntl.flock(others[0], fcntl.LOCK_EX)
+    with admission.analysis_slot():
+        assert admission.stats()['instance_slots_held_here'] == [1]
+    fcntl.flock(others[1], fcntl.LOCK_EX)
+    with pytest.raises(admission.Busy):
+        with admission.analysis_slot():
+            pass
+    assert admission.stats()['active'] == 0
+    for f in others:
+        f.close()
+    print("[✓] Instance-wide flock slots enforced")
+
+    # 4. One client's burst is capped by its token bucket, other clients are unaffected
+    monkeypatch.setattr(admission, 'BURST', 2)
+    monkeypatch.setattr(admission, 'RATE_PER_MINUTE', 6)
+    admission.charge('10.0.0.1')
+    admission.charge('10.0.0.1')
+    with pytest.raises(admission.RateLimited) as limited:
+        admission.charge('10.0.0.1')
+    assert 1 <= limited.value.retry_after <= 10
+    admission.charge('10.0.0.2')
+    admission.charge('127.0.0.1')
+    admission.charge('127.0.0.1')
+    response = client.post('/analyze/stream', data=dict(form, resume=(io.BytesIO(b'%PDF-1.4'), 'cv.pdf')))
+    assert response.status_code == 429 and response.headers['Retry-After']
+    assert upload_store.stats()['files'] == 0
+    print(f"[✓] 429 after the burst, retry in {limited.value.retry_after}s")
@@ -0,0 +1,63 @@
+import io
+import json
+import re
+
+import docx
+
+from utils import resume_db, report_cache
+from utils.pipeline import STAGES, analyze_texts
+
+RESUME = (
+    "Backend engineer with six years of Python and Django experience. "
+    "Built REST APIs on PostgreSQL, deployed with Docker on AWS, and led a team of four. "
+    "Experience: Acme Corp 2019-2024. Education: BSc Computer Science. Skills: Python, SQL, Docker."
+)
+JD = "We need a backend engineer skilled in Python, Kubernetes, Terraform, AWS and PostgreSQL."
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_analyze_stream(tmp_path, monkeypatch):
+    from app import app
+    print("Testing progressive analysis over SSE...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', str(tmp_path / 'reports'))
+    resume_db.init_db()
+
+    document = docx.Document()
+    document.add_paragraph(RESUME)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    client = app.test_client()
+
+    # 1. The POST returns the page shell without running the analysis
+    response = client.post('/analyze/stream', data={'resume': (buffer, 'cv.docx'), 'job_description': JD})
+    assert response.status_code == 200
+    events_url = re.search(rb'EventSource\("([^"]+)"\)', response.data).group(1).decode()
+    assert resume_db.get_history() == []
+    print(f"[✓] Shell page points at {events_url}")
+
+    # 2. Each stage arrives as its own event, then the saved id
+    response = client.get(events_url)
+    assert response.mimetype == 'text/event-stream'
+    events = parse_events(response.get_data(as_text=True))
+    assert [name for name, _ in events] == ['started', *STAGES, 'done']
+    stages = dict(events)
+    assert stages['extraction']['characters'] > 0 and 'elapsed_ms' in stages['health']
+    expected = analyze_texts(RESUME, JD, 'cv.docx')
+    assert stages['similarity']['score'] == expected['score']
+    assert stages['skills']['missing_skills'] == expected['missing_skills']
+    saved = resume_db.get_analysis_by_id(stages['done']['analysis_id'])
+    assert saved['ats_score'] == expected['ats_score']
+    print(f"[✓] Stages streamed, analysis #{stages['done']['analysis_id']} saved in {stages['done']['total_ms']}ms")
+
+    # 3. A job runs once; reconnects get a terminal error event
+    assert parse_events(client.get(events_url).get_data(as_text=True))[0][0] == 'failed'
+    print("[✓] Stream is single-use")
@@ -0,0 +1,28 @@
+import os
+
+from utils import resume_db, report_cache
+
+
+def test_create_app(tmp_path, monkeypatch):
+    from app import create_app
+    print("Testing the preload app factory...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', str(tmp_path / 'reports'))
+    resume_db.init_db()
+
+    # 1. Warm-up exercises the pipeline and report engine without touching history
+    app = create_app()
+    assert resume_db.get_history() == []
+    assert not os.path.exists(report_cache.REPORT_CACHE_DIR)
+    assert app.test_client().get('/analyze_page').status_code == 200
+    print("[✓] create_app() warms up without side effects")
+
+    # 2. A forked worker drops the executors it inherited
+    report_cache._executor = object()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if report_cache._executor is None else 1)
+    _, status = os.waitpid(pid, 0)
+    report_cache._executor = None
+    assert os.waitstatus_to_exitcode(status) == 0
+    print("[✓] Per-process state reset after fork")
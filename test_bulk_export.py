@@ -0,0 +1,50 @@
+import csv
+import io
+import zipfile
+
+from utils import resume_db, report_cache, bulk_export
+
+RESULTS = {
+    'score': 70.0, 'ats_score': 60.0, 'health_score': 80.0,
+    'missing_skills': ['docker'],
+    'health_issues': ['Add a summary section'],
+}
+
+
+def test_bulk_export(tmp_path, monkeypatch):
+    from app import app
+    print("Testing bulk ZIP report export...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', str(tmp_path / 'reports'))
+    resume_db.init_db()
+    ids = [resume_db.save_analysis(f"cv {i}.pdf", 50 + i * 10, 60, 80, ['docker'], dict(RESULTS, filename=f"cv {i}.pdf"))
+           for i in range(4)]
+    report_cache.put(ids[0], b'%PDF-cached')
+    client = app.test_client()
+
+    # 1. Selected ids stream back as a ZIP of PDFs plus an index
+    response = client.post('/history/export-reports', data={'ids': [ids[0], ids[1], ids[2]], 'job': 'job-12345678'})
+    assert response.status_code == 200
+    assert response.headers['X-Report-Count'] == '3'
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    assert archive.testzip() is None
+    names = sorted(archive.namelist())
+    assert names == ['00001_cv_0.pdf', '00002_cv_1.pdf', '00003_cv_2.pdf', 'index.csv']
+    assert archive.read('00001_cv_0.pdf') == b'%PDF-cached'
+    assert archive.read('00002_cv_1.pdf').startswith(b'%PDF-1.')
+    index = list(csv.DictReader(io.StringIO(archive.read('index.csv').decode())))
+    assert [row['report'] for row in index] == ['ok', 'ok', 'ok']
+    print(f"[✓] ZIP with {len(names)} entries")
+
+    # 2. Rendered reports land in the cache and progress is recorded
+    assert report_cache.get(ids[2]) is not None
+    job = client.get('/api/report-export/job-12345678').get_json()
+    assert (job['status'], job['done'], job['percent']) == ('done', 3, 100)
+    assert client.get('/api/report-export/unknown-job').status_code == 404
+    print(f"[✓] Progress: {job}")
+
+    # 3. Filters select analyses without explicit ids
+    response = client.get('/history/export-reports?min_score=65')
+    assert sorted(zipfile.ZipFile(io.BytesIO(response.data)).namelist()) == ['00003_cv_2.pdf', '00004_cv_3.pdf', 'index.csv']
+    assert client.get('/history/export-reports?min_score=1000').status_code == 302
+    print("[✓] Filtered export")
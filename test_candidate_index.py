@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+from utils import resume_db, candidate_index
+
+RESUMES = {
+    "backend.pdf": "Python developer building Flask and Django APIs, PostgreSQL, Docker and Kubernetes on AWS.",
+    "frontend.pdf": "Frontend developer: React, TypeScript, CSS, accessibility and design systems.",
+    "data.pdf": "Data scientist using Python, pandas, scikit-learn and Spark for forecasting models.",
+    "nurse.pdf": "Registered nurse with ICU experience, patient care and triage.",
+}
+JOB = "Backend engineer: Python, Flask APIs, Docker, Kubernetes and AWS deployments."
+
+
+def test_candidate_index(tmp_path, monkeypatch):
+    from app import app
+    print("Testing candidate retrieval...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(candidate_index, 'MAX_SMALL_SEGMENTS', 2)
+    resume_db.init_db()
+    ids = {name: resume_db.save_analysis(name, 70, 70, 70, [], {}, resume_text=text) for name, text in RESUMES.items()}
+
+    # 1. Saves are indexed straight away; the best match comes first
+    hits = candidate_index.top_k(JOB, k=2)
+    assert [hit['filename'] for hit in hits] == ["backend.pdf", "data.pdf"]
+    assert 0 < hits[1]['similarity'] < hits[0]['similarity'] <= 1
+    assert candidate_index.top_k("", k=2) == [] and candidate_index.top_k("the and of", k=2) == []
+    print(f"[✓] Top match {hits[0]['filename']} ({hits[0]['similarity']})")
+
+    # 2. More than MAX_SMALL_SEGMENTS one-row segments were merged into one
+    stats = candidate_index.stats()
+    assert stats['resumes'] == 4 and stats['segments'] == 2
+    assert len([n for n in os.listdir(candidate_index.index_dir()) if n.startswith('seg-')]) == 2
+    print(f"[✓] Merged into {stats['segments']} segments")
+
+    # 3. Deleted resumes never come back, and the next merge drops them
+    resume_db.delete_history_item(ids["backend.pdf"])
+    assert [hit['filename'] for hit in candidate_index.top_k(JOB, k=1)] == ["data.pdf"]
+    candidate_index.compact(force=True)
+    assert candidate_index.stats() == dict(stats, segments=1, resumes=3,
+                                           nonzeros=stats['nonzeros'] - candidate_index.vectorize([RESUMES['backend.pdf']]).nnz)
+    print("[✓] Deletions filtered and purged")
+
+    # 4. Large imports are stored as posting lists; ties go to the older resume; a rebuild agrees
+    monkeypatch.setattr(candidate_index, 'SMALL_SEGMENT_ROWS', 2)
+    records = [{'filename': f"copy-{name}", 'resume_text': text} for name, text in RESUMES.items()]
+    resume_db.import_history_records(records, batch_size=2)
+    hits = candidate_index.top_k(JOB, k=3)
+    assert [hit['filename'] for hit in hits] == ["copy-backend.pdf", "data.pdf", "copy-data.pdf"]
+    assert any(s.matrix.format == 'csc' for s in candidate_index._live_segments())
+    assert candidate_index.rebuild(batch_size=2) == 7
+    assert candidate_index.top_k(JOB, k=3) == hits
+    print("[✓] Imports indexed; rebuild matches")
+
+    # 5. The endpoint validates its input
+    client = app.test_client()
+    response = client.post('/api/candidates', json={'job_description': JOB, 'k': 1})
+    assert response.status_code == 200 and response.get_json()['candidates'][0]['filename'] == "copy-backend.pdf"
+    assert client.post('/api/candidates', data={'job_description': JOB, 'k': '2'}).get_json()['k'] == 2
+    assert client.post('/api/candidates', json={'k': 3}).status_code == 400
+    assert client.post('/api/candidates', json={'job_description': JOB, 'k': 'ten'}).status_code == 400
+    print("[✓] /api/candidates")
+
+    # 6. Without fcntl (Windows) the module still imports and merges under the in-process lock
+    code = "import sys; sys.modules['fcntl'] = None; from utils import candidate_index; assert candidate_index.fcntl is None"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    monkeypatch.setattr(candidate_index, 'fcntl', None)
+    resume_db.save_analysis("late.pdf", 70, 70, 70, [], {}, resume_text=RESUMES["nurse.pdf"])
+    segments = candidate_index.stats()['segments']
+    assert candidate_index.compact(force=True) is not None and candidate_index.stats()['segments'] == segments - 1
+    print("[✓] Works without fcntl")
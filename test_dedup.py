@@ -0,0 +1,71 @@
+import io
+
+import docx
+
+from utils import resume_db, dedup, report_cache
+
+BASE_RESUME = (
+    "Senior backend engineer with eight years of experience building Python and Go services. "
+    "Led the migration of a monolith to Kubernetes, cutting deploy times by seventy percent. "
+    "Designed event-driven pipelines on Kafka and PostgreSQL that process two billion events a day. "
+    "Mentored six engineers and introduced code review and testing standards across the team. "
+    "Education: BSc Computer Science. Skills: Python, Go, SQL, Docker, Kubernetes, AWS, Terraform."
+)
+REVISED_RESUME = BASE_RESUME.replace("Mentored six engineers", "Mentored seven engineers")
+OTHER_RESUME = (
+    "Graphic designer focused on brand identity, packaging and editorial layouts for retail clients. "
+    "Created campaign visuals in Figma and Adobe Illustrator and managed print production schedules."
+)
+JD = "Backend engineer: Python, Kubernetes, AWS, SQL and Docker experience required for our platform team."
+
+
+def test_near_duplicates(tmp_path, monkeypatch):
+    print("Testing MinHash/LSH near-duplicate detection...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+
+    # 1. Signatures estimate Jaccard similarity
+    base = dedup.minhash_signature(BASE_RESUME)
+    assert dedup.estimate_similarity(base, dedup.minhash_signature(BASE_RESUME)) == 1.0
+    assert dedup.estimate_similarity(base, dedup.minhash_signature(REVISED_RESUME)) > 0.8
+    assert dedup.estimate_similarity(base, dedup.minhash_signature(OTHER_RESUME)) < 0.2
+    print("[✓] Signatures track similarity")
+
+    # 2. LSH lookups find the revision but not unrelated resumes
+    fp = dedup.fingerprint(BASE_RESUME, JD)
+    base_id = resume_db.save_analysis("base.pdf", 50, 50, 50, [], {'score': 50}, resume_text=BASE_RESUME, fingerprint=fp)
+    match = dedup.find_near_duplicate(dedup.fingerprint(REVISED_RESUME, JD))
+    assert match['analysis_id'] == base_id and match['similarity'] >= 80
+    assert dedup.find_near_duplicate(dedup.fingerprint(OTHER_RESUME, JD)) is None
+    print(f"[✓] Near duplicate found: {match}")
+
+    # 3. Exact resume + JD repeats are served from the stored analysis
+    assert resume_db.get_analysis_by_content_hash(dedup.content_hash(BASE_RESUME, JD))['analysis_id'] == base_id
+    assert resume_db.get_analysis_by_content_hash(dedup.content_hash(BASE_RESUME, JD + " Go.")) is None
+
+    resume_db.delete_history_item(base_id)
+    assert dedup.find_near_duplicate(fp) is None
+    assert resume_db.get_analysis_by_content_hash(fp['content_hash']) is None
+    print("[✓] Index cleaned up on delete")
+
+
+def test_analyze_flags_duplicates(tmp_path, monkeypatch):
+    from app import app
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', str(tmp_path / 'reports'))
+    resume_db.init_db()
+
+    def upload(text, name):
+        document = docx.Document()
+        document.add_paragraph(text)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        buffer.seek(0)
+        return {'resume': (buffer, name), 'job_description': JD}
+
+    client = app.test_client()
+    assert client.post('/analyze', data=upload(BASE_RESUME, "v1.docx")).status_code == 200
+    response = client.post('/analyze', data=upload(REVISED_RESUME, "v2.docx"))
+    assert b"This looks like" in response.data
+    assert b"analysis #1" in response.data
+    print("[✓] /analyze flags the near-duplicate")
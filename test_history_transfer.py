@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+import manage
+from utils import resume_db
+
+
+def test_history_transfer(tmp_path, monkeypatch):
+    print("Testing NDJSON export/import...")
+    source = str(tmp_path / 'source.db')
+    target = str(tmp_path / 'target.db')
+
+    # 1. Export streams every row with decoded JSON fields
+    monkeypatch.setattr(resume_db, 'DB_PATH', source)
+    resume_db.init_db()
+    for i in range(25):
+        resume_db.save_analysis(f"cv{i}.pdf", i, i, 80, ['docker'], {'score': i, 'missing_skills': ['docker']})
+    lines = [json.dumps(record) for record in resume_db.iter_history_export(batch_size=7)]
+    assert len(lines) == 25
+    first = json.loads(lines[0])
+    assert first['filename'] == "cv0.pdf" and first['missing_skills'] == ['docker']
+    print(f"[✓] Exported {len(lines)} rows")
+
+    # 2. Import batches rows into a database that already has history
+    monkeypatch.setattr(resume_db, 'DB_PATH', target)
+    resume_db.init_db()
+    existing_id = resume_db.save_analysis("local.pdf", 99, 99, 99, [], {})
+    stats = resume_db.import_history_records((json.loads(line) for line in lines), batch_size=10)
+    assert stats['rows'] == 25 and stats['rows_per_sec'] > 0
+
+    history = resume_db.get_history()
+    assert len(history) == 26
+    assert len({item['id'] for item in history}) == 26
+    assert history[0]['filename'] == "cv24.pdf"
+    assert resume_db.get_analysis_by_id(existing_id)['analysis_id'] == existing_id
+    assert resume_db.get_top_skill_gaps(days=0) == [{'skill': 'docker', 'count': 25}]
+    print(f"[✓] Imported {stats['rows']} rows ({stats['rows_per_sec']} rows/s)")
+
+    # 3. Over HTTP, a bad line is a 400 that says how many rows earlier batches committed
+    import app as app_module
+    client = app_module.app.test_client()
+    monkeypatch.setattr(app_module, 'import_history_records',
+                        lambda records: resume_db.import_history_records(records, batch_size=10))
+    body = '\n'.join(lines[:12] + ['[1]'] + lines[12:]).encode()
+    response = client.post('/api/history/import', data=body)
+    assert response.status_code == 400 and response.get_json()['rows_imported'] == 10
+    assert 'line 13' in response.get_json()['error']
+    for bad in (b'"x"\n', b'{"filename": "cv.pdf", "results": [1]}\n', b'{not json\n'):
+        response = client.post('/api/history/import', data=bad)
+        assert response.status_code == 400 and response.get_json()['rows_imported'] == 0
+    print("[✓] Bad lines rejected with the committed count")
+
+    # 4. The CLI checks lines the same way and exits with the committed count
+    path = tmp_path / 'bad.ndjson'
+    path.write_text('\n'.join(lines[:3] + ['[1]']) + '\n', encoding='utf-8')
+    before = len(resume_db.get_history())
+    with pytest.raises(SystemExit) as exited:
+        manage.main(['--db', resume_db.DB_PATH, 'import', str(path), '--batch-size', '2'])
+    assert 'line 4' in str(exited.value) and '2 rows' in str(exited.value)
+    assert len(resume_db.get_history()) == before + 2
+    print(f"[✓] CLI: {exited.value}")
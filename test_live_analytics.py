@@ -0,0 +1,57 @@
+from collections import Counter
+
+from utils import live_analytics
+from utils.analyzer import analyze_power_words, analyze_resume_stats, tokenize
+
+SECTIONS = {
+    'summary': "Backend engineer who designed and scaled payment APIs. Led a team of four.",
+    'experience': "Acme Corp - Engineer (2019 - 2024)\n• Architected a Kafka pipeline in Python.\n• Optimized PostgreSQL queries by 40%.",
+    'education': "BSc Computer Science, State University.",
+    'projects': "",
+    'skills': "Python, PostgreSQL, Kafka, Docker, AWS",
+    'certifications': "AWS Certified Developer",
+}
+
+
+def test_live_analytics():
+    from app import app
+    print("Testing incremental builder analytics...")
+    client = app.test_client()
+    url = '/api/resume-builder/analytics'
+
+    # 1. Merged partials agree with analysing the whole resume at once
+    response = client.post(url, json={'sections': SECTIONS})
+    assert response.status_code == 200
+    partials, analytics = response.json['partials'], response.json['analytics']
+    assert set(partials) == set(SECTIONS)
+    whole = " ".join(SECTIONS.values())
+    assert analytics['power_words'] == analyze_power_words(whole)[1]
+    counts = Counter(tokenize(whole))
+    assert analytics['keywords'] == sorted(counts, key=lambda word: (-counts[word], word))[:10]
+    stats = analyze_resume_stats(whole)
+    assert analytics['word_count'] == stats['word_count'] and analytics['bullet_count'] == stats['bullet_count'] == 2
+    print(f"[✓] {analytics['word_count']} words, power words {analytics['power_words']}")
+
+    # 2. An edit re-sends one section; the others come back as stored partials
+    others = {name: partial for name, partial in partials.items() if name != 'projects'}
+    projects = "Built a resume parser that automated screening."
+    response = client.post(url, json={'sections': {'projects': projects}, 'partials': others})
+    assert list(response.json['partials']) == ['projects']
+    expected = live_analytics.update(dict(SECTIONS, projects=projects), {})[1]
+    assert response.json['analytics'] == expected
+    assert 'automated' in expected['power_words'] and expected['word_count'] == analytics['word_count'] + 7
+    print("[✓] Single-section update matches a full recompute")
+
+    # 3. Tampered partials are rejected
+    bad = dict(others, summary=dict(others['summary'], words=-1))
+    assert client.post(url, json={'sections': {}, 'partials': bad}).status_code == 400
+    bad = dict(others, summary=dict(others['summary'], power_words=['<script>']))
+    assert client.post(url, json={'sections': {}, 'partials': bad}).status_code == 400
+    assert client.post(url, data='not json').status_code == 400
+    print("[✓] Invalid partials rejected")
+
+    # 4. The generated preview uses the same merged analytics
+    form = dict(SECTIONS, name='Jane Doe', title='Engineer', email='jane@example.com', template='modern')
+    response = client.post('/generate_resume', data=form)
+    assert response.status_code == 200 and b'Jane Doe' in response.data
+    print("[✓] Preview rendered")
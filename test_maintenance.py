@@ -0,0 +1,92 @@
+import gzip
+import json
+import sqlite3
+
+import manage
+from utils import resume_db, maintenance
+
+
+def test_maintenance(tmp_path, monkeypatch):
+    print("Testing retention and storage maintenance...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    archive_path = str(tmp_path / 'archive.ndjson.gz')
+    resume_db.init_db()
+
+    for i in range(20):
+        resume_db.save_analysis(f"cv{i}.pdf", i, i, 80, ['docker'], {'padding': 'x' * 4000})
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.execute("UPDATE history SET created_at = '2020-01-01T00:00:00' WHERE id <= 5")
+    conn.commit()
+    conn.close()
+
+    # 1. Rows past the age or row-count limit are archived, then deleted
+    result = maintenance.run_maintenance(retention_days=30, max_rows=10, archive_path=archive_path)
+    assert result['archived'] == 10
+    remaining = resume_db.get_history()
+    assert [item['filename'] for item in remaining] == [f"cv{i}.pdf" for i in range(19, 9, -1)]
+    with gzip.open(archive_path, 'rt') as f:
+        archived = [json.loads(line) for line in f]
+    assert [record['filename'] for record in archived] == [f"cv{i}.pdf" for i in range(10)]
+    assert resume_db.get_top_skill_gaps(days=0) == [{'skill': 'docker', 'count': 10}]
+    print(f"[✓] Archived {result['archived']} rows")
+
+    # 2. The database now reclaims free pages incrementally
+    health = maintenance.get_db_health()
+    assert health['auto_vacuum'] == 'incremental'
+    assert health['free_pages'] == 0
+    assert health['last_result']['archived'] == 10
+    print(f"[✓] Storage optimized: {health['size_bytes']} bytes, {health['fragmentation']}% fragmented")
+
+    # 3. A second run appends a new member to the same archive
+    maintenance.run_maintenance(retention_days=0, max_rows=5, archive_path=archive_path)
+    with gzip.open(archive_path, 'rt') as f:
+        assert len(f.readlines()) == 15
+    print("[✓] Archive appended")
+
+    # 4. Only one scheduled run is claimed per interval
+    assert maintenance._claim_scheduled_run() is False
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.execute("UPDATE maintenance_state SET value = '2000-01-01T00:00:00' WHERE key = 'last_run'")
+    conn.commit()
+    conn.close()
+    assert maintenance._claim_scheduled_run() is True
+    assert maintenance._claim_scheduled_run() is False
+    print("[✓] Scheduled run claimed once")
+
+    # 5. Older databases are only rewritten by an explicit --vacuum, never by the scheduled run
+    legacy = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(legacy)
+    conn.execute('PRAGMA auto_vacuum = NONE')
+    conn.execute('CREATE TABLE placeholder (x)')
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(resume_db, 'DB_PATH', legacy)
+    resume_db.init_db()
+    maintenance.run_maintenance(retention_days=0, max_rows=0)
+    assert maintenance.get_db_health()['auto_vacuum'] == 'none'
+    manage.main(['--db', legacy, 'maintain', '--retention-days', '0', '--max-rows', '0', '--vacuum'])
+    assert maintenance.get_db_health()['auto_vacuum'] == 'incremental'
+    print("[✓] Full VACUUM only on request")
+
+    # 6. The archive is written before the write lock is taken
+    for i in range(3):
+        resume_db.save_analysis(f"old{i}.pdf", i, i, 80, [], {})
+    original_open = maintenance.gzip.open
+
+    def open_while_writable(*args, **kwargs):
+        probe = sqlite3.connect(legacy, timeout=0)
+        probe.execute('BEGIN IMMEDIATE')  # Fails with "database is locked" if maintenance holds the write lock
+        probe.rollback()
+        probe.close()
+        return original_open(*args, **kwargs)
+    monkeypatch.setattr(maintenance.gzip, 'open', open_while_writable)
+    assert maintenance.archive_expired(retention_days=0, max_rows=1, archive_path=archive_path) == 2
+    assert [item['filename'] for item in resume_db.get_history()] == ['old2.pdf']
+    print("[✓] Archive written outside the write lock")
+
+    # 7. Run Now is an operator action
+    import app as app_module
+    client = app_module.app.test_client()
+    assert client.post('/settings/maintenance', headers={'X-Forwarded-For': '203.0.113.9'}).status_code == 403
+    assert client.post('/settings/maintenance').status_code == 302
+    print("[✓] Maintenance POST guarded")
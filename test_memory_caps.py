@@ -0,0 +1,60 @@
+import io
+import json
+
+import docx
+
+from utils import resume_db, memprofile, parser, upload_store
+from utils.pipeline import STAGES
+
+PARAGRAPH = "Backend engineer who built Python and PostgreSQL services on AWS with Docker. " * 20
+JD = "We need a backend engineer skilled in Python, Kubernetes, Terraform, AWS and PostgreSQL."
+
+
+def upload(paragraphs):
+    document = docx.Document()
+    for _ in range(paragraphs):
+        document.add_paragraph(PARAGRAPH)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_memory_caps(tmp_path, monkeypatch):
+    from app import app
+    print("Testing input caps and memory accounting...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(parser, 'MAX_ANALYSIS_CHARS', 5000)
+    monkeypatch.setattr(memprofile, 'ENABLED', True)
+    resume_db.init_db()
+    client = app.test_client()
+
+    # 1. Truncation stops at a word boundary under the cap
+    original = PARAGRAPH * 10
+    text, truncated = parser.truncate_text(original)
+    assert truncated and len(text) <= 5000 and original.startswith(text) and original[len(text)].isspace()
+    assert parser.truncate_text("short") == ("short", False)
+    print(f"[✓] {len(PARAGRAPH) * 10} chars truncated to {len(text)}")
+
+    # 2. An oversized upload is analyzed from its first part, with a notice, and reports its memory peak
+    response = client.post('/analyze', data={'resume': (upload(40), 'long.docx'), 'job_description': JD})
+    assert response.status_code == 200
+    assert b'only the first part was analyzed' in response.data
+    assert float(response.headers['X-Memory-Peak-KB']) > 0 and int(response.headers['X-RSS-KB']) > 0
+    stored = resume_db.get_analysis_by_id(resume_db.get_history()[0]['id'])
+    assert stored['resume_stats']['char_count'] <= 5000
+    print(f"[✓] Peak {response.headers['X-Memory-Peak-KB']} KB, RSS {response.headers['X-RSS-KB']} KB")
+
+    # 3. Per-stage samples are kept per endpoint and streamed alongside timings
+    endpoint = client.get('/api/diagnostics').json['memory']['endpoints']['analyze']
+    assert endpoint['requests'] == 1 and set(STAGES) | {'parse', 'save'} <= set(endpoint['stage_max_peak_kb'])
+    sha256, path = upload_store.put(upload(40), '.docx')
+    job_id = resume_db.create_analysis_job('long.docx', path, JD + " Remote friendly.", sha256)
+    events = {}
+    for block in client.get(f'/analyze/stream/{job_id}/events').get_data(as_text=True).strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        events[fields['event']] = json.loads(fields['data'])
+    assert events['extraction']['truncated'] is True
+    assert all(events[stage]['memory']['peak_kb'] >= 0 for stage in STAGES)
+    assert events['done']['memory']['peak_kb'] > 0
+    print(f"[✓] Streamed stage peaks: {({stage: events[stage]['memory']['peak_kb'] for stage in STAGES})}")
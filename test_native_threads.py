@@ -0,0 +1,29 @@
+from threadpoolctl import threadpool_info
+
+from utils import native_threads
+
+
+def test_native_thread_budget(monkeypatch):
+    from app import app
+    print("Testing the native thread budget...")
+    monkeypatch.setattr(native_threads, 'available_cores', lambda: 16)
+    monkeypatch.delenv('NATIVE_THREADS', raising=False)
+
+    # 1. Cores are split across workers, never below one thread
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    assert native_threads.thread_budget() == (4, "16 cores / 4 workers")
+    monkeypatch.setenv('WEB_CONCURRENCY', '32')
+    assert native_threads.thread_budget()[0] == 1
+    monkeypatch.setenv('NATIVE_THREADS', '3')
+    assert native_threads.thread_budget() == (3, 'NATIVE_THREADS')
+    print("[✓] Budget derived from cores and workers, or set explicitly")
+
+    # 2. The budget caps the loaded BLAS/OpenMP pools and is reported per worker
+    monkeypatch.setenv('NATIVE_THREADS', '1')
+    monkeypatch.setattr(native_threads, '_controller', None)
+    with native_threads.limited():
+        assert all(pool['num_threads'] == 1 for pool in threadpool_info())
+    diagnostics = app.test_client().get('/api/diagnostics').get_json()
+    assert diagnostics['native_thread_budget'] == 1 and diagnostics['budget_applied']
+    assert diagnostics['threadpools']
+    print(f"[✓] Diagnostics: {len(diagnostics['threadpools'])} native pools at {diagnostics['native_thread_budget']} thread(s)")
@@ -0,0 +1,61 @@
+import sqlite3
+
+from utils import resume_db, page_cache
+
+RESULTS = {
+    'score': 72.5, 'ats_score': 64.0, 'health_score': 80.0,
+    'missing_skills': ['docker', 'kubernetes'],
+    'resume_stats': {'word_count': 420, 'char_count': 2600, 'bullet_count': 12, 'avg_words_per_sentence': 14},
+    'health_issues': ['Add a summary section'],
+    'filename': 'cv.pdf',
+}
+
+
+def test_page_cache(tmp_path, monkeypatch):
+    from app import app
+    print("Testing the rendered page cache...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(page_cache, 'ENABLED', True)
+    resume_db.init_db()
+    first_id = resume_db.save_analysis("first.pdf", 72.5, 64.0, 80.0, RESULTS['missing_skills'], RESULTS)
+    client = app.test_client()
+
+    # 1. The second view of each page is served without touching the history DB
+    for url in ('/dashboard', '/history', f'/view/{first_id}'):
+        assert client.get(url).headers['X-Page-Cache'] == 'miss'
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'missing' / 'history.db'))
+    monkeypatch.setattr(page_cache, 'PAGE_CACHE_PATH', page_cache.cache_path().replace('/missing', ''))
+    for url in ('/dashboard', '/history', f'/view/{first_id}'):
+        response = client.get(url)
+        assert response.status_code == 200 and response.headers['X-Page-Cache'] == 'hit'
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(page_cache, 'PAGE_CACHE_PATH', None)
+    print("[✓] Repeat views are cache hits")
+
+    # 2. Saving an analysis retires every cached page
+    resume_db.save_analysis("second.pdf", 61.0, 55.0, 70.0, ['go'], dict(RESULTS, filename='second.pdf'))
+    response = client.get('/history')
+    assert response.headers['X-Page-Cache'] == 'miss' and b'second.pdf' in response.data
+    print("[✓] Invalidated on save")
+
+    # 3. Deleting redirects with a flash message, which bypasses the cache
+    response = client.get(f'/delete/{first_id}', follow_redirects=True)
+    assert b'Analysis record deleted.' in response.data
+    assert 'X-Page-Cache' not in response.headers
+    response = client.get('/history')
+    assert response.headers['X-Page-Cache'] == 'miss' and b'first.pdf' not in response.data
+    assert client.get(f'/view/{first_id}').status_code == 302
+    print("[✓] Invalidated on delete; flashed pages bypass the cache")
+
+    # 4. A locked cache file costs the cache, not the request or the write
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    for name in ('lookup', 'store', 'bump_data_version'):
+        monkeypatch.setattr(page_cache, name, locked)
+    for url in ('/dashboard', '/history'):
+        response = client.get(url)
+        assert response.status_code == 200 and 'X-Page-Cache' not in response.headers
+    third_id = resume_db.save_analysis("third.pdf", 50.0, 50.0, 50.0, [], dict(RESULTS, filename='third.pdf'))
+    assert resume_db.get_analysis_by_id(third_id) is not None
+    resume_db.delete_history_item(third_id)
+    print("[✓] Cache errors fall back to live pages and never fail a write")
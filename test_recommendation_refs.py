@@ -0,0 +1,63 @@
+import json
+import sqlite3
+
+from utils import resume_db, skills_kb
+from utils.analyzer import SKILL_DB_VERSION, get_recommendations
+
+
+def test_recommendation_refs(tmp_path, monkeypatch):
+    print("Testing recommendation references...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+
+    missing_skills = ['docker', 'terraform']
+    results = {
+        'score': 42.0,
+        'missing_skills': missing_skills,
+        'recommendations': get_recommendations(missing_skills),
+    }
+
+    # 1. Only skill ids and the knowledge-base version are persisted
+    analysis_id = resume_db.save_analysis("cv.pdf", 42.0, 50, 60, missing_skills, results)
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    stored = json.loads(conn.execute('SELECT results_json FROM history WHERE id = ?', (analysis_id,)).fetchone()[0])
+    assert 'recommendations' not in stored
+    assert stored['recommendation_refs'] == {'kb_version': SKILL_DB_VERSION, 'skills': missing_skills}
+    print("[✓] Recommendations stored as references")
+
+    # 2. Loading rebuilds the same objects the analyzer produced
+    loaded = resume_db.get_analysis_by_id(analysis_id)
+    assert loaded['recommendations'] == results['recommendations']
+    assert 'recommendation_refs' not in loaded
+    print("[✓] Recommendations rehydrated on read")
+
+    # 3. Rows with embedded recommendations still load unchanged
+    legacy = dict(results, recommendations=[{'name': 'Docker', 'tips': 'legacy'}])
+    conn.execute(
+        'INSERT INTO history (filename, results_json) VALUES (?, ?)',
+        ("old.pdf", json.dumps(legacy)),
+    )
+    conn.commit()
+    legacy_id = conn.execute('SELECT MAX(id) FROM history').fetchone()[0]
+    conn.close()
+    assert resume_db.get_analysis_by_id(legacy_id)['recommendations'] == legacy['recommendations']
+    print("[✓] Legacy rows load unchanged")
+
+    # 4. After the knowledge base changes, old analyses still show the advice they were given
+    with open(skills_kb.KB_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+    data['version'] += 1
+    data['skills']['docker']['tips'] = 'Rewritten advice.'
+    reloaded = skills_kb.parse(json.dumps(data))
+    monkeypatch.setattr(skills_kb, 'current', lambda: reloaded)
+    assert resume_db.get_analysis_by_id(analysis_id)['recommendations'] == results['recommendations']
+    new_results = dict(results, recommendations=get_recommendations(missing_skills, reloaded))
+    new_id = resume_db.save_analysis("new.pdf", 42.0, 50, 60, missing_skills, new_results)
+    assert resume_db.get_analysis_by_id(new_id)['recommendations'][0]['tips'] == 'Rewritten advice.'
+    # Results computed before the reload no longer match the version in service, so they stay embedded
+    stale_id = resume_db.save_analysis("stale.pdf", 42.0, 50, 60, missing_skills, results)
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    stale = json.loads(conn.execute('SELECT results_json FROM history WHERE id = ?', (stale_id,)).fetchone()[0])
+    conn.close()
+    assert stale['recommendations'] == results['recommendations']
+    print("[✓] Recommendations follow the row's knowledge-base version")
@@ -0,0 +1,81 @@
+import os
+from types import SimpleNamespace
+
+from utils import resume_db, report_cache, skills_kb
+
+RESULTS = {
+    'score': 72.5, 'ats_score': 64.0, 'health_score': 80.0,
+    'missing_skills': ['docker', 'kubernetes'],
+    'resume_stats': {'word_count': 420, 'char_count': 2600, 'bullet_count': 12, 'avg_words_per_sentence': 14},
+    'health_issues': ['Add a summary section'],
+    'filename': 'cv.pdf',
+}
+
+
+def test_report_cache(tmp_path, monkeypatch):
+    from app import app
+    print("Testing cached PDF reports...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', str(tmp_path / 'reports'))
+    resume_db.init_db()
+    analysis_id = resume_db.save_analysis("cv.pdf", 72.5, 64.0, 80.0, RESULTS['missing_skills'], RESULTS)
+    client = app.test_client()
+
+    # 1. First download renders into the cache and carries validators
+    response = client.get(f'/download-report/{analysis_id}')
+    assert response.status_code == 200
+    assert response.data.startswith(b'%PDF')
+    assert response.headers['ETag'] and response.headers['Last-Modified']
+    assert os.path.exists(report_cache.cache_path(analysis_id))
+    print(f"[✓] Rendered {len(response.data)} bytes, ETag {response.headers['ETag']}")
+
+    # 2. Revalidation is answered with 304 and an identical repeat body
+    etag = response.headers['ETag']
+    assert client.get(f'/download-report/{analysis_id}', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(f'/download-report/{analysis_id}').data == response.data
+    print("[✓] Conditional GET returns 304")
+
+    # 3. Least recently used reports are evicted past the size cap
+    report_cache.put(analysis_id + 1, b'%PDF-stale')
+    os.utime(report_cache.cache_path(analysis_id + 1), (1, 1))
+    assert report_cache.evict(max_bytes=len(response.data)) == 1
+    assert report_cache.get(analysis_id + 1) is None and report_cache.get(analysis_id)
+    print("[✓] LRU eviction")
+
+    # 4. Deleting the analysis drops its cached report
+    client.get(f'/delete/{analysis_id}')
+    assert report_cache.get(analysis_id) is None
+    assert client.get(f'/download-report/{analysis_id}').status_code == 302
+    print("[✓] Invalidated on delete")
+
+    # 5. A report left behind by another database is never served for a missing row
+    report_cache.put(analysis_id + 5, b'%PDF-someone-else')
+    assert client.get(f'/download-report/{analysis_id + 5}').status_code == 302
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_DIR', None)
+    assert report_cache.cache_dir() == str(tmp_path / 'history.reports')
+    print("[✓] Cache belongs to its database")
+
+    # 6. Puts keep a running total and only scan the directory when it may be over the cap
+    scans = []
+    original_evict = report_cache.evict
+    monkeypatch.setattr(report_cache, 'evict', lambda: scans.append(1) or original_evict())
+    for i in range(10):
+        report_cache.put(1000 + i, b'%PDF' + b'x' * 1000)
+    assert len(scans) == 1  # The first put in a new directory takes its size
+    monkeypatch.setattr(report_cache, 'REPORT_CACHE_MAX_BYTES', 5000)
+    report_cache.put(2000, b'%PDF' + b'x' * 1000)
+    assert len(scans) == 2 and report_cache.get(1000) is None and report_cache.get(2000)
+    print("[✓] Scans only when over the cap")
+
+    # 7. A knowledge-base reload retires cached reports; a report evicted as soon as it was written is still served
+    analysis_id = resume_db.save_analysis("cv.pdf", 72.5, 64.0, 80.0, RESULTS['missing_skills'], RESULTS)
+    first = client.get(f'/download-report/{analysis_id}')
+    kb = skills_kb.current()
+    monkeypatch.setattr(skills_kb, 'current', lambda: SimpleNamespace(version=kb.version + 1, skills=kb.skills))
+    assert report_cache.get(analysis_id) is None
+    original_put = report_cache.put
+    monkeypatch.setattr(report_cache, 'put', lambda *args: original_put(*args) and os.remove(report_cache.cache_path(args[0])))
+    response = client.get(f'/download-report/{analysis_id}')
+    assert response.status_code == 200 and response.data.startswith(b'%PDF')
+    assert response.headers['ETag'] != first.headers['ETag'] and f"-kb{kb.version + 1}-" in response.headers['ETag']
+    print("[✓] Keyed by knowledge-base version; evicted renders served from memory")
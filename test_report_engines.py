@@ -0,0 +1,35 @@
+import pytest
+
+from utils import report, report_html
+
+RESULTS = {
+    'filename': '<script>cv</script>.pdf',
+    'score': 82.0, 'ats_score': 55.5, 'health_score': 70.0,
+    'missing_skills': [f"skill{i}" for i in range(17)],
+    'resume_stats': {'word_count': 420, 'bullet_count': 12},
+    'action_checklist': {'critical_fixes': ['Add a summary'], 'formatting': []},
+}
+
+
+def test_report_engines():
+    print("Testing report engines...")
+
+    # 1. The HTML template mirrors the ReportLab sections and escapes input
+    html = report_html.render_report_html(RESULTS)
+    assert '&lt;script&gt;cv&lt;/script&gt;.pdf' in html
+    assert '82.0%' in html and '⚠ Needs Work' in html
+    assert '<b>SKILL14</b>' in html and 'SKILL15' not in html and '...and 2 more' in html
+    assert 'Critical Fixes:' in html and 'Formatting:' not in html
+    print("[✓] report_pdf.html renders")
+
+    # 2. Engine selection: unknown names fail loudly, WeasyPrint falls back when missing
+    with pytest.raises(ValueError):
+        report._resolve_engine('latex')
+    expected = 'weasyprint' if report_html.AVAILABLE else 'reportlab'
+    assert report._resolve_engine('WeasyPrint') == expected
+    assert report.render_report(RESULTS, engine='reportlab').startswith(b'%PDF')
+    print(f"[✓] REPORT_ENGINE=weasyprint resolves to {expected}")
+
+    if report_html.AVAILABLE:
+        assert report.render_report(RESULTS, engine='weasyprint').startswith(b'%PDF')
+        print("[✓] WeasyPrint render")
@@ -0,0 +1,103 @@
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import docx
+import pytest
+
+from utils import resume_db, screening
+
+BACKEND_JD = "Backend engineer with Python, Flask, Docker, Kubernetes and PostgreSQL experience."
+DATA_JD = "Data scientist with Python, pandas, machine learning and SQL."
+
+
+def write_resume(path, text):
+    document = docx.Document()
+    for line in text.split('. '):
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def test_screening(tmp_path, monkeypatch):
+    print("Testing offline bulk screening...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+    resumes = tmp_path / 'resumes'
+    (resumes / 'batch2').mkdir(parents=True)
+    write_resume(resumes / 'alice.docx', "Experience. Built Flask APIs in Python with Docker. Education: BSc")
+    write_resume(resumes / 'bob.docx', "Experience. Data analysis in Python with pandas and SQL. Skills: statistics")
+    (resumes / 'broken.pdf').write_bytes(b'not a pdf')
+    (resumes / 'notes.txt').write_text("ignored")
+    jds = []
+    for name, text in (('backend', BACKEND_JD), ('data', DATA_JD)):
+        (tmp_path / f'{name}.txt').write_text(text)
+        jds.append(str(tmp_path / f'{name}.txt'))
+    output = str(tmp_path / 'results.csv')
+
+    # 1. Every resume x JD pair gets a row; unreadable files are reported, not fatal
+    stats = screening.run(str(resumes), jds, output, workers=2, save=True, batch_size=2, log=None)
+    assert stats == dict(stats, resumes=3, rows=6, errors=2, saved=4, skipped=0)
+    with open(output, newline='') as f:
+        rows = list(csv.DictReader(f))
+    by_pair = {(row['resume'], row['job_description']): row for row in rows}
+    assert set(by_pair) == {(r, j) for r in ('alice.docx', 'bob.docx', 'broken.pdf') for j in ('backend', 'data')}
+    assert 'kubernetes' in by_pair['alice.docx', 'backend']['missing_skills'].split(';')
+    assert by_pair['broken.pdf', 'data']['error'] == "could not extract text from the resume"
+    assert len(resume_db.get_history()) == 4
+    print(f"[✓] {stats['rows']} rows at {stats['resumes_per_sec']} resumes/s, 4 saved to the history")
+
+    # 2. A rerun only screens files the checkpoint has not seen
+    write_resume(resumes / 'batch2' / 'carol.docx', "Experience. Kubernetes and Docker operations. Skills: Python")
+    stats = screening.run(str(resumes), jds, output, workers=1, log=None)
+    assert stats['resumes'] == 1 and stats['skipped'] == 3 and stats['saved'] == 0
+    with open(output, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 8 and rows[-1]['resume'] == os.path.join('batch2', 'carol.docx')
+    assert screening.run(str(resumes), jds, output, log=None)['resumes'] == 0
+    print("[✓] Checkpoint resumes without redoing files")
+
+    # 3. Different job descriptions cannot resume this checkpoint; NDJSON keeps lists
+    with pytest.raises(screening.CheckpointError):
+        screening.run(str(resumes), jds[:1], output, log=None)
+    ndjson = str(tmp_path / 'results.ndjson')
+    screening.run(str(resumes), jds[:1], ndjson, workers=1, log=None)
+    with open(ndjson) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 4 and isinstance(records[0]['missing_skills'], list)
+    print("[✓] JD changes refused; NDJSON output")
+
+    # 4. A failing pair becomes an error row; a crashed task still checkpoints the work finished before it
+    monkeypatch.setattr(screening, 'ProcessPoolExecutor',
+                        lambda max_workers, mp_context, initializer, initargs: ThreadPoolExecutor(
+                            max_workers, initializer=initializer, initargs=initargs))
+    original_analyze, original_screen = screening.analyze_texts, screening.screen_resume
+
+    def analyze_texts(resume_text, jd_text, *args):
+        if 'pandas' in jd_text:
+            raise ValueError("model exploded")
+        return original_analyze(resume_text, jd_text, *args)
+
+    def screen_resume(directory, resume):
+        if resume == 'dave.docx':
+            raise RuntimeError("worker died")
+        return original_screen(directory, resume)
+
+    monkeypatch.setattr(screening, 'analyze_texts', analyze_texts)
+    monkeypatch.setattr(screening, 'screen_resume', screen_resume)
+    third = tmp_path / 'third'
+    third.mkdir()
+    for name in ('alice', 'bob', 'carol', 'dave'):
+        write_resume(third / f'{name}.docx', "Experience. Python and Docker services. Skills: SQL")
+    output = str(tmp_path / 'third.csv')
+    with pytest.raises(RuntimeError):
+        screening.run(str(third), jds, output, workers=1, batch_size=100, log=None)
+    with open(output, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert {row['resume'] for row in rows} == {'alice.docx', 'bob.docx', 'carol.docx'}
+    assert all(row['error'] == "analysis failed: ValueError: model exploded"
+               for row in rows if row['job_description'] == 'data')
+    assert all(not row['error'] for row in rows if row['job_description'] == 'backend')
+    monkeypatch.setattr(screening, 'screen_resume', original_screen)
+    assert screening.run(str(third), jds, output, workers=1, log=None)['resumes'] == 1
+    print("[✓] Pair errors recorded; finished work flushed before a crash")
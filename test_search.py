@@ -0,0 +1,39 @@
+from utils import resume_db
+
+
+def test_search(tmp_path, monkeypatch):
+    print("Testing full-text search...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+    assert resume_db.FTS5_AVAILABLE, "SQLite build lacks FTS5"
+
+    resume_db.save_analysis("platform.pdf", 80, 80, 80, [], {},
+                            resume_text="Built Kubernetes clusters\nprovisioned with Terraform <modules>.")
+    k8s_only = resume_db.save_analysis("k8s.pdf", 70, 70, 70, [], {}, resume_text="Operated kubernetes in production.")
+    resume_db.save_analysis("frontend.pdf", 60, 60, 60, ['kubernetes'], {}, resume_text="React and CSS.")
+
+    # 1. Every term must match; missing skills alone do not count as mentions
+    results = resume_db.search_history("kubernetes terraform")
+    assert [r['filename'] for r in results] == ["platform.pdf"]
+    assert '<mark>Terraform</mark>' in results[0]['snippet']
+    assert '&lt;modules&gt;' in results[0]['snippet']
+    print(f"[✓] Snippet: {results[0]['snippet']}")
+
+    # 2. Ranking and stemming
+    assert {r['filename'] for r in resume_db.search_history("kubernetes")} == {"platform.pdf", "k8s.pdf"}
+    assert resume_db.search_history("operating")[0]['filename'] == "k8s.pdf"
+    assert resume_db.search_history("frontend")[0]['filename'] == "frontend.pdf"
+    assert resume_db.search_history('"') == []
+    print("[✓] bm25 ranking, stemming and filename matches")
+
+    # 3. Deleted analyses drop out of the index; text survives export/import
+    resume_db.delete_history_item(k8s_only)
+    assert [r['filename'] for r in resume_db.search_history("kubernetes")] == ["platform.pdf"]
+    records = list(resume_db.iter_history_export())
+    assert records[0]['resume_text'].startswith("Built Kubernetes clusters provisioned")
+
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'copy.db'))
+    resume_db.init_db()
+    resume_db.import_history_records(records)
+    assert [r['filename'] for r in resume_db.search_history("terraform")] == ["platform.pdf"]
+    print("[✓] Index kept in sync on delete and import")
@@ -0,0 +1,117 @@
+import io
+import sqlite3
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import docx
+
+import app as app_module
+import manage
+from utils import analyzer, resume_db, shadow
+
+RESUME = ("Experience: Backend engineer at Acme. Built Python, Docker and PostgreSQL services on AWS. "
+          "Education: BSc. Skills: Python, SQL, Flask.")
+JD = "We need a backend engineer skilled in Python, Kubernetes, Terraform, AWS and PostgreSQL."
+
+
+def upload():
+    document = docx.Document()
+    document.add_paragraph(RESUME)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def broken_coverage(resume_text, jd_text):
+    raise RuntimeError("not implemented yet")
+
+
+CANDIDATE = SimpleNamespace(
+    calculate_similarity=lambda resume_text, jd_text: analyzer.calculate_similarity(resume_text, jd_text) + 5,
+    identify_missing_skills=lambda resume_text, jd_text, kb: (
+        set(analyzer.identify_missing_skills(resume_text, jd_text, kb)) - {'kubernetes'}) | {'cobol'},
+    calculate_keyword_coverage=broken_coverage,
+)
+
+
+def wait_for_shadow():
+    # One worker thread, first in first out: this runs after every queued comparison
+    shadow._executor.submit(lambda: None).result()
+
+
+def test_shadow(tmp_path, monkeypatch, capsys):
+    from app import app
+    print("Testing shadow engine comparison...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    monkeypatch.setitem(shadow.ENGINES, 'candidate', CANDIDATE)
+    monkeypatch.setattr(shadow, '_engines', {})
+    monkeypatch.setattr(shadow, 'ENGINE', 'candidate')
+    monkeypatch.setattr(shadow, 'SAMPLE_RATE', 1.0)
+    resume_db.init_db()
+    client = app.test_client()
+
+    # 1. A sampled upload is compared in the background; users still get the live results
+    response = client.post('/analyze', data={'resume': (upload(), 'cv.docx'), 'job_description': JD})
+    assert response.status_code == 200 and b'cobol' not in response.data
+    wait_for_shadow()
+    report = {row['function']: row for row in shadow.summary()}
+    similarity = report['calculate_similarity']
+    assert similarity['runs'] == 1 and similarity['changed_pct'] == 100 and similarity['mean_abs_delta'] == 5
+    assert similarity['live_ms']['p50'] > 0 and similarity['speedup'] is not None
+    skills = report['identify_missing_skills']
+    assert skills['top_only_live'] == [('kubernetes', 1)] and skills['top_only_candidate'] == [('cobol', 1)]
+    assert report['calculate_keyword_coverage']['errors'] == 1
+    assert report['calculate_keyword_coverage']['candidate_ms']['p50'] is None
+    print(f"[✓] Recorded: similarity +{similarity['mean_abs_delta']}, skills {skills['top_only_candidate']}")
+
+    # 2. Reused analyses are not compared again; unsampled or over-capacity requests cost nothing
+    client.post('/analyze', data={'resume': (upload(), 'cv.docx'), 'job_description': JD})
+    wait_for_shadow()
+    assert shadow.summary()[0]['runs'] == 1
+    monkeypatch.setattr(shadow, 'MAX_PENDING', 0)
+    assert shadow.maybe_compare(RESUME, JD) is None and shadow.stats()['dropped'] >= 1
+    monkeypatch.setattr(shadow, 'SAMPLE_RATE', 0.0)
+    monkeypatch.setattr(shadow, 'MAX_PENDING', 4)
+    assert shadow.maybe_compare(RESUME, JD) is None
+    print("[✓] Reuse, sampling and the pending cap")
+
+    # 3. The built-in unlemmatized similarity; reports by engine over HTTP and the CLI
+    rows = shadow.compare('plain', RESUME, JD)
+    assert [row['function'] for row in rows] == ['calculate_similarity'] and rows[0]['error'] is None
+    assert abs(rows[0]['delta']) < 20
+    payload = client.get('/api/shadow?engine=plain').get_json()
+    assert [row['engine'] for row in payload['report']] == ['plain'] and payload['sampling']['engine'] == 'candidate'
+    assert client.get('/api/diagnostics').get_json()['shadow']['sampled'] >= 1
+    capsys.readouterr()
+    manage.main(['--db', resume_db.DB_PATH, 'shadow-report'])
+    out = capsys.readouterr().out
+    assert 'identify_missing_skills' in out and 'only candidate: cobol (1)' in out
+    print(f"[✓] Report:\n{out}")
+
+    # 4. Aggregated in SQL over the last SHADOW_SUMMARY_DAYS days; older rows only on request
+    old = (datetime.now() - timedelta(days=30)).isoformat(timespec='seconds')
+    conn = sqlite3.connect(shadow.db_path())
+    conn.executemany(
+        "INSERT INTO shadow_runs (created_at, engine, function, chars, delta, only_live, only_candidate, live_ms, candidate_ms)"
+        " VALUES (?, 'bulk', 'identify_missing_skills', 100, ?, ?, '[]', ?, ?)",
+        [(old if i < 5 else datetime.now().isoformat(timespec='seconds'), i % 2, '["go"]' if i % 3 else '["go", "rust"]',
+          float(i), float(i) / 2) for i in range(25)],
+    )
+    conn.commit()
+    conn.close()
+    bulk = shadow.summary('bulk')[0]
+    assert bulk['runs'] == 20 and bulk['changed'] == 20 and bulk['mean_abs_delta'] == 0.5 and bulk['max_abs_delta'] == 1
+    assert bulk['live_ms'] == {'p50': 15.0, 'p95': 24.0} and bulk['candidate_ms']['p50'] == 7.5 and bulk['speedup'] == 2
+    assert bulk['top_only_live'] == [('go', 20), ('rust', 7)] and shadow.summary('bulk', top=1)[0]['top_only_live'] == [('go', 20)]
+    assert shadow.summary('bulk', days=0)[0]['runs'] == 25
+    assert client.get('/api/shadow?engine=bulk').get_json()['days'] == shadow.SUMMARY_DAYS
+    print(f"[✓] SQL summary: {bulk['runs']} of 25 rows in the window, live p50/p95 {bulk['live_ms']}")
+
+    # 5. Operator APIs refuse relayed requests, and need the token once one is set
+    assert client.get('/api/shadow', headers={'X-Forwarded-For': '203.0.113.9'}).status_code == 403
+    assert client.get('/api/diagnostics', environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 403
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 'secret')
+    assert client.get('/api/shadow').status_code == 403
+    assert client.get('/api/shadow', headers={'Authorization': 'Bearer secret'}).status_code == 200
+    print("[✓] /api/shadow and /api/diagnostics are operator-only")
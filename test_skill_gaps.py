@@ -0,0 +1,45 @@
+import json
+import sqlite3
+
+from utils import resume_db
+
+
+def test_skill_gaps(tmp_path, monkeypatch):
+    print("Testing normalized skill-gap table...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+
+    # 1. Rows that predate analysis_skills are backfilled from their JSON
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.execute('''
+        CREATE TABLE history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT, timestamp TEXT, score REAL,
+            ats_score REAL, health_score REAL, missing_skills TEXT, results_json TEXT
+        )
+    ''')
+    legacy_results = {'keyword_coverage': {'matched': ['python'], 'missing': ['rest']}}
+    conn.execute(
+        "INSERT INTO history (filename, timestamp, score, missing_skills, results_json) VALUES (?, ?, ?, ?, ?)",
+        ('old.pdf', '04/03/2026', 10, json.dumps(['Docker', 'aws']), json.dumps(legacy_results)),
+    )
+    conn.commit()
+    conn.close()
+
+    resume_db.init_db()
+    assert resume_db.get_top_skill_gaps(days=0) == [{'skill': 'aws', 'count': 1}, {'skill': 'docker', 'count': 1}]
+    assert resume_db.get_top_skill_gaps(days=0, kind='keyword_missing') == [{'skill': 'rest', 'count': 1}]
+    print("[✓] Legacy rows backfilled")
+
+    # 2. New analyses are indexed and counted within the window
+    resume_db.save_analysis("a.pdf", 50, 50, 50, ['docker', 'sql'], {})
+    analysis_id = resume_db.save_analysis("b.pdf", 50, 50, 50, ['docker'], {})
+    assert resume_db.get_top_skill_gaps(days=30) == [{'skill': 'docker', 'count': 2}, {'skill': 'sql', 'count': 1}]
+    assert resume_db.get_top_skill_gaps(days=0, limit=1) == [{'skill': 'docker', 'count': 3}]
+    print("[✓] Top skill gaps aggregated")
+
+    # 3. Deleting an analysis removes its skill rows
+    resume_db.delete_history_item(analysis_id)
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    assert conn.execute('SELECT COUNT(*) FROM analysis_skills WHERE analysis_id = ?', (analysis_id,)).fetchone()[0] == 0
+    conn.close()
+    assert resume_db.get_top_skill_gaps(days=30)[0] == {'skill': 'docker', 'count': 1}
+    print("[✓] Skill rows cleaned up on delete")
@@ -0,0 +1,69 @@
+import json
+import os
+import time
+
+import pytest
+
+from utils import skills_kb
+from utils.analyzer import identify_missing_skills, get_recommendations
+
+
+def write_kb(path, version, skills):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'version': version, 'skills': skills}, f)
+    os.replace(tmp, path)  # How deploys and editors replace the file
+
+
+def entry(**extra):
+    return dict({'tips': 'Practice.', 'resources': ['Docs'], 'interview': 'Explain it.'}, **extra)
+
+
+def test_skills_kb(tmp_path, monkeypatch):
+    print("Testing the skills knowledge base...")
+
+    # 1. The shipped file is valid, has no duplicates and resolves aliases
+    kb = skills_kb.load()
+    assert {'java', 'javascript', 'react', 'sql', 'kubernetes'} <= set(kb.skills)
+    assert 'roadmap' in kb.skills['docker'] and 'Day 1: JS basics and syntax' in kb.skills['javascript']['roadmap']
+    assert kb.find("Shipped JS and Postgres on k8s; also C++ and machine\nlearning") == {
+        'javascript', 'sql', 'kubernetes', 'c++', 'machine learning'
+    }
+    assert kb.find("JavaScript only") == {'javascript'}
+    missing = identify_missing_skills("Python and SQL", "Python, PostgreSQL, K8s and AWS", kb)
+    assert sorted(missing) == ['aws', 'kubernetes']
+    assert get_recommendations(['kubernetes'], kb)[0]['name'] == 'Kubernetes'
+    print(f"[✓] v{kb.version}: {kb.summary()['skills']} skills, {kb.summary()['aliases']} aliases")
+
+    # 2. Broken files are rejected with a reason
+    with pytest.raises(skills_kb.KnowledgeBaseError, match="duplicate key 'java'"):
+        skills_kb.parse('{"version": 1, "skills": {"java": {}, "java": {}}}')
+    with pytest.raises(skills_kb.KnowledgeBaseError, match="used by both"):
+        skills_kb.parse(json.dumps({'version': 1, 'skills': {'go': entry(aliases=['golang']), 'golang': entry()}}))
+    with pytest.raises(skills_kb.KnowledgeBaseError, match="missing 'tips'"):
+        skills_kb.parse(json.dumps({'version': 1, 'skills': {'go': {'resources': [], 'interview': ''}}}))
+    print("[✓] Duplicates, alias clashes and missing fields rejected")
+
+    # 3. Edits are picked up without a restart; a snapshot already handed out never changes
+    path = str(tmp_path / 'kb.json')
+    write_kb(path, 1, {'go': entry()})
+    monkeypatch.setattr(skills_kb, 'KB_PATH', path)
+    monkeypatch.setattr(skills_kb, 'CHECK_INTERVAL_SECONDS', 0)
+    monkeypatch.setattr(skills_kb, '_snapshot', None)
+    old = skills_kb.current()
+    assert old.version == 1 and old.find("golang services") == set()
+    write_kb(path, 2, {'go': entry(aliases=['golang']), 'rust': entry()})
+    started = time.perf_counter()
+    new = skills_kb.current()
+    reload_ms = (time.perf_counter() - started) * 1000
+    assert new.version == 2 and new.find("golang and rust") == {'go', 'rust'}
+    assert old.version == 1 and old.find("golang and rust") == set()
+    from utils.analyzer import SKILL_DB_VERSION
+    assert SKILL_DB_VERSION == 2
+    print(f"[✓] Reloaded v2 in {reload_ms:.2f} ms")
+
+    # 4. An invalid edit leaves the last good snapshot in service
+    with open(path, 'w') as f:
+        f.write('{"version": 3, "skills": {')
+    assert skills_kb.current() is new
+    print("[✓] Invalid file ignored")
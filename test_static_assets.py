@@ -0,0 +1,56 @@
+import gzip
+import re
+
+import brotli
+
+from utils import assets
+
+
+def test_static_assets(tmp_path):
+    from app import app
+    print("Testing fingerprinted static assets...")
+    client = app.test_client()
+
+    # 1. Pages link fingerprinted assets, served immutable and precompressed
+    page = client.get('/analyze_page').get_data(as_text=True)
+    style_url = re.search(r'/static/css/style\.[0-9a-f]{10}\.css', page).group(0)
+    assert re.search(r'/static/js/base\.[0-9a-f]{10}\.js', page)
+    with open('static/css/style.css', 'rb') as f:
+        original = f.read()
+    for accept, decode in (('gzip, deflate, br', brotli.decompress), ('gzip', gzip.decompress), ('', bytes)):
+        response = client.get(style_url, headers={'Accept-Encoding': accept})
+        assert response.headers['Cache-Control'] == assets.IMMUTABLE and 'Accept-Encoding' in response.vary
+        assert response.mimetype == 'text/css' and decode(response.data) == original
+        response.close()
+    response = client.get(style_url, headers={'Accept-Encoding': 'br'})
+    print(f"[✓] {style_url}: {len(original)} bytes, {len(response.data)} with brotli")
+    response.close()
+
+    # 2. Plain names still work, without the long cache lifetime
+    response = client.get('/static/css/style.css')
+    assert response.status_code == 200 and 'immutable' not in response.headers.get('Cache-Control', '')
+    response.close()
+    print("[✓] Unhashed names fall back to the normal static view")
+
+    # 3. Dynamic HTML is compressed only for clients that accept it
+    plain = client.get('/analyze_page')
+    compressed = client.get('/analyze_page', headers={'Accept-Encoding': 'gzip;q=1.0, br;q=0'})
+    assert 'Content-Encoding' not in plain.headers and compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data) == plain.data and 'Accept-Encoding' in plain.vary
+    assert 'Content-Encoding' not in client.get('/api/report-export/unknown-job', headers={'Accept-Encoding': 'br'}).headers
+    print(f"[✓] HTML {len(plain.data)} -> {len(compressed.data)} bytes gzip")
+
+    # 4. A rebuild after an edit drops the outdated outputs
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'uploads').mkdir()
+    (static / 'uploads' / 'cv.pdf').write_bytes(b'%PDF')
+    (static / 'css' / 'a.css').write_text("body { color: red; }\n" * 50)
+    first = assets.build(str(static))
+    (static / 'css' / 'a.css').write_text("body { color: blue; }\n" * 50)
+    second = assets.build(str(static))
+    assert list(first) == list(second) == ['css/a.css'] and first != second
+    built = sorted(p.name for p in (static / 'dist' / 'css').iterdir())
+    hashed = second['css/a.css'].split('/')[1]
+    assert built == [hashed, hashed + '.br', hashed + '.gz']
+    print("[✓] Rebuild replaces outdated outputs")
@@ -0,0 +1,68 @@
+import io
+import time
+
+import docx
+
+from utils import resume_db, pipeline
+from utils.analyzer import check_resume_health
+
+RESUME = ("Experience: Backend engineer at Acme, contact jane.doe@example.com. Built Python, Docker and "
+          "PostgreSQL services on AWS. Education: BSc. Skills: Python, SQL. Projects: billing API. ") * 400
+JD = "We need a backend engineer skilled in Python, Kubernetes, Terraform, AWS and PostgreSQL. " * 50
+
+
+def upload():
+    document = docx.Document()
+    document.add_paragraph(RESUME[:20000])
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_time_budget(tmp_path, monkeypatch):
+    from app import app
+    print("Testing time-budgeted analysis...")
+    monkeypatch.setattr(pipeline, '_rates', dict(pipeline._DEFAULT_RATES))
+
+    # 1. With time to spare nothing is degraded
+    full = pipeline.analyze_texts(RESUME, JD, 'cv.pdf')
+    assert full['degraded'] == {}
+    print(f"[✓] Full analysis of {len(RESUME)} chars within budget")
+
+    # 2. An exhausted budget cuts every stage but extraction down to the minimum
+    started = time.perf_counter()
+    cut = pipeline.analyze_texts(RESUME, JD, 'cv.pdf', pipeline.Budget(total_ms=0.001))
+    assert set(cut['degraded']) == set(pipeline.STAGE_SHARES)
+    assert all(f"first {pipeline.MIN_DEGRADED_CHARS:,} characters" in how for how in cut['degraded'].values())
+    assert cut['resume_stats'] == full['resume_stats']
+    assert set(cut['missing_skills']) <= set(full['missing_skills'])
+    print(f"[✓] Degraded run took {(time.perf_counter() - started) * 1000:.0f}ms: {cut['degraded']}")
+
+    # 3. A stage measured as slow is cut to what its share of the budget affords
+    monkeypatch.setitem(pipeline._rates, ('similarity', 'full'), 1.0)
+    degraded = pipeline.analyze_texts(RESUME, JD, 'cv.pdf', pipeline.Budget(total_ms=10000))
+    assert list(degraded['degraded']) == ['similarity']
+    assert pipeline._rates['similarity', 'full'] < 1.0
+    print("[✓] Measured rates drive the plan")
+
+    # 4. Text that made the email regex backtrack quadratically is now linear
+    started = time.perf_counter()
+    assert check_resume_health("a." * 30000)[1][0] == "Missing Email Address"
+    assert time.perf_counter() - started < 1
+    assert "Missing Email Address" not in check_resume_health(RESUME)[1]
+    print("[✓] Email check bounded")
+
+    # 5. Degraded results are flagged on the page and never reused for a repeat upload
+    monkeypatch.setattr(pipeline, '_rates', dict(pipeline._DEFAULT_RATES))
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+    client = app.test_client()
+    monkeypatch.setattr(pipeline, 'TIME_BUDGET_MS', 0.001)
+    response = client.post('/analyze', data={'resume': (upload(), 'cv.docx'), 'job_description': JD})
+    assert b'some checks were simplified' in response.data
+    monkeypatch.setattr(pipeline, 'TIME_BUDGET_MS', 10000)
+    response = client.post('/analyze', data={'resume': (upload(), 'cv.docx'), 'job_description': JD})
+    assert b'some checks were simplified' not in response.data
+    assert client.get('/api/diagnostics').json['time_budget']['degraded']['similarity'] >= 2
+    print("[✓] Flagged and not reused")
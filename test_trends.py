@@ -0,0 +1,55 @@
+import sqlite3
+from datetime import datetime
+
+from utils import resume_db
+
+
+def test_trends(tmp_path, monkeypatch):
+    print("Testing time-indexed trends...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+
+    # 1. Legacy rows written before created_at existed are backfilled
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.execute('''
+        CREATE TABLE history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, filename TEXT, timestamp TEXT, score REAL,
+            ats_score REAL, health_score REAL, missing_skills TEXT, results_json TEXT
+        )
+    ''')
+    conn.execute("INSERT INTO history (filename, timestamp, score) VALUES ('old.pdf', '04/03/2026', 10)")
+    conn.commit()
+    conn.close()
+
+    resume_db.init_db()
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    assert conn.execute('SELECT created_at FROM history').fetchone()[0] == '2026-03-04T00:00:00'
+    plan = conn.execute(
+        'EXPLAIN QUERY PLAN SELECT COUNT(*) FROM history WHERE created_at >= ?', ('2026-01-01',)
+    ).fetchall()
+    assert 'idx_history_created_at' in str(plan)
+    conn.close()
+    print("[✓] Legacy timestamps backfilled and indexed")
+
+    # 2. Daily buckets carry counts, averages and the p90 score
+    for score in range(10, 101, 10):
+        resume_db.save_analysis("cv.pdf", score, score, 80, [], {})
+
+    trends = resume_db.get_score_trends(days=7)
+    today = datetime.now().strftime('%Y-%m-%d')
+    assert [b['bucket'] for b in trends['daily']] == [today]
+    bucket = trends['daily'][0]
+    assert bucket['count'] == 10
+    assert bucket['avg_score'] == 55.0
+    assert bucket['p90_score'] == 90
+    assert sum(b['count'] for b in trends['weekly']) == 10
+    print(f"[✓] Trends computed: {bucket}")
+
+    # 3. Weeks are labelled by their Monday, so one spanning New Year is not split
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.executemany("INSERT INTO history (filename, created_at, score) VALUES ('cv.pdf', ?, 50)",
+                     [('2025-12-30T09:00:00',), ('2026-01-02T18:00:00',), ('2026-01-04T23:00:00',)])
+    conn.commit()
+    conn.close()
+    weekly = resume_db.get_score_trends(days=(datetime.now() - datetime(2025, 12, 29)).days + 1)['weekly']
+    assert weekly[0]['bucket'] == '2025-12-29' and weekly[0]['count'] == 3
+    print(f"[✓] Week of {weekly[0]['bucket']} kept whole")
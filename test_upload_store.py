@@ -0,0 +1,114 @@
+import io
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+import docx
+
+from utils import maintenance, resume_db, upload_store
+
+JD = "We need a backend engineer skilled in Python, Kubernetes, Terraform, AWS and PostgreSQL."
+
+
+def resume(text):
+    document = docx.Document()
+    document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def blobs():
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    rows = conn.execute('SELECT sha256, refcount, present FROM upload_blobs ORDER BY last_used, sha256').fetchall()
+    conn.close()
+    return rows
+
+
+def backdate(minutes, sha256=None):
+    last_used = (datetime.now() - timedelta(minutes=minutes)).isoformat(timespec='seconds')
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.execute('UPDATE upload_blobs SET last_used = ? WHERE ? IS NULL OR sha256 = ?', (last_used, sha256, sha256))
+    conn.commit()
+    conn.close()
+
+
+def test_upload_store(tmp_path, monkeypatch):
+    from app import app
+    print("Testing the content-addressed upload store...")
+    monkeypatch.setattr(resume_db, 'DB_PATH', str(tmp_path / 'history.db'))
+    resume_db.init_db()
+    client = app.test_client()
+    alice = resume(("Backend engineer. Experience: Python, Docker and AWS at Acme. Education: BSc. ") * 5)
+    bob = resume(("Data analyst. Experience: SQL and pandas at Initech. Education: MSc. ") * 5)
+
+    # 1. Identical uploads share one file outside static/; same-named different files do not collide
+    for content in (alice, alice, bob):
+        response = client.post('/analyze', data={'resume': (io.BytesIO(content), 'cv.docx'), 'job_description': JD})
+        assert response.status_code == 200
+    rows = {sha256: refcount for sha256, refcount, _ in blobs()}
+    assert sorted(rows.values()) == [1, 2]
+    stored = [os.path.join(root, name) for root, _, names in os.walk(upload_store.store_dir()) for name in names]
+    assert len(stored) == 2 and all(re.search(r'/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.docx$', path) for path in stored)
+    assert not upload_store.store_dir().startswith(app.static_folder)
+    print(f"[✓] 3 uploads stored as {len(stored)} files in {upload_store.store_dir()}")
+
+    # 2. The streaming path references its upload too
+    response = client.post('/analyze/stream', data={'resume': (io.BytesIO(bob), 'other.docx'), 'job_description': JD})
+    client.get(re.search(rb'EventSource\("([^"]+)"\)', response.data).group(1).decode()).get_data()
+    assert sorted(refcount for _, refcount, _ in blobs()) == [2, 2]
+    print("[✓] Streamed analyses hold a reference")
+
+    # 3. Deleting every row analyzed from a file frees it once the grace period is over
+    for item in resume_db.get_history():
+        if item['filename'] == 'other.docx' or item['id'] <= 2:
+            resume_db.delete_history_item(item['id'])
+    assert sorted(refcount for _, refcount, _ in blobs()) == [0, 1]
+    assert upload_store.collect()['removed'] == 0
+    backdate(60)
+    result = maintenance.run_maintenance(retention_days=0, max_rows=0, archive_path=str(tmp_path / 'archive.gz'))
+    assert result['uploads_removed'] == 1 and [refcount for _, refcount, _ in blobs()] == [1]
+    print("[✓] Unreferenced upload removed by maintenance")
+
+    # 4. Over the quota, the least recently used files are evicted and come back on re-upload
+    ids = []
+    for i in range(3):
+        sha256, path = upload_store.put(io.BytesIO(resume(f"Resume number {i}. " * 50)), '.docx')
+        ids.append(resume_db.save_analysis(f"cv{i}.docx", 50, 50, 50, [], {}, upload_sha256=sha256))
+        backdate(30 - i, sha256)  # Each upload newer than the last, all newer than bob's
+    sizes = [os.path.getsize(upload_store.blob_path(sha256, '.docx')) for sha256, _, _ in blobs()]
+    result = upload_store.collect(quota_bytes=sum(sizes[-2:]))
+    assert result['evicted'] == 2 and result['bytes'] <= sum(sizes[-2:])
+    assert [present for _, _, present in blobs()] == [0, 0, 1, 1]
+    assert resume_db.get_analysis_by_id(ids[0]) is not None
+    evicted = blobs()[0][0]
+    assert upload_store.put(io.BytesIO(bob), '.docx')[0] == evicted
+    assert dict((sha256, present) for sha256, _, present in blobs())[evicted] == 1
+    assert os.path.exists(upload_store.blob_path(evicted, '.docx'))
+    print(f"[✓] Evicted {result['evicted']} files to fit the quota; re-upload restored one")
+
+    # 5. An upload parked for a streamed analysis outlives the grace period until its job is claimed
+    sha256, path = upload_store.put(io.BytesIO(resume("Parked resume. " * 50)), '.docx')
+    job_id = resume_db.create_analysis_job('parked.docx', path, JD, upload_sha256=sha256)
+    backdate(30, sha256)
+    upload_store.collect(quota_bytes=1)
+    assert os.path.exists(path)
+    resume_db.claim_analysis_job(job_id)
+    upload_store.collect()
+    assert not os.path.exists(path)
+    print("[✓] Pending stream jobs hold their upload")
+
+    # 6. Files left in the old public folder are no longer served
+    legacy = os.path.join(app.static_folder, 'uploads')
+    created = not os.path.isdir(legacy)
+    os.makedirs(legacy, exist_ok=True)
+    try:
+        with open(os.path.join(legacy, 'old-cv.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4')
+        assert client.get('/static/uploads/old-cv.pdf').status_code == 404
+    finally:
+        os.remove(os.path.join(legacy, 'old-cv.pdf'))
+        if created:
+            os.rmdir(legacy)
+    print("[✓] static/uploads is not served")
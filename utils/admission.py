@@ -0,0 +1,189 @@
+"""Admission control for the CPU-heavy analysis routes.
+
+Three gates sit in front of every analysis:
+
+1. A per-client token bucket (ANALYSIS_RATE_PER_MINUTE, ANALYSIS_BURST),
+   kept in a SQLite file so every worker draws from the same bucket.
+2. ANALYSIS_CONCURRENCY analyses at a time per worker, with at most
+   `queue_depth()` more waiting up to ANALYSIS_QUEUE_TIMEOUT seconds. Running
+   plus queued analyses never occupy more than GUNICORN_THREADS minus
+   ADMISSION_RESERVED_THREADS threads, so a worker always has a thread left
+   for cheap pages such as the dashboard.
+3. ANALYSIS_INSTANCE_SLOTS analyses at a time across the whole instance,
+   enforced with one flock()ed file per slot (released by the kernel if a
+   worker dies holding one).
+
+A request that cannot get through raises `Busy` (or `RateLimited`) carrying a
+Retry-After estimate; the web layer turns those into 503 (or 429) responses.
+"""
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import native_threads
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so only the per-worker limit applies
+    fcntl = None
+
+ANALYSIS_CONCURRENCY = int(os.environ.get('ANALYSIS_CONCURRENCY', 1))
+ANALYSIS_INSTANCE_SLOTS = int(os.environ.get('ANALYSIS_INSTANCE_SLOTS', 0)) or native_threads.available_cores()
+ANALYSIS_QUEUE_TIMEOUT = float(os.environ.get('ANALYSIS_QUEUE_TIMEOUT', 10))
+RESERVED_THREADS = int(os.environ.get('ADMISSION_RESERVED_THREADS', 1))
+RATE_PER_MINUTE = float(os.environ.get('ANALYSIS_RATE_PER_MINUTE', 10))
+BURST = int(os.environ.get('ANALYSIS_BURST', 5))
+# Header carrying the real client address when behind a proxy, e.g. X-Forwarded-For or Fly-Client-IP
+CLIENT_HEADER = os.environ.get('ADMISSION_CLIENT_HEADER')
+ADMISSION_DIR = os.environ.get('ADMISSION_DIR') or os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'resumeflexx-admission'
+)
+INSTANCE_POLL_SECONDS = 0.05
+
+class Busy(Exception):
+    """The server is saturated; retry after `retry_after` seconds."""
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+class RateLimited(Busy):
+    """This client has used up its analysis allowance for now."""
+
+_cond = threading.Condition()
+_active = 0
+_waiting = 0
+_avg_seconds = 2.0  # Moving average of how long an analysis holds its slot
+_slot_files = {}
+_held_slots = set()
+_local = threading.local()
+
+def _reset_after_fork():
+    # Locks and flock()ed descriptors belong to the parent; the child starts empty
+    global _cond, _active, _waiting, _slot_files, _held_slots, _local
+    _cond = threading.Condition()
+    _active = _waiting = 0
+    _slot_files, _held_slots = {}, set()
+    _local = threading.local()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def queue_depth():
+    """Analyses allowed to wait in this worker; the rest are shed immediately."""
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+    return max(0, threads - RESERVED_THREADS - ANALYSIS_CONCURRENCY)
+
+def _retry_estimate():
+    return _avg_seconds * (_waiting + 1) / max(1, ANALYSIS_CONCURRENCY)
+
+def _acquire_instance_slot(deadline):
+    """Lock one of the instance-wide slot files, polling until the deadline."""
+    if fcntl is None or ANALYSIS_INSTANCE_SLOTS <= 0:
+        return None
+    os.makedirs(ADMISSION_DIR, exist_ok=True)
+    while True:
+        for slot in range(ANALYSIS_INSTANCE_SLOTS):
+            with _cond:
+                if slot in _held_slots:
+                    continue
+                if slot not in _slot_files:
+                    # Each process needs its own open file: flock() is per open file description
+                    _slot_files[slot] = open(os.path.join(ADMISSION_DIR, f"slot-{slot}.lock"), 'a')
+                try:
+                    fcntl.flock(_slot_files[slot], fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                _held_slots.add(slot)
+                return slot
+        if time.monotonic() >= deadline:
+            raise Busy("All analysis slots on this server are busy.", _retry_estimate())
+        time.sleep(INSTANCE_POLL_SECONDS)
+
+def _release_instance_slot(slot):
+    if slot is None:
+        return
+    with _cond:
+        fcntl.flock(_slot_files[slot], fcntl.LOCK_UN)
+        _held_slots.discard(slot)
+
+@contextmanager
+def analysis_slot():
+    """Hold an analysis slot for the block, queueing briefly or raising Busy."""
+    global _active, _waiting, _avg_seconds
+    deadline = time.monotonic() + ANALYSIS_QUEUE_TIMEOUT
+    with _cond:
+        if _active >= ANALYSIS_CONCURRENCY and _waiting >= queue_depth():
+            raise Busy("The analysis queue is full.", _retry_estimate())
+        _waiting += 1
+        try:
+            if not _cond.wait_for(lambda: _active < ANALYSIS_CONCURRENCY, timeout=deadline - time.monotonic()):
+                raise Busy("Timed out waiting for an analysis slot.", _retry_estimate())
+            _active += 1
+        finally:
+            _waiting -= 1
+    try:
+        slot = _acquire_instance_slot(deadline)
+    except Busy:
+        with _cond:
+            _active -= 1
+            _cond.notify()
+        raise
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _release_instance_slot(slot)
+        with _cond:
+            _active -= 1
+            _avg_seconds = 0.8 * _avg_seconds + 0.2 * (time.monotonic() - started)
+            _cond.notify()
+
+def _bucket_db():
+    path = os.path.join(ADMISSION_DIR, 'buckets.db')
+    if getattr(_local, 'path', None) == path:
+        return _local.conn
+    os.makedirs(ADMISSION_DIR, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('CREATE TABLE IF NOT EXISTS buckets (client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)')
+    _local.path, _local.conn = path, conn
+    return conn
+
+def charge(client):
+    """Take one analysis token from the client's bucket or raise RateLimited."""
+    if RATE_PER_MINUTE <= 0:
+        return
+    per_second = RATE_PER_MINUTE / 60
+    now = time.time()
+    conn = _bucket_db()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE client = ?', (client,)).fetchone()
+        tokens = BURST if row is None else min(BURST, row[0] + (now - row[1]) * per_second)
+        if tokens < 1:
+            raise RateLimited("Too many analyses from your address.", (1 - tokens) / per_second)
+        conn.execute('INSERT OR REPLACE INTO buckets (client, tokens, updated_at) VALUES (?, ?, ?)', (client, tokens - 1, now))
+        # A bucket that has refilled completely is the same as no bucket
+        conn.execute('DELETE FROM buckets WHERE updated_at < ?', (now - BURST / per_second,))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+
+def stats():
+    return {
+        'active': _active,
+        'waiting': _waiting,
+        'concurrency': ANALYSIS_CONCURRENCY,
+        'queue_depth': queue_depth(),
+        'instance_slots': ANALYSIS_INSTANCE_SLOTS if fcntl else None,
+        'instance_slots_held_here': sorted(_held_slots),
+        'avg_analysis_seconds': round(_avg_seconds, 2),
+        'rate_per_minute': RATE_PER_MINUTE,
+        'burst': BURST,
+    }
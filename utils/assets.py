@@ -0,0 +1,130 @@
+"""Fingerprinted, precompressed static assets.
+
+`build()` copies every file under static/ (except uploads and its own
+output) to static/dist/ under a name that carries a hash of its contents,
+e.g. css/style.3f2a9c1b04.css. Text assets also get a brotli (.br) and a
+zopfli gzip (.gz) copy at maximum compression. Outputs are named by
+content, so a file that has not changed is not compressed again on the
+next boot. The app rewrites `url_for('static', filename=...)` to the
+fingerprinted name. Those URLs change whenever the content does, so they
+are served with a one-year `immutable` cache lifetime. The precompressed
+copy matching the client's Accept-Encoding is sent as is.
+
+`compress_response()` handles dynamic pages: it brotli- or
+gzip-compresses HTML and JSON on the fly, at a fast level.
+"""
+import gzip
+import hashlib
+import os
+
+import brotli
+import zopfli.gzip
+
+ENABLED = os.environ.get('STATIC_FINGERPRINTS', '1') != '0'
+DIST_DIR = 'dist'
+SKIP_DIRS = {'uploads', DIST_DIR}
+HASH_LENGTH = 10
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml'}
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Dynamic responses: smaller ones are not worth the CPU, and brotli 5 / gzip 6 keep it to a few ms
+MIN_DYNAMIC_SIZE = 1024
+DYNAMIC_BROTLI_QUALITY = 5
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_MIMETYPES = {'text/html', 'application/json', 'text/csv', 'text/plain'}
+
+def fingerprinted_name(filename, digest):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _sources(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, '/'), path
+
+def build(static_folder):
+    """Fingerprint and precompress the static folder; returns {filename: fingerprinted filename}."""
+    dist = os.path.join(static_folder, DIST_DIR)
+    manifest = {}
+    for filename, path in _sources(static_folder):
+        with open(path, 'rb') as f:
+            data = f.read()
+        hashed = fingerprinted_name(filename, hashlib.sha256(data).hexdigest())
+        manifest[filename] = hashed
+        target = os.path.join(dist, hashed)
+        if os.path.exists(target):
+            continue
+        if os.path.splitext(filename)[1].lower() in COMPRESSIBLE:
+            variants = {
+                '.br': brotli.compress(data, mode=brotli.MODE_TEXT, quality=11),
+                '.gz': zopfli.gzip.compress(data),
+            }
+            for suffix, compressed in variants.items():
+                if len(compressed) < len(data):
+                    _write_atomic(target + suffix, compressed)
+        # The plain copy goes last: its presence marks the asset as fully built
+        _write_atomic(target, data)
+
+    # Drop outputs of earlier versions
+    keep = {hashed + suffix for hashed in manifest.values() for suffix in ('', *(s for _, s in ENCODINGS))}
+    for name, path in _sources(dist):
+        if name not in keep and not name.endswith('.tmp'):  # .tmp: another worker booting alongside
+            os.remove(path)
+    return manifest
+
+def accepted_encodings(accept_encoding):
+    """Encodings the client accepts (q > 0), from an Accept-Encoding header value."""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+def precompressed(path, accept_encoding):
+    """Pick the smallest precompressed copy the client accepts; returns (path, encoding or None)."""
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODINGS:
+        if (encoding in accepted or '*' in accepted) and os.path.exists(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+def compress_response(response, accept_encoding):
+    """Compress a finished, buffered HTML/JSON response in place if the client accepts it."""
+    if (response.direct_passthrough or response.is_streamed or response.status_code < 200
+            or response.status_code in (204, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in DYNAMIC_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < MIN_DYNAMIC_SIZE:
+        return response
+    accepted = accepted_encodings(accept_encoding)
+    if 'br' in accepted:
+        body, encoding = brotli.compress(data, mode=brotli.MODE_TEXT, quality=DYNAMIC_BROTLI_QUALITY), 'br'
+    elif 'gzip' in accepted:
+        body, encoding = gzip.compress(data, compresslevel=DYNAMIC_GZIP_LEVEL, mtime=0), 'gzip'
+    else:
+        return response
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    if response.get_etag()[0]:
+        # Different bytes need a different validator
+        response.set_etag(f"{response.get_etag()[0]}-{encoding}", weak=response.get_etag()[1])
+    return response
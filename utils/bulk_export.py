@@ -0,0 +1,189 @@
+"""Bulk PDF report export as a streamed ZIP archive.
+
+Reports missing from the report cache are rendered across a process pool,
+and every PDF is written into the archive as soon as it is ready. The ZIP is
+produced through a write-only stream whose chunks are handed straight to the
+response, so only the reports in flight are held in memory. Per-job progress
+lives in the export_jobs table, where any worker can answer progress polls.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from utils import resume_db, report_cache
+from utils.report import render_report
+
+EXPORT_WORKERS = int(os.environ.get('REPORT_EXPORT_WORKERS', min(4, os.cpu_count() or 1)))
+MAX_EXPORT_REPORTS = int(os.environ.get('REPORT_EXPORT_MAX', 1000))
+# Records are read in small batches so no long read transaction blocks writers
+READ_BATCH_SIZE = 50
+PROGRESS_EVERY_SECONDS = 0.5
+JOB_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+class _ChunkStream:
+    """Write-only sink; zipfile switches to data descriptors when it cannot seek."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: children must not inherit server threads or open SQLite handles
+            _pool = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def _reset_after_fork():
+    # Executor threads and queues do not survive fork; a preforked worker starts its own pool
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _entry_name(record):
+    stem = os.path.splitext(record.get('filename') or 'resume')[0]
+    return f"{record['id']:05d}_{re.sub(r'[^A-Za-z0-9._-]+', '_', stem)[:60]}.pdf"
+
+def _save_job(job_id, total, done, failed, status):
+    if not job_id:
+        return
+    now = datetime.now().isoformat(timespec='seconds')
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    try:
+        conn.execute(
+            '''INSERT INTO export_jobs (job_id, total, done, failed, status, started_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(job_id) DO UPDATE SET
+                   total = excluded.total, done = excluded.done, failed = excluded.failed,
+                   status = excluded.status, updated_at = excluded.updated_at''',
+            (job_id, total, done, failed, status, now, now),
+        )
+        if status == 'running' and done == 0:
+            # Forget jobs nobody has polled for a day
+            cutoff = (datetime.now() - timedelta(days=1)).isoformat(timespec='seconds')
+            conn.execute('DELETE FROM export_jobs WHERE updated_at < ?', (cutoff,))
+        conn.commit()
+    finally:
+        conn.close()
+
+def get_job(job_id):
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute('SELECT * FROM export_jobs WHERE job_id = ?', (job_id,)).fetchone()
+    conn.close()
+    if row is None:
+        return None
+    job = dict(row)
+    job['percent'] = round(100 * (job['done'] + job['failed']) / job['total']) if job['total'] else 100
+    return job
+
+def stream_reports_zip(ids, job_id=None):
+    """Yield the bytes of a ZIP archive holding one PDF report per analysis id.
+
+    Cached reports are copied in directly; the rest are rendered in the
+    process pool with at most two tasks queued per worker. Each finished
+    report is also stored in the report cache. An index.csv listing every
+    analysis (and whether its report failed) closes the archive.
+    """
+    ids = list(ids)
+    total = len(ids)
+    stream = _ChunkStream()
+    archive = zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED)
+    index = []
+    pending = {}
+    window = max(1, EXPORT_WORKERS * 2)
+    done = failed = 0
+    last_progress = 0.0
+
+    def finish(record, pdf_bytes):
+        nonlocal done, failed
+        status = 'ok'
+        if pdf_bytes is None:
+            failed += 1
+            status = 'failed'
+        else:
+            archive.writestr(_entry_name(record), pdf_bytes)
+            done += 1
+        index.append((record['id'], record['filename'], record['timestamp'], record['score'],
+                      record['ats_score'], record['health_score'], status))
+
+    def collect(block):
+        if block:
+            completed = wait(pending, return_when=FIRST_COMPLETED).done
+        else:
+            completed = [future for future in pending if future.done()]
+        for future in completed:
+            record = pending.pop(future)
+            try:
+                pdf_bytes = future.result()
+                report_cache.put(record['id'], pdf_bytes)
+            except Exception:
+                pdf_bytes = None
+            finish(record, pdf_bytes)
+
+    def progress(force=False):
+        nonlocal last_progress
+        now = time.monotonic()
+        if force or now - last_progress >= PROGRESS_EVERY_SECONDS:
+            last_progress = now
+            _save_job(job_id, total, done, failed, 'running')
+
+    _save_job(job_id, total, 0, 0, 'running')
+    try:
+        for start in range(0, total, READ_BATCH_SIZE):
+            for record in resume_db.get_export_records(ids[start:start + READ_BATCH_SIZE]):
+                cached = report_cache.open_report(record['id'])
+                if cached:
+                    with cached[0] as f:
+                        finish(record, f.read())
+                else:
+                    results = dict(record['results'], filename=record['filename'])
+                    pending[_get_pool().submit(render_report, results)] = record
+                    collect(block=len(pending) >= window)
+                yield stream.drain()
+                progress()
+        while pending:
+            collect(block=True)
+            yield stream.drain()
+            progress()
+
+        manifest = io.StringIO()
+        writer = csv.writer(manifest)
+        writer.writerow(['id', 'filename', 'timestamp', 'score', 'ats_score', 'health_score', 'report'])
+        writer.writerows(sorted(index))
+        archive.writestr('index.csv', manifest.getvalue())
+        archive.close()
+        yield stream.drain()
+        _save_job(job_id, total, done, failed, 'done')
+    except GeneratorExit:
+        # Client went away: drop queued renders and record the cancellation
+        for future in pending:
+            future.cancel()
+        _save_job(job_id, total, done, failed, 'cancelled')
+        raise
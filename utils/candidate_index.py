@@ -0,0 +1,281 @@
+"""Candidate retrieval: the stored resumes that best match a new job description.
+
+Every saved resume is turned into a sparse term vector by a hashing
+vectorizer (log term frequency, L2-normalised). Hashing needs no fitted
+vocabulary, so a resume can be added without touching the ones already
+indexed. Vectors are written as immutable sparse-matrix segments, one directory of
+.npy arrays each, beside the history database (CANDIDATE_INDEX_DIR).
+Segments of SMALL_SEGMENT_ROWS resumes or more are stored column by
+column, which makes them an inverted index: each term's column lists the
+resumes containing it.
+Queries memory-map them, so every worker shares one copy through the page
+cache, and a segment is never read again once loaded.
+
+A query weights the job description's terms by inverse document frequency
+and scores every resume with one sparse matrix-vector product per segment,
+then picks the top k with a partial sort. Each save adds a one-row segment;
+once more than MAX_SMALL_SEGMENTS small ones pile up they are merged into
+one, dropping resumes deleted from the history since. Results are always
+checked against the history, so deleted resumes never come back even
+before that happens. `rebuild()` (python manage.py reindex) rewrites the
+index from the stored resume texts.
+"""
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from utils import resume_db
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so merges are only serialized within the process
+    fcntl = None
+
+N_FEATURES = 2 ** 18
+SMALL_SEGMENT_ROWS = int(os.environ.get('CANDIDATE_INDEX_SMALL_SEGMENT_ROWS', 2000))
+MAX_SMALL_SEGMENTS = int(os.environ.get('CANDIDATE_INDEX_MAX_SMALL_SEGMENTS', 16))
+MAX_K = 100
+# Fetch a few spare hits so results deleted since the last merge can be skipped
+_SPARE_HITS = 20
+_SEGMENT_RE = re.compile(r'^seg-(\d{10})-(\d{10})$')
+_ARRAYS = ('ids', 'data', 'indices', 'indptr')
+
+# Fixed settings: stored vectors are only comparable with queries hashed the same way
+_vectorizer = HashingVectorizer(
+    n_features=N_FEATURES, alternate_sign=False, norm=None, stop_words='english', dtype=np.float32,
+)
+
+def index_dir():
+    """Directory holding the segments; follows resume_db.DB_PATH unless CANDIDATE_INDEX_DIR is set."""
+    return os.environ.get('CANDIDATE_INDEX_DIR') or os.path.splitext(resume_db.DB_PATH)[0] + '.index'
+
+def vectorize(texts):
+    """Log-tf, L2-normalised hashed term vectors, one CSR row per text."""
+    matrix = _vectorizer.transform(texts)
+    np.log1p(matrix.data, out=matrix.data)
+    return normalize(matrix, copy=False)
+
+class Segment:
+    """One immutable, memory-mapped block of resume vectors."""
+    __slots__ = ('name', 'inode', 'ids', 'matrix', 'sources', '_df')
+
+    def __init__(self, path, inode):
+        self.name = os.path.basename(path)
+        self.inode = inode
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in _ARRAYS}
+        self.ids = arrays['ids']
+        shape = (len(self.ids), N_FEATURES)
+        layout = sp.csc_matrix if len(arrays['indptr']) == N_FEATURES + 1 else sp.csr_matrix
+        self.matrix = layout((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape, copy=False)
+        try:
+            with open(os.path.join(path, 'sources')) as f:
+                self.sources = frozenset(f.read().split())
+        except FileNotFoundError:
+            self.sources = frozenset()
+        self._df = None
+
+    @property
+    def df(self):
+        """How many of this segment's resumes contain each feature."""
+        if self._df is None:
+            if self.matrix.format == 'csc':
+                self._df = np.diff(self.matrix.indptr)
+            else:
+                self._df = np.bincount(self.matrix.indices, minlength=N_FEATURES)
+        return self._df
+
+_lock = threading.Lock()
+_compact_lock = threading.Lock()  # Threads of one process; flock covers other processes
+_segments = {}
+_df_cache = (None, None)
+
+def _write_segment(directory, ids, matrix, sources=()):
+    """Write a segment under a temporary name and rename it into place."""
+    order = np.argsort(ids, kind='stable')
+    ids = np.asarray(ids, dtype=np.int64)[order]
+    # Large segments are stored by column, i.e. as posting lists: a query then
+    # reads only the columns of its own terms instead of every stored vector.
+    # Small ones stay by row, where a column pointer array would dwarf the data.
+    matrix = matrix[order]
+    matrix = matrix.tocsc() if len(ids) >= SMALL_SEGMENT_ROWS else matrix.tocsr()
+    matrix.sort_indices()
+    first, last = (ids[0], ids[-1]) if len(ids) else (0, 0)
+    if sources:
+        ranges = [_SEGMENT_RE.match(name).groups() for name in sources]
+        first, last = min(int(r[0]) for r in ranges), max(int(r[1]) for r in ranges)
+    name = f"seg-{first:010d}-{last:010d}"
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    os.makedirs(tmp)
+    try:
+        np.save(os.path.join(tmp, 'ids.npy'), ids)
+        np.save(os.path.join(tmp, 'data.npy'), matrix.data.astype(np.float32, copy=False))
+        np.save(os.path.join(tmp, 'indices.npy'), matrix.indices.astype(np.int32, copy=False))
+        np.save(os.path.join(tmp, 'indptr.npy'), matrix.indptr.astype(np.int64, copy=False))
+        if sources:
+            with open(os.path.join(tmp, 'sources'), 'w') as f:
+                f.write('\n'.join(sorted(sources)))
+        # A rename is atomic: readers see the whole segment or none of it
+        os.rename(tmp, os.path.join(directory, name))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return name
+
+def _live_segments(directory=None):
+    """Load any new segments and return the current set, minus those already merged into another."""
+    directory = directory or index_dir()
+    try:
+        entries = {entry.name: entry.inode() for entry in os.scandir(directory) if _SEGMENT_RE.match(entry.name)}
+    except FileNotFoundError:
+        entries = {}
+    paths = {os.path.join(directory, name): inode for name, inode in entries.items()}
+    with _lock:
+        for path in list(_segments):
+            if _segments[path].inode != paths.get(path):
+                del _segments[path]
+        for path, inode in paths.items():
+            if path not in _segments:
+                try:
+                    _segments[path] = Segment(path, inode)
+                except FileNotFoundError:
+                    continue  # Merged away while we were listing
+        segments = [_segments[path] for path in sorted(paths) if path in _segments]
+    merged = set().union(*(segment.sources for segment in segments))
+    return [segment for segment in segments if segment.name not in merged]
+
+def _document_frequencies(segments):
+    global _df_cache
+    key = tuple((segment.name, segment.inode) for segment in segments)
+    cached_key, df = _df_cache
+    if cached_key != key:
+        df = np.zeros(N_FEATURES, dtype=np.int64)
+        for segment in segments:
+            df += segment.df
+        _df_cache = (key, df)
+    return df
+
+def _remove_merged(directory, live):
+    """Delete inputs a merge left behind (a crash between writing it and cleaning up)."""
+    merged = set().union(*(segment.sources for segment in live))
+    for name in merged & set(os.listdir(directory)):
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+def add(ids, texts):
+    """Index resumes that were just committed to the history, as one new segment."""
+    pairs = [(analysis_id, text) for analysis_id, text in zip(ids, texts) if text and text.strip()]
+    if not pairs:
+        return None
+    directory = index_dir()
+    name = _write_segment(directory, [p[0] for p in pairs], vectorize([p[1] for p in pairs]))
+    compact(directory)
+    return name
+
+def compact(directory=None, force=False):
+    """Merge the small segments into one once there are too many; returns the new segment's name or None.
+
+    Only one process merges at a time; the others skip it rather than wait.
+    """
+    directory = directory or index_dir()
+    small = [s for s in _live_segments(directory) if len(s.ids) < SMALL_SEGMENT_ROWS]
+    if len(small) < 2 or (len(small) <= MAX_SMALL_SEGMENTS and not force):
+        return None
+    if not _compact_lock.acquire(blocking=False):
+        return None
+    try:
+        return _compact_locked(directory)
+    finally:
+        _compact_lock.release()
+
+def _compact_locked(directory):
+    with open(os.path.join(directory, 'compact.lock'), 'w') as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+        # Another process may have merged these since we listed them
+        live = _live_segments(directory)
+        _remove_merged(directory, live)
+        small = [s for s in live if len(s.ids) < SMALL_SEGMENT_ROWS]
+        if len(small) < 2:
+            return None
+        ids = np.concatenate([s.ids for s in small])
+        matrix = sp.vstack([s.matrix.tocsr() for s in small], format='csr')
+        existing = set()
+        for start in range(0, len(ids), 900):  # Stay under SQLite's bound-parameter limit
+            existing.update(resume_db.get_history_summaries(ids[start:start + 900].tolist()))
+        keep = np.isin(ids, list(existing))
+        name = _write_segment(directory, ids[keep], matrix[keep], sources=[s.name for s in small])
+        for segment in small:
+            shutil.rmtree(os.path.join(directory, segment.name), ignore_errors=True)
+    return name
+
+def top_k(job_description, k=10):
+    """The k stored resumes most similar to the job description, best first.
+
+    Each hit is the resume's history summary plus `similarity`, the cosine
+    between the IDF-weighted job description and the resume's term vector.
+    """
+    k = min(max(int(k), 1), MAX_K)
+    segments = _live_segments()
+    total = sum(len(segment.ids) for segment in segments)
+    if not total:
+        return []
+    query = vectorize([job_description or ''])
+    if not query.nnz:
+        return []
+    df = _document_frequencies(segments)
+    query.data *= np.log((1 + total) / (1 + df[query.indices])) + 1
+    query = normalize(query, copy=False).T.tocsc()
+
+    scores = np.concatenate([(segment.matrix @ query).toarray().ravel() for segment in segments])
+    ids = np.concatenate([segment.ids for segment in segments])
+    wanted = min(k + _SPARE_HITS, len(scores))
+    best = np.argpartition(-scores, wanted - 1)[:wanted]
+    best = best[np.lexsort((ids[best], -scores[best]))]
+    best = best[scores[best] > 0]
+
+    summaries = resume_db.get_history_summaries(int(ids[i]) for i in best)
+    hits = []
+    for i in best:
+        summary = summaries.get(int(ids[i]))
+        if summary is not None:
+            hits.append(dict(summary, similarity=round(float(scores[i]), 4)))
+            if len(hits) == k:
+                break
+    return hits
+
+def rebuild(batch_size=5000):
+    """Rewrite the whole index from the resume texts in the history; returns the number indexed."""
+    directory = index_dir()
+    fresh = directory + '.new'
+    shutil.rmtree(fresh, ignore_errors=True)
+    count = 0
+    for batch in resume_db.iter_resume_texts(batch_size):
+        ids, texts = zip(*batch)
+        _write_segment(fresh, ids, vectorize(texts))
+        count += len(batch)
+    os.makedirs(fresh, exist_ok=True)
+    old = directory + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old)
+    os.rename(fresh, directory)
+    shutil.rmtree(old, ignore_errors=True)
+    return count
+
+def stats():
+    segments = _live_segments()
+    return {
+        'directory': index_dir(),
+        'segments': len(segments),
+        'resumes': int(sum(len(segment.ids) for segment in segments)),
+        'nonzeros': int(sum(segment.matrix.nnz for segment in segments)),
+    }
@@ -0,0 +1,95 @@
+"""Near-duplicate resume detection with MinHash signatures and an LSH index.
+
+Each resume is reduced to the set of its word 5-gram shingles, and a
+128-value MinHash signature is stored with the analysis. The signature is
+cut into 16 bands of 8 values; resumes sharing any band hash land in the
+same LSH bucket, so a lookup only compares against that handful of
+candidates instead of every stored resume. With 16x8 bands, pairs at 80%
+Jaccard similarity collide with ~95% probability, pairs at 50% with ~6%.
+"""
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from utils import resume_db
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed: signatures are persisted, so the permutations must never change.
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 32) - 1, size=NUM_PERM, dtype=np.uint64)
+
+def shingles(text):
+    tokens = re.findall(r'\w+', (text or '').lower())
+    if len(tokens) <= SHINGLE_SIZE:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(text):
+    """Return the NUM_PERM-value MinHash signature of `text` as uint32s."""
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode('utf-8')) for s in shingles(text)),
+        dtype=np.uint64,
+    )
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    # Universal hashing (a*x + b) mod p; uint64 wrap-around is deterministic.
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+def band_hashes(signature):
+    """One signed 64-bit bucket key per band, as stored in lsh_buckets."""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].astype('<u4').tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'little', signed=True))
+    return keys
+
+def estimate_similarity(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+def content_hash(resume_text, jd_text):
+    """Exact-match key for reusing a previous analysis of the same inputs."""
+    from utils.analyzer import SKILL_DB_VERSION
+    payload = '\0'.join([
+        str(SKILL_DB_VERSION),
+        resume_db.normalize_resume_text(resume_text).lower(),
+        resume_db.normalize_resume_text(jd_text).lower(),
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def fingerprint(resume_text, jd_text=None):
+    """Everything save_analysis needs to index a resume for duplicate lookups."""
+    signature = minhash_signature(resume_text)
+    return {
+        'signature': signature.astype('<u4').tobytes(),
+        'bands': band_hashes(signature),
+        'content_hash': content_hash(resume_text, jd_text) if jd_text is not None else None,
+    }
+
+def find_near_duplicate(fp, threshold=SIMILARITY_THRESHOLD):
+    """Return {'analysis_id', 'similarity'} of the closest stored resume, or None.
+
+    Only analyses sharing at least one LSH bucket are compared, and their
+    estimated Jaccard similarity must reach `threshold`.
+    """
+    candidates = resume_db.get_lsh_candidates(fp['bands'])
+    if not candidates:
+        return None
+    signature = np.frombuffer(fp['signature'], dtype='<u4')
+    ids = [analysis_id for analysis_id, _ in candidates]
+    matrix = np.frombuffer(b''.join(blob for _, blob in candidates), dtype='<u4').reshape(len(ids), NUM_PERM)
+    similarities = (matrix == signature).mean(axis=1)
+    best = int(similarities.argmax())
+    if similarities[best] < threshold:
+        return None
+    return {'analysis_id': ids[best], 'similarity': round(float(similarities[best]) * 100)}
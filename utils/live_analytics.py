@@ -0,0 +1,89 @@
+"""Incremental writing analytics for the resume builder.
+
+Every builder section is summarised on its own as a small "partial":
+word, character, sentence and bullet counts, the action verbs it uses and
+its keyword counts. All of these add up across sections, so the analytics
+for the whole resume are a merge of the partials and an edit only needs the
+changed section recomputed. The server keeps no state: the builder page
+holds the partials and sends back those of the untouched sections with each
+update, so any worker can answer it.
+"""
+from collections import Counter
+
+from utils.analyzer import ACTION_VERBS, analyze_resume_stats, analyze_power_words, tokenize
+
+BUILDER_SECTIONS = ('summary', 'experience', 'education', 'projects', 'skills', 'certifications')
+MAX_SECTION_CHARS = 20000
+MAX_PARTIAL_TOKENS = 5000
+COUNT_FIELDS = ('words', 'chars', 'sentences', 'bullets')
+_ACTION_VERB_SET = frozenset(ACTION_VERBS)
+
+def section_partial(text):
+    """Summarise one section's text into mergeable counters."""
+    text = (text or '')[:MAX_SECTION_CHARS]
+    stats = analyze_resume_stats(text)
+    _, power_words = analyze_power_words(text)
+    return {
+        'words': stats['word_count'],
+        'chars': stats['char_count'],
+        'sentences': stats['sentence_count'],
+        'bullets': stats['bullet_count'],
+        'power_words': power_words,
+        'tokens': dict(Counter(tokenize(text))),
+    }
+
+def validate_partial(partial):
+    """Check a partial sent back by the client; raises ValueError if it is not one of ours."""
+    if not isinstance(partial, dict):
+        raise ValueError("partial must be an object")
+    for field in COUNT_FIELDS:
+        value = partial.get(field)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise ValueError(f"partial.{field} must be a non-negative integer")
+    power_words = partial.get('power_words')
+    if not isinstance(power_words, list) or not _ACTION_VERB_SET.issuperset(power_words):
+        raise ValueError("partial.power_words must list known action verbs")
+    tokens = partial.get('tokens')
+    if not isinstance(tokens, dict) or len(tokens) > MAX_PARTIAL_TOKENS or not all(
+        isinstance(count, int) and not isinstance(count, bool) and count > 0 for count in tokens.values()
+    ):
+        raise ValueError("partial.tokens must map words to positive counts")
+    return partial
+
+def merge_partials(partials, keyword_limit=10):
+    """Combine section partials into the analytics shown on the resume preview."""
+    totals = dict.fromkeys(COUNT_FIELDS, 0)
+    verbs = set()
+    tokens = Counter()
+    for partial in partials:
+        for field in COUNT_FIELDS:
+            totals[field] += partial[field]
+        verbs.update(partial['power_words'])
+        tokens.update(partial['tokens'])
+    power_words = [verb for verb in ACTION_VERBS if verb in verbs]
+    return {
+        'word_count': totals['words'],
+        'char_count': totals['chars'],
+        'sentence_count': totals['sentences'],
+        'avg_words_per_sentence': round(totals['words'] / totals['sentences'], 1) if totals['sentences'] else 0,
+        'bullet_count': totals['bullets'],
+        'power_word_count': len(power_words),
+        'power_words': power_words,
+        # Ties broken alphabetically: partials lose their key order on the JSON round trip
+        'keywords': sorted(tokens, key=lambda word: (-tokens[word], word))[:keyword_limit],
+    }
+
+def update(changed, partials):
+    """Recompute the changed sections only; returns (their new partials, merged analytics).
+
+    `changed` maps section -> current text, `partials` maps section -> the
+    client's stored partial for sections that did not change.
+    """
+    fresh = {section: section_partial(text) for section, text in changed.items() if section in BUILDER_SECTIONS}
+    current = []
+    for section in BUILDER_SECTIONS:
+        if section in fresh:
+            current.append(fresh[section])
+        elif section in partials:
+            current.append(validate_partial(partials[section]))
+    return fresh, merge_partials(current)
@@ -0,0 +1,206 @@
+"""Retention, archival and storage upkeep for the history database.
+
+Expired rows (older than HISTORY_RETENTION_DAYS, or beyond the newest
+HISTORY_MAX_ROWS) are appended to a gzip NDJSON sidecar in the same format as
+`manage.py export`, deleted, and the freed pages are returned to the OS with
+incremental VACUUM before the planner statistics are refreshed with ANALYZE.
+Databases from before incremental auto-vacuum are converted only by
+`manage.py maintain --vacuum`.
+Uploaded files no longer referenced by any row are removed afterwards, and
+the upload store is brought back under its quota.
+"""
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from utils import resume_db, report_cache, page_cache, upload_store
+
+RETENTION_DAYS = int(os.environ.get('HISTORY_RETENTION_DAYS', 0))
+MAX_ROWS = int(os.environ.get('HISTORY_MAX_ROWS', 0))
+ARCHIVE_PATH = os.environ.get('HISTORY_ARCHIVE_PATH', 'resume_history.archive.ndjson.gz')
+INTERVAL_HOURS = float(os.environ.get('MAINTENANCE_INTERVAL_HOURS', 24))
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+CHECK_EVERY_SECONDS = 60
+ARCHIVE_BATCH_SIZE = 500
+
+_next_check = 0.0
+_lock = threading.Lock()
+
+def get_db_health():
+    """Report file size, page usage, retention settings and upload storage for the settings page."""
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    cursor = conn.cursor()
+    page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+    page_count = cursor.execute('PRAGMA page_count').fetchone()[0]
+    freelist_count = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+    auto_vacuum = cursor.execute('PRAGMA auto_vacuum').fetchone()[0]
+    rows = cursor.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+    state = dict(cursor.execute('SELECT key, value FROM maintenance_state').fetchall())
+    conn.close()
+    uploads = upload_store.stats()
+
+    return {
+        'size_bytes': page_size * page_count,
+        'page_size': page_size,
+        'page_count': page_count,
+        'free_pages': freelist_count,
+        'fragmentation': round(100 * freelist_count / page_count, 1) if page_count else 0,
+        'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum),
+        'rows': rows,
+        'retention_days': RETENTION_DAYS,
+        'max_rows': MAX_ROWS,
+        'archive_path': ARCHIVE_PATH,
+        'archive_bytes': os.path.getsize(ARCHIVE_PATH) if os.path.exists(ARCHIVE_PATH) else 0,
+        'upload_files': uploads['files'],
+        'upload_bytes': uploads['bytes'],
+        'upload_quota_bytes': uploads['quota_bytes'],
+        'last_run': state.get('last_run'),
+        'last_result': json.loads(state['last_result']) if state.get('last_result') else None,
+    }
+
+def _expired_where(retention_days, max_rows):
+    clauses, params = [], []
+    if retention_days:
+        clauses.append('created_at < ?')
+        params.append(resume_db._window_start(retention_days))
+    if max_rows:
+        # Everything at or below the (max_rows + 1)-th newest id; NULL (no match)
+        # while the table is still under the cap.
+        clauses.append('id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)')
+        params.append(max_rows)
+    if not clauses:
+        return None, ()
+    return 'WHERE ' + ' OR '.join(clauses), tuple(params)
+
+def archive_expired(retention_days=None, max_rows=None, archive_path=None):
+    """Move expired rows into the archive and delete them; returns the row count.
+
+    The archive is written and fsynced before any write lock is taken, and
+    only then are the archived ids deleted in one short transaction. So a
+    crash can at worst leave a row both archived and live, never lost, and
+    requests are not held up while the archive is compressed.
+    """
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    max_rows = MAX_ROWS if max_rows is None else max_rows
+    archive_path = archive_path or ARCHIVE_PATH
+    where, params = _expired_where(retention_days, max_rows)
+    if where is None:
+        return 0
+
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    try:
+        ids = [row[0] for row in conn.execute(f'SELECT id FROM history {where} ORDER BY id', params)]
+    finally:
+        conn.close()
+    if not ids:
+        return 0
+    # Each run appends a new gzip member; gzip readers concatenate them.
+    with gzip.open(archive_path, 'at', encoding='utf-8') as archive:
+        # One short read per batch, so no read lock is held while compressing
+        for start in range(0, len(ids), ARCHIVE_BATCH_SIZE):
+            for record in resume_db.get_export_records(ids[start:start + ARCHIVE_BATCH_SIZE]):
+                archive.write(json.dumps(record) + '\n')
+    with open(archive_path, 'rb') as f:
+        os.fsync(f.fileno())
+
+    conn = sqlite3.connect(resume_db.DB_PATH, timeout=30)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        resume_db._delete_analyses(cursor, ids)
+        conn.commit()
+    finally:
+        conn.close()
+    report_cache.invalidate(ids)
+    page_cache.bump_data_version()
+    return len(ids)
+
+def optimize_storage(convert=False):
+    """Return free pages to the filesystem and refresh planner statistics.
+
+    New databases are created with incremental auto-vacuum, so this only
+    touches the freelist. Databases created before that need one full VACUUM
+    to switch modes. It rewrites the whole file under an exclusive lock, so it
+    only runs when asked for (`convert`, i.e. `manage.py maintain --vacuum`),
+    never from the scheduled run inside a web worker.
+    """
+    conn = sqlite3.connect(resume_db.DB_PATH, isolation_level=None)
+    try:
+        freed = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            # execute() would stop after the first freed page; a script is stepped to the end
+            conn.executescript('PRAGMA incremental_vacuum')
+        elif convert:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            freed = 0
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    return freed
+
+def run_maintenance(retention_days=None, max_rows=None, archive_path=None, vacuum=False):
+    started = time.perf_counter()
+    archived = archive_expired(retention_days, max_rows, archive_path)
+    freed_pages = optimize_storage(convert=vacuum)
+    uploads = upload_store.collect()
+    result = {
+        'archived': archived,
+        'freed_pages': freed_pages,
+        'uploads_removed': uploads['removed'] + uploads['evicted'],
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    conn.executemany(
+        'INSERT OR REPLACE INTO maintenance_state (key, value) VALUES (?, ?)',
+        [('last_run', datetime.now().isoformat(timespec='seconds')), ('last_result', json.dumps(result))],
+    )
+    conn.commit()
+    conn.close()
+    return result
+
+def _claim_scheduled_run():
+    """Atomically mark a run as started if the interval has elapsed.
+
+    Every worker polls, but BEGIN IMMEDIATE lets only one of them claim the run.
+    """
+    now = datetime.now()
+    due_before = datetime.fromtimestamp(now.timestamp() - INTERVAL_HOURS * 3600).isoformat(timespec='seconds')
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        row = cursor.execute("SELECT value FROM maintenance_state WHERE key = 'last_run'").fetchone()
+        if row and row[0] >= due_before:
+            return False
+        cursor.execute(
+            "INSERT OR REPLACE INTO maintenance_state (key, value) VALUES ('last_run', ?)",
+            (now.isoformat(timespec='seconds'),),
+        )
+        conn.commit()
+        return True
+    finally:
+        conn.close()
+
+def run_if_due():
+    if INTERVAL_HOURS > 0 and _claim_scheduled_run():
+        run_maintenance()
+
+def schedule():
+    """Cheap per-request hook: at most once a minute, check for a due run in the background."""
+    global _next_check
+    now = time.monotonic()
+    if now < _next_check or not _lock.acquire(blocking=False):
+        return
+    try:
+        _next_check = now + CHECK_EVERY_SECONDS
+        threading.Thread(target=run_if_due, name='history-maintenance', daemon=True).start()
+    finally:
+        _lock.release()
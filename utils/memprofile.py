@@ -0,0 +1,102 @@
+"""Opt-in memory accounting per request and per analysis stage.
+
+With MEMORY_PROFILE=1, tracemalloc follows Python allocations and each
+`stage()` block records its allocation peak above the level it started at,
+what it left allocated, and the process RSS afterwards. `begin()` and
+`end()` bracket one request on the current thread. They produce the
+request's overall peak, which the app adds to response headers, the log
+and /api/diagnostics.
+
+tracemalloc is process-wide, so concurrent requests in one worker inflate
+each other's peaks. With the default ANALYSIS_CONCURRENCY=1, analyses
+never overlap within a worker. Tracing roughly doubles allocation cost,
+so leave it off in production unless you are investigating memory.
+"""
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENABLED = os.environ.get('MEMORY_PROFILE', '0') == '1'
+
+_local = threading.local()
+_lock = threading.Lock()
+_endpoints = {}
+
+def rss_kb():
+    """Current resident set size of this process in KiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+def _kb(size):
+    return round(size / 1024, 1)
+
+def begin():
+    """Start accounting for a request on this thread."""
+    if not ENABLED:
+        return
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    _local.base, _ = tracemalloc.get_traced_memory()
+    _local.peak = _local.base
+    _local.stages = {}
+
+@contextmanager
+def stage(name):
+    """Measure one stage; the yielded dict is filled in when the block exits."""
+    sample = {}
+    if not ENABLED or not hasattr(_local, 'stages'):
+        yield sample
+        return
+    before, peak_so_far = tracemalloc.get_traced_memory()
+    _local.peak = max(_local.peak, peak_so_far)  # reset_peak() below would forget it
+    tracemalloc.reset_peak()
+    try:
+        yield sample
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        _local.peak = max(_local.peak, peak)
+        sample.update(peak_kb=_kb(peak - before), retained_kb=_kb(current - before), rss_kb=rss_kb())
+        _local.stages[name] = sample
+
+def sample(name):
+    """The finished sample for a stage of the current request, or None."""
+    stages = getattr(_local, 'stages', None)
+    return stages.get(name) if stages else None
+
+def end(endpoint=None):
+    """Finish the request on this thread and return its summary (None when profiling is off)."""
+    if not ENABLED or not hasattr(_local, 'stages'):
+        return None
+    _, peak = tracemalloc.get_traced_memory()
+    summary = {
+        'peak_kb': _kb(max(_local.peak, peak) - _local.base),
+        'rss_kb': rss_kb(),
+        'stages': _local.stages,
+    }
+    del _local.stages
+    if endpoint:
+        with _lock:
+            stats = _endpoints.setdefault(endpoint, {'requests': 0, 'max_peak_kb': 0, 'max_rss_kb': 0})
+            stats['requests'] += 1
+            stats['last_peak_kb'] = summary['peak_kb']
+            stats['max_peak_kb'] = max(stats['max_peak_kb'], summary['peak_kb'])
+            stats['max_rss_kb'] = max(stats['max_rss_kb'], summary['rss_kb'] or 0)
+            for name, values in summary['stages'].items():
+                stage_max = stats.setdefault('stage_max_peak_kb', {})
+                stage_max[name] = max(stage_max.get(name, 0), values['peak_kb'])
+    return summary
+
+def stats():
+    with _lock:
+        endpoints = {name: dict(values) for name, values in _endpoints.items()}
+    return {'enabled': ENABLED, 'rss_kb': rss_kb(), 'endpoints': endpoints}
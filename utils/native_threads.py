@@ -0,0 +1,76 @@
+"""Per-worker budget for native BLAS/OpenMP threads.
+
+numpy, scipy and scikit-learn each size their native thread pools to the
+whole machine, so N server workers on an M-core box can run N*M math threads
+at once. Each worker is instead given `cores // workers` threads (at least
+one), or exactly NATIVE_THREADS when that is set. The budget is exported as
+OMP_NUM_THREADS & co. before the libraries load, applied with threadpoolctl
+when a worker starts, and re-asserted around every analyzer stage.
+"""
+import os
+from contextlib import contextmanager
+
+from threadpoolctl import ThreadpoolController
+
+ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'BLIS_NUM_THREADS')
+
+_controller = None
+_budget = None
+
+def available_cores():
+    try:
+        # Respects container CPU sets / taskset, unlike os.cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def worker_count():
+    return max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+
+def thread_budget():
+    """Return (threads per worker, human-readable source of that number)."""
+    explicit = os.environ.get('NATIVE_THREADS')
+    if explicit:
+        return max(1, int(explicit)), 'NATIVE_THREADS'
+    cores, workers = available_cores(), worker_count()
+    return max(1, cores // workers), f"{cores} cores / {workers} workers"
+
+def export_env_defaults():
+    """Seed the thread-count variables BLAS/OpenMP read at load time (explicit settings win)."""
+    budget, _ = thread_budget()
+    for var in ENV_VARS:
+        os.environ.setdefault(var, str(budget))
+    return budget
+
+def apply_worker_budget():
+    """Cap every loaded native thread pool at this worker's budget; call once per worker."""
+    global _controller, _budget
+    _budget, _ = thread_budget()
+    # Created after the numeric libraries are imported so it sees all of their pools
+    _controller = ThreadpoolController()
+    _controller.limit(limits=_budget)
+    return _budget
+
+@contextmanager
+def limited():
+    """Hold the native pools at the worker budget while the block runs."""
+    if _controller is None:
+        apply_worker_budget()
+    with _controller.limit(limits=_budget):
+        yield
+
+def diagnostics():
+    budget, source = thread_budget()
+    controller = _controller or ThreadpoolController()
+    return {
+        'pid': os.getpid(),
+        'cores': available_cores(),
+        'workers': worker_count(),
+        'native_thread_budget': budget,
+        'budget_source': source,
+        'budget_applied': _controller is not None,
+        'threadpools': [
+            {key: pool.get(key) for key in ('user_api', 'internal_api', 'prefix', 'version', 'num_threads')}
+            for pool in controller.info()
+        ],
+    }
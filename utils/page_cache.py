@@ -0,0 +1,95 @@
+"""Rendered-page cache shared by every worker through a small SQLite file.
+
+Pages are stored under their request path together with the data version
+they were rendered from. Every write to the history (save, delete, import,
+retention) bumps the version after it commits, which retires all cached
+pages at once; a lookup only returns a page whose version is still current,
+in a single query that never touches the history database.
+
+Readers must take the version *before* querying the history and store the
+page under that version: a page rendered from pre-write data is then filed
+under a version that is already retired, so it is never served.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from utils import resume_db
+
+PAGE_CACHE_PATH = os.environ.get('PAGE_CACHE_PATH')
+TTL_SECONDS = int(os.environ.get('PAGE_CACHE_TTL_SECONDS', 600))
+MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 500))
+ENABLED = os.environ.get('PAGE_CACHE', '1') != '0'
+
+_local = threading.local()
+
+def cache_path():
+    # Next to the history database by default, so a different DB never sees another's pages
+    return PAGE_CACHE_PATH or os.path.splitext(resume_db.DB_PATH)[0] + '.pages.db'
+
+def _reset_after_fork():
+    global _local
+    _local = threading.local()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _connection():
+    """One connection per thread, reopened when the cache path changes.
+
+    Opening a WAL database costs more than the lookup itself, so a hit would
+    otherwise be slower than rendering a small page from scratch.
+    """
+    path = cache_path()
+    if getattr(_local, 'path', None) == path:
+        return _local.conn
+    conn = sqlite3.connect(path, timeout=5)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')  # losing a cached page in a crash is harmless
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            key TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            body BLOB NOT NULL,
+            stored_at REAL NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_stored_at ON pages (stored_at)')
+    conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 1)")
+    conn.commit()
+    if getattr(_local, 'conn', None) is not None:
+        _local.conn.close()
+    _local.path, _local.conn = path, conn
+    return conn
+
+def lookup(key):
+    """Return (current data version, cached body or None)."""
+    row = _connection().execute(
+        '''SELECT meta.value, pages.body
+           FROM meta LEFT JOIN pages
+             ON pages.key = ? AND pages.version = meta.value AND pages.stored_at > ?
+           WHERE meta.key = 'data_version' ''',
+        (key, time.time() - TTL_SECONDS),
+    ).fetchone()
+    return row[0], row[1]
+
+def store(key, version, body):
+    conn = _connection()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO pages (key, version, body, stored_at) VALUES (?, ?, ?, ?)',
+            (key, version, body, time.time()),
+        )
+        conn.execute(
+            'DELETE FROM pages WHERE key IN (SELECT key FROM pages ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+            (MAX_ENTRIES,),
+        )
+
+def bump_data_version():
+    """Retire every cached page; call after a write to the history has committed."""
+    conn = _connection()
+    with conn:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+        conn.execute("DELETE FROM pages WHERE version < (SELECT value FROM meta WHERE key = 'data_version')")
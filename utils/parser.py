@@ -2,32 +2,53 @@ import PyPDF2
 import docx
 import os
 
-def extract_text_from_pdf(pdf_path):
-    text = ""
+# Longest text the analyzers are given; spaCy, TF-IDF and the stored results all scale with it
+MAX_ANALYSIS_CHARS = int(os.environ.get('MAX_ANALYSIS_CHARS', 60000))
+
+def extract_text_from_pdf(pdf_path, max_chars=None):
+    parts, size = [], 0
     try:
         with open(pdf_path, 'rb') as file:
             reader = PyPDF2.PdfReader(file)
             for page in reader.pages:
-                text += page.extract_text()
+                parts.append(page.extract_text())
+                size += len(parts[-1])
+                if max_chars and size > max_chars:
+                    break  # The rest would be truncated anyway; don't parse hundreds of pages
     except Exception as e:
         print(f"Error reading PDF: {e}")
-    return text
+    return "".join(parts)
 
-def extract_text_from_docx(docx_path):
-    text = ""
+def extract_text_from_docx(docx_path, max_chars=None):
+    parts, size = [], 0
     try:
         doc = docx.Document(docx_path)
         for para in doc.paragraphs:
-            text += para.text + "\n"
+            parts.append(para.text + "\n")
+            size += len(parts[-1])
+            if max_chars and size > max_chars:
+                break
     except Exception as e:
         print(f"Error reading DOCX: {e}")
-    return text
+    return "".join(parts)
 
-def get_text_from_file(file_path):
+def get_text_from_file(file_path, max_chars=None):
     extension = os.path.splitext(file_path)[1].lower()
     if extension == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(file_path, max_chars)
     elif extension == '.docx':
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(file_path, max_chars)
     else:
         return ""
+
+def truncate_text(text, max_chars=None):
+    """Cut text to the analysis cap at a whitespace boundary; returns (text, was_truncated)."""
+    max_chars = max_chars or MAX_ANALYSIS_CHARS
+    if not text or len(text) <= max_chars:
+        return text, False
+    cut = max(text.rfind(' ', max_chars // 2, max_chars), text.rfind('\n', max_chars // 2, max_chars))
+    return text[:cut if cut > 0 else max_chars], True
+
+def get_analysis_text(file_path):
+    """Extract text for the analyzers, capped at MAX_ANALYSIS_CHARS; returns (text, was_truncated)."""
+    return truncate_text(get_text_from_file(file_path, max_chars=MAX_ANALYSIS_CHARS))
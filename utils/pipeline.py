@@ -0,0 +1,200 @@
+"""The resume analysis pipeline, split into stages that can be streamed.
+
+`iter_stages` yields each stage's output as soon as it is computed, in the
+order the progressive results page fills in: extraction stats, health
+check, keyword coverage, similarity score, then missing skills and the
+scores derived from them. `analyze_texts` runs every stage and returns the
+merged results dict that `result.html` and the PDF report expect.
+
+Every analysis runs against a Budget of ANALYSIS_TIME_BUDGET_MS, counted
+from when the request started. Before each stage, the time left is split
+among the stages still to run by STAGE_SHARES, and the stage's cost is
+predicted from the input length and the per-character rate this worker
+has measured for it. A stage that would overrun its share runs a cheaper
+variant instead: similarity without spaCy lemmatization, and if even that
+is too slow, any stage on the leading part of the texts. The result's
+`degraded` dict says which stages were cut short and how. A stage cannot
+be interrupted once it starts, so these predictions are what bound the
+latency; extraction is cheap and always runs in full.
+"""
+import os
+import threading
+import time
+
+from utils import native_threads, memprofile, skills_kb
+from utils.parser import truncate_text
+from utils.analyzer import (
+    calculate_similarity,
+    identify_missing_skills,
+    get_recommendations,
+    calculate_score_breakdown,
+    analyze_power_words,
+    check_resume_health,
+    analyze_resume_stats,
+    analyze_section_coverage,
+    calculate_keyword_coverage,
+    calculate_ats_readiness,
+    build_action_checklist,
+    get_top_keywords,
+    nlp,
+)
+
+STAGES = ('extraction', 'health', 'keywords', 'similarity', 'skills')
+STAGE_KEYS = {
+    'extraction': ('resume_stats', 'section_coverage'),
+    'health': ('health_score', 'health_issues', 'power_word_count', 'power_words'),
+    'keywords': ('keyword_coverage', 'jd_top_keywords'),
+    'similarity': ('score',),
+    'skills': ('missing_skills', 'recommendations', 'score_breakdown', 'ats_score', 'action_checklist'),
+}
+
+def _extraction(resume_text, jd_text, results, variant):
+    return {
+        'resume_stats': analyze_resume_stats(resume_text),
+        'section_coverage': analyze_section_coverage(resume_text),
+    }
+
+def _health(resume_text, jd_text, results, variant):
+    health_score, health_issues = check_resume_health(resume_text)
+    power_word_count, power_words = analyze_power_words(resume_text)
+    return {
+        'health_score': health_score,
+        'health_issues': health_issues,
+        'power_word_count': power_word_count,
+        'power_words': power_words,
+    }
+
+def _keywords(resume_text, jd_text, results, variant):
+    return {
+        'keyword_coverage': calculate_keyword_coverage(resume_text, jd_text),
+        'jd_top_keywords': get_top_keywords(jd_text, limit=12),
+    }
+
+def _similarity(resume_text, jd_text, results, variant):
+    return {'score': calculate_similarity(resume_text, jd_text, lemmatize=variant == 'full')}
+
+def _skills(resume_text, jd_text, results, variant):
+    kb = skills_kb.current()  # Detection and advice from the same knowledge-base version
+    missing_skills = identify_missing_skills(resume_text, jd_text, kb)
+    return {
+        'missing_skills': missing_skills,
+        'recommendations': get_recommendations(missing_skills, kb),
+        'score_breakdown': calculate_score_breakdown(missing_skills, results['score']),
+        'ats_score': calculate_ats_readiness(results['health_score'], missing_skills, results['resume_stats']),
+        'action_checklist': build_action_checklist(
+            results['health_issues'], missing_skills, results['resume_stats'], results['section_coverage']
+        ),
+    }
+
+_STAGE_FUNCS = dict(zip(STAGES, (_extraction, _health, _keywords, _similarity, _skills)))
+
+TIME_BUDGET_MS = float(os.environ.get('ANALYSIS_TIME_BUDGET_MS', 5000))  # 0 disables the budget
+STAGE_SHARES = {'health': 1, 'keywords': 1, 'similarity': 4, 'skills': 1}
+# Stage variants, full first; later ones are cheaper
+STAGE_VARIANTS = {'similarity': ('full', 'plain')} if nlp else {}
+VARIANT_NOTES = {'plain': 'compared without lemmatization'}
+# Never cut the texts shorter than this, however little time is left
+MIN_DEGRADED_CHARS = 2000
+# Seconds per input character until this worker has timed the stage itself (on the slow side)
+_DEFAULT_RATES = {
+    ('health', 'full'): 1e-6,
+    ('keywords', 'full'): 3e-7,
+    ('similarity', 'full'): 2e-5 if nlp else 5e-7,
+    ('similarity', 'plain'): 5e-7,
+    ('skills', 'full'): 3e-7,
+}
+_rates = dict(_DEFAULT_RATES)
+_degraded_counts = {}
+_stats_lock = threading.Lock()
+
+def _observe(stage, variant, chars, seconds):
+    """Fold a measured run into the stage's per-character rate; tiny inputs only time the overhead."""
+    if chars >= 1000 and (stage, variant) in _rates:
+        _rates[stage, variant] = 0.7 * _rates[stage, variant] + 0.3 * seconds / chars
+
+class Budget:
+    """The time allowed for one analysis and the stages that had to be degraded to stay within it."""
+
+    def __init__(self, total_ms=None, started=None):
+        self.total = (TIME_BUDGET_MS if total_ms is None else total_ms) / 1000
+        self.started = time.perf_counter() if started is None else started
+        self.degraded = {}
+
+    def remaining(self):
+        return self.total - (time.perf_counter() - self.started)
+
+    def plan(self, stage, chars):
+        """Pick (variant, max_chars) for a stage; max_chars is None unless the texts must be cut."""
+        variants = STAGE_VARIANTS.get(stage, ('full',))
+        if self.total <= 0 or stage not in STAGE_SHARES:
+            return variants[0], None
+        stages_left = STAGES[STAGES.index(stage):]
+        share = STAGE_SHARES[stage] / sum(STAGE_SHARES.get(name, 0) for name in stages_left)
+        allowance = max(self.remaining(), 0) * share
+        for variant in variants:
+            if chars * _rates[stage, variant] <= allowance:
+                break
+        else:
+            max_chars = max(int(allowance / _rates[stage, variant]), MIN_DEGRADED_CHARS)
+            if max_chars < chars:
+                self._degrade(stage, variant, f"analyzed the first {max_chars:,} characters")
+                return variant, max_chars
+        if variant != variants[0]:
+            self._degrade(stage, variant)
+        return variant, None
+
+    def _degrade(self, stage, variant, cut=None):
+        notes = [note for note in (VARIANT_NOTES.get(variant), cut) if note]
+        self.degraded[stage] = '; '.join(notes)
+        with _stats_lock:
+            _degraded_counts[stage] = _degraded_counts.get(stage, 0) + 1
+
+def _cut(resume_text, jd_text, max_chars):
+    """Trim both texts in proportion to their length so together they fit max_chars."""
+    ratio = max_chars / (len(resume_text) + len(jd_text))
+    return (truncate_text(resume_text, max(int(len(resume_text) * ratio), 1))[0],
+            truncate_text(jd_text, max(int(len(jd_text) * ratio), 1))[0])
+
+def budget_stats():
+    with _stats_lock:
+        degraded = dict(_degraded_counts)
+    return {
+        'budget_ms': TIME_BUDGET_MS,
+        'us_per_char': {f"{stage}/{variant}": round(rate * 1e6, 3) for (stage, variant), rate in _rates.items()},
+        'degraded': degraded,
+    }
+
+def iter_stages(resume_text, jd_text, budget=None):
+    """Yield (stage, output, elapsed_ms) for each stage in STAGES order.
+
+    Later stages read earlier outputs (the ATS score needs the health score
+    and resume stats), so the stages always run in this order. Stages that
+    had to be degraded to fit the budget are recorded in `budget.degraded`.
+    """
+    budget = budget or Budget()
+    results = {}
+    for stage in STAGES:
+        variant, max_chars = budget.plan(stage, len(resume_text) + len(jd_text))
+        stage_resume, stage_jd = _cut(resume_text, jd_text, max_chars) if max_chars else (resume_text, jd_text)
+        started = time.perf_counter()
+        with native_threads.limited(), memprofile.stage(stage):
+            output = _STAGE_FUNCS[stage](stage_resume, stage_jd, results, variant)
+        elapsed = time.perf_counter() - started
+        _observe(stage, variant, len(stage_resume) + len(stage_jd), elapsed)
+        results.update(output)
+        yield stage, output, round(elapsed * 1000, 1)
+
+def analyze_texts(resume_text, jd_text, filename, budget=None):
+    """Run the full analyzer chain and return the template/report results dict."""
+    budget = budget or Budget()
+    results = {}
+    for _, output, _ in iter_stages(resume_text, jd_text, budget):
+        results.update(output)
+    results['filename'] = filename
+    results['degraded'] = budget.degraded
+    return results
+
+def split_stages(results):
+    """Regroup a finished results dict into iter_stages-shaped output, e.g. to replay a cached analysis."""
+    for stage in STAGES:
+        yield stage, {key: results.get(key) for key in STAGE_KEYS[stage]}, 0.0
@@ -0,0 +1,262 @@
+"""Rendering of the downloadable analysis report.
+
+Two engines are available: the hand-built ReportLab story below (default)
+and the HTML template engine in utils/report_html.py. REPORT_ENGINE picks
+one per deployment; `render_report` dispatches to it.
+"""
+import os
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from utils import report_html
+
+# Bump whenever the report layout changes; cached PDFs are keyed on it.
+REPORT_TEMPLATE_VERSION = 1
+REPORT_ENGINES = ('reportlab', 'weasyprint')
+
+SCORES_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ECC71')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')]),
+])
+
+STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('TOPPADDING', (0, 0), (-1, 0), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#BDC3C7')),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F8F9FA')]),
+])
+
+@lru_cache(maxsize=1)
+def _report_styles():
+    """Paragraph styles are never mutated, so one set is shared by every report."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=28,
+            textColor=colors.HexColor('#2ECC71'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold',
+            leading=32
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#34495E'),
+            spaceAfter=12,
+            spaceBefore=20,
+            fontName='Helvetica-Bold',
+            borderWidth=1,
+            borderColor=colors.HexColor('#2ECC71'),
+            borderPadding=8,
+            backColor=colors.HexColor('#F0F8F5')
+        ),
+        'subheading': ParagraphStyle(
+            'SubHeading',
+            parent=styles['Heading3'],
+            fontSize=12,
+            textColor=colors.HexColor('#16A085'),
+            spaceAfter=8,
+            spaceBefore=8,
+            fontName='Helvetica-Bold'
+        ),
+        'body': ParagraphStyle(
+            'CustomBody',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=6,
+            alignment=TA_LEFT,
+            leading=14
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.HexColor('#7F8C8D'),
+            alignment=TA_CENTER
+        ),
+    }
+
+def generate_pdf_report(results):
+    """Generate a professional PDF report using ReportLab."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=0.75*inch,
+        leftMargin=0.75*inch,
+        topMargin=0.75*inch,
+        bottomMargin=0.75*inch
+    )
+
+    story = []
+    styles = _report_styles()
+    title_style = styles['title']
+    heading_style = styles['heading']
+    subheading_style = styles['subheading']
+    body_style = styles['body']
+    footer_style = styles['footer']
+
+    # Header
+    story.append(Paragraph("📄 Resume Analysis Report", title_style))
+    story.append(Spacer(1, 0.1*inch))
+
+    # Date and filename
+    date_text = f"<b>Report Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+    story.append(Paragraph(date_text, body_style))
+    if results.get('filename'):
+        story.append(Paragraph(f"<b>Resume File:</b> {results.get('filename')}", body_style))
+    story.append(Spacer(1, 0.3*inch))
+
+    # === SCORE SUMMARY ===
+    story.append(Paragraph("📊 Score Summary", heading_style))
+    story.append(Spacer(1, 0.1*inch))
+
+    scores_data = [
+        ['Metric', 'Score', 'Status'],
+        [
+            'Match Score',
+            f"{results.get('score', 0):.1f}%",
+            '✓ Good' if results.get('score', 0) >= 70 else '⚠ Needs Work'
+        ],
+        [
+            'ATS Readiness',
+            f"{results.get('ats_score', 0):.1f}%",
+            '✓ Good' if results.get('ats_score', 0) >= 70 else '⚠ Needs Work'
+        ],
+        [
+            'Resume Health',
+            f"{results.get('health_score', 0):.1f}%",
+            '✓ Good' if results.get('health_score', 0) >= 70 else '⚠ Needs Work'
+        ],
+    ]
+
+    scores_table = Table(scores_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
+    scores_table.setStyle(SCORES_TABLE_STYLE)
+    story.append(scores_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    # === MISSING SKILLS ===
+    if results.get('missing_skills') and len(results.get('missing_skills')) > 0:
+        story.append(Paragraph("🎯 Missing Skills (Add These!)", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        missing_skills = results.get('missing_skills', [])
+        for idx, skill in enumerate(missing_skills[:15], 1):
+            story.append(Paragraph(f"{idx}. <b>{skill.upper()}</b>", body_style))
+
+        if len(missing_skills) > 15:
+            story.append(Paragraph(f"<i>...and {len(missing_skills) - 15} more</i>", body_style))
+
+        story.append(Spacer(1, 0.2*inch))
+
+    # === RESUME STATISTICS ===
+    if results.get('resume_stats'):
+        story.append(Paragraph("📈 Resume Statistics", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        stats = results.get('resume_stats', {})
+        stats_data = [
+            ['Metric', 'Value'],
+            ['Word Count', str(stats.get('word_count', 0))],
+            ['Character Count', str(stats.get('char_count', 0))],
+            ['Bullet Points', str(stats.get('bullet_count', 0))],
+            ['Avg Words/Sentence', str(stats.get('avg_words_per_sentence', 0))],
+        ]
+
+        stats_table = Table(stats_data, colWidths=[3*inch, 2.5*inch])
+        stats_table.setStyle(STATS_TABLE_STYLE)
+        story.append(stats_table)
+        story.append(Spacer(1, 0.2*inch))
+
+    # === HEALTH ISSUES ===
+    if results.get('health_issues') and len(results.get('health_issues')) > 0:
+        story.append(Paragraph("⚠️ Health Issues to Fix", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        health_issues = results.get('health_issues', [])
+        for idx, issue in enumerate(health_issues[:10], 1):
+            story.append(Paragraph(f"{idx}. {issue}", body_style))
+        story.append(Spacer(1, 0.2*inch))
+
+    # === TOP KEYWORDS ===
+    if results.get('jd_top_keywords'):
+        story.append(Paragraph("🔑 Top Keywords from Job Description", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        keywords = results.get('jd_top_keywords', [])
+        keywords_text = " • ".join([f"<b>{kw}</b>" for kw in keywords[:20]])
+        story.append(Paragraph(keywords_text, body_style))
+        story.append(Spacer(1, 0.2*inch))
+
+    # === ACTION CHECKLIST ===
+    if results.get('action_checklist'):
+        story.append(Paragraph("✅ Action Checklist", heading_style))
+        story.append(Spacer(1, 0.1*inch))
+
+        action_checklist = results.get('action_checklist', [])
+        if isinstance(action_checklist, list):
+            for idx, item in enumerate(action_checklist[:12], 1):
+                story.append(Paragraph(f"☐ {item}", body_style))
+        elif isinstance(action_checklist, dict):
+            for category, items in action_checklist.items():
+                if items:
+                    story.append(Paragraph(f"<b>{category.replace('_', ' ').title()}:</b>", subheading_style))
+                    for item in items[:5]:
+                        story.append(Paragraph(f"  ☐ {item}", body_style))
+
+    # Footer
+    story.append(Spacer(1, 0.4*inch))
+    story.append(Paragraph("—" * 50, footer_style))
+    story.append(Paragraph("Generated by ResumeFlexx - Your AI Resume Assistant", footer_style))
+
+    # Build PDF
+    doc.build(story)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+def _resolve_engine(name):
+    name = (name or 'reportlab').strip().lower()
+    if name not in REPORT_ENGINES:
+        raise ValueError(f"REPORT_ENGINE must be one of {', '.join(REPORT_ENGINES)}, got {name!r}")
+    if name == 'weasyprint' and not report_html.AVAILABLE:
+        print("REPORT_ENGINE=weasyprint but WeasyPrint could not be loaded; falling back to ReportLab")
+        return 'reportlab'
+    return name
+
+REPORT_ENGINE = _resolve_engine(os.environ.get('REPORT_ENGINE'))
+# Cached reports are keyed on engine and layout version, so switching either never serves stale PDFs
+REPORT_CACHE_TAG = f"{REPORT_ENGINE}-v{REPORT_TEMPLATE_VERSION}"
+
+def render_report(results, engine=None):
+    """Render `results` to PDF bytes with the configured (or given) engine."""
+    if (engine or REPORT_ENGINE) == 'weasyprint':
+        return report_html.generate_pdf_report(results)
+    return generate_pdf_report(results)
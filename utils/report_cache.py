@@ -0,0 +1,154 @@
+"""On-disk cache of rendered PDF reports.
+
+A stored analysis never changes, so its report only has to be rendered once
+per report engine, template version and skills knowledge-base version (the
+report quotes its recommendations). Files are named
+`<analysis_id>-<REPORT_CACHE_TAG>-kb<version>.pdf` and live next to the history database
+(or in REPORT_CACHE_DIR). Ids are only unique within one database, so a
+different or restored database never sees another's reports. Each hit
+bumps the file's atime; the mtime is left alone so it can serve as
+Last-Modified.
+
+Each worker keeps a running total of the bytes it has written. The
+directory is only scanned, and the least recently used reports evicted,
+when that total passes REPORT_CACHE_MAX_MB or every RESCAN_EVERY_PUTS
+writes, which picks up what other workers wrote. A put is therefore not
+O(cache size).
+"""
+import glob
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import resume_db, skills_kb
+from utils.report import render_report, REPORT_CACHE_TAG
+
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR')
+REPORT_CACHE_MAX_BYTES = int(float(os.environ.get('REPORT_CACHE_MAX_MB', 256)) * 1024 * 1024)
+PRERENDER = os.environ.get('REPORT_PRERENDER', '1') != '0'
+RESCAN_EVERY_PUTS = 100
+
+_executor = None
+# Per cache directory: [estimated bytes, puts since the last scan]
+_estimates = {}
+_estimates_lock = threading.Lock()
+
+def cache_dir():
+    # Next to the history database by default, like the page cache
+    return REPORT_CACHE_DIR or os.path.splitext(resume_db.DB_PATH)[0] + '.reports'
+
+def cache_tag():
+    """What a cached report depends on besides its analysis; part of the file name and the ETag."""
+    return f"{REPORT_CACHE_TAG}-kb{skills_kb.current().version}"
+
+def cache_path(analysis_id):
+    return os.path.join(cache_dir(), f"{analysis_id}-{cache_tag()}.pdf")
+
+def get(analysis_id):
+    """Return (path, mtime) of the cached report, marking it recently used, or None."""
+    path = cache_path(analysis_id)
+    try:
+        mtime = os.stat(path).st_mtime
+        os.utime(path, (time.time(), mtime))
+    except FileNotFoundError:
+        return None
+    return path, mtime
+
+def open_report(analysis_id):
+    """Return (open file, mtime) of the cached report, or None.
+
+    The file is opened at once, so a concurrent evict() can no longer pull
+    it away between the lookup and the response.
+    """
+    cached = get(analysis_id)
+    if cached is None:
+        return None
+    try:
+        return open(cached[0], 'rb'), cached[1]
+    except FileNotFoundError:
+        return None
+
+def put(analysis_id, pdf_bytes):
+    """Atomically store a rendered report, trimming the cache once it may have passed its size cap.
+
+    Returns (path, mtime) like get(), or None if a concurrent evict() has
+    already removed the file; callers then serve `pdf_bytes` themselves.
+    """
+    directory = cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, cache_path(analysis_id))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    with _estimates_lock:
+        estimate = _estimates.get(directory)
+        if estimate is not None:
+            estimate[0] += len(pdf_bytes)
+            estimate[1] += 1
+        due = estimate is None or estimate[0] > REPORT_CACHE_MAX_BYTES or estimate[1] >= RESCAN_EVERY_PUTS
+    if due:
+        evict()
+    return get(analysis_id)
+
+def render(analysis_id, results):
+    """Return the cached report for `analysis_id`, rendering it on a miss; None if evicted at once."""
+    return get(analysis_id) or put(analysis_id, render_report(results))
+
+def evict(max_bytes=None):
+    """Delete least recently used reports until the cache fits in `max_bytes`."""
+    max_bytes = REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    directory = cache_dir()
+    entries = []
+    for path in glob.glob(os.path.join(directory, '*.pdf')):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((st.st_atime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    with _estimates_lock:
+        _estimates[directory] = [total, 0]
+    return removed
+
+def invalidate(analysis_ids):
+    """Drop every cached report (any engine or version) for the given analyses."""
+    for analysis_id in analysis_ids:
+        for path in glob.glob(os.path.join(cache_dir(), f"{int(analysis_id)}-*.pdf")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def prerender(analysis_id, results):
+    """Render the report on a background thread so the first download is a cache hit."""
+    global _executor
+    if not PRERENDER:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-prerender')
+    return _executor.submit(render, analysis_id, dict(results))
+
+def _reset_after_fork():
+    # The executor's thread does not survive fork; a preforked worker starts its own
+    global _executor, _estimates_lock
+    _executor = None
+    _estimates_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,53 @@
+"""HTML/CSS report engine: templates/report_pdf.html rendered to PDF by WeasyPrint.
+
+WeasyPrint is optional (it also needs the Pango system libraries), so
+AVAILABLE is False when it cannot be loaded. The Jinja environment, the
+parsed stylesheet and the FontConfiguration are built once per process and
+reused by every render; the font configuration holds the loaded faces that
+WeasyPrint subsets into each PDF.
+"""
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+try:
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+    AVAILABLE = True
+except (ImportError, OSError):
+    # OSError: the package is installed but Pango/GObject could not be loaded
+    AVAILABLE = False
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+STYLESHEET_PATH = os.path.join(STATIC_DIR, 'css', 'report_pdf.css')
+TEMPLATE_NAME = 'report_pdf.html'
+
+@lru_cache(maxsize=1)
+def _template():
+    # A standalone environment: renders also run in the bulk-export process pool, outside any app context
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), autoescape=select_autoescape(['html']))
+    return env.get_template(TEMPLATE_NAME)
+
+@lru_cache(maxsize=1)
+def _font_config():
+    return FontConfiguration()
+
+@lru_cache(maxsize=1)
+def _stylesheet():
+    return CSS(filename=STYLESHEET_PATH, font_config=_font_config())
+
+def render_report_html(results):
+    context = dict(results)
+    context['generated_at'] = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+    return _template().render(**context)
+
+def generate_pdf_report(results):
+    """Render the report template to PDF bytes."""
+    if not AVAILABLE:
+        raise RuntimeError("WeasyPrint is not installed (or Pango is missing); use REPORT_ENGINE=reportlab")
+    document = HTML(string=render_report_html(results), base_url=STATIC_DIR)
+    return document.write_pdf(stylesheets=[_stylesheet()], font_config=_font_config())
@@ -1,13 +1,20 @@
 import sqlite3
 import json
 import os
-from datetime import datetime
+import re
+import secrets
+import time
+from html import escape
+from datetime import datetime, timedelta
+from itertools import islice
 
-DB_PATH = 'resume_history.db'
+DB_PATH = os.environ.get('RESUME_DB_PATH', 'resume_history.db')
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
+    # Takes effect only while the file is still empty; older databases are converted by `manage.py maintain --vacuum`
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -20,33 +27,385 @@ def init_db():
             results_json TEXT
         )
     ''')
+    _migrate_created_at(cursor)
+    _migrate_analysis_skills(cursor)
+    _migrate_fts(cursor)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resume_signatures (
+            analysis_id INTEGER PRIMARY KEY,
+            content_hash TEXT,
+            signature BLOB
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resume_signatures_hash ON resume_signatures (content_hash)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            analysis_id INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_bucket ON lsh_buckets (band, bucket)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lsh_buckets_analysis ON lsh_buckets (analysis_id)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS export_jobs (
+            job_id TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            done INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_jobs (
+            job_id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            jd_text TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kb_recommendations (
+            kb_version INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            recommendation TEXT NOT NULL,
+            PRIMARY KEY (kb_version, skill)
+        ) WITHOUT ROWID
+    ''')
+    _migrate_uploads(cursor)
     conn.commit()
     conn.close()
 
-def save_analysis(filename, score, ats_score, health_score, missing_skills, results):
-    """Persist an analysis run and return its new primary key ID."""
+def _ensure_column(cursor, table, column, declaration):
+    cursor.execute(f'PRAGMA table_info({table})')
+    if column not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+
+def _migrate_created_at(cursor):
+    """Add the sortable ISO-8601 created_at column and backfill legacy rows.
+
+    The display column `timestamp` holds '%d/%m/%Y' strings, which cannot be
+    range-scanned; legacy rows are backfilled to midnight of that day.
+    """
+    _ensure_column(cursor, 'history', 'created_at', 'TEXT')
+    cursor.execute('''
+        UPDATE history
+        SET created_at = substr(timestamp, 7, 4) || '-' || substr(timestamp, 4, 2) || '-'
+                         || substr(timestamp, 1, 2) || 'T00:00:00'
+        WHERE created_at IS NULL AND timestamp LIKE '__/__/____'
+    ''')
+    # Covering index: trend queries range-scan created_at and read score
+    # without touching the wide results_json rows.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_created_at ON history (created_at, score, ats_score)')
+
+def _migrate_uploads(cursor):
+    """Uploaded files, stored once per content hash and counted by the history rows analyzed from them."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS upload_blobs (
+            sha256 TEXT PRIMARY KEY,
+            extension TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            present INTEGER NOT NULL DEFAULT 1,
+            last_used TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_upload_blobs_last_used ON upload_blobs (last_used)')
+    _ensure_column(cursor, 'history', 'upload_sha256', 'TEXT')
+    _ensure_column(cursor, 'analysis_jobs', 'upload_sha256', 'TEXT')
+
+SKILL_KINDS = ('missing', 'keyword_missing', 'keyword_matched')
+
+def _migrate_analysis_skills(cursor):
+    """Create the normalized skill table and backfill it once from the JSON columns.
+
+    created_at is copied from history so windowed aggregations are a range
+    scan over one covering index instead of a join against history.
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analysis_skills'")
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_skills (
+            analysis_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            created_at TEXT
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_skills_analysis ON analysis_skills (analysis_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_skills_kind_skill ON analysis_skills (kind, skill)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_skills_kind_time ON analysis_skills (kind, created_at, skill)')
+    if exists:
+        return
+
+    cursor.execute('''
+        INSERT INTO analysis_skills (analysis_id, skill, kind, created_at)
+        SELECT history.id, lower(skill.value), 'missing', history.created_at
+        FROM history, json_each(history.missing_skills) AS skill
+        WHERE json_valid(history.missing_skills)
+    ''')
+    for kind, path in (('keyword_missing', '$.keyword_coverage.missing'),
+                       ('keyword_matched', '$.keyword_coverage.matched')):
+        cursor.execute(f'''
+            INSERT INTO analysis_skills (analysis_id, skill, kind, created_at)
+            SELECT history.id, lower(keyword.value), '{kind}', history.created_at
+            FROM history, json_each(history.results_json, '{path}') AS keyword
+            WHERE json_valid(history.results_json)
+        ''')
+
+def _skill_rows(analysis_id, created_at, missing_skills, results):
+    keyword_coverage = results.get('keyword_coverage') or {}
+    rows = [(analysis_id, skill.lower(), 'missing', created_at) for skill in missing_skills]
+    rows += [(analysis_id, kw.lower(), 'keyword_missing', created_at) for kw in keyword_coverage.get('missing', [])]
+    rows += [(analysis_id, kw.lower(), 'keyword_matched', created_at) for kw in keyword_coverage.get('matched', [])]
+    return rows
+
+INSERT_SKILLS_SQL = 'INSERT INTO analysis_skills (analysis_id, skill, kind, created_at) VALUES (?, ?, ?, ?)'
+
+def _fts5_available():
+    conn = sqlite3.connect(':memory:')
+    try:
+        conn.execute('CREATE VIRTUAL TABLE probe USING fts5(body)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+# Full-text search is skipped on SQLite builds compiled without FTS5.
+FTS5_AVAILABLE = _fts5_available()
+
+def _migrate_fts(cursor):
+    """Create the full-text index over filenames, matched skills and resume text.
+
+    The FTS table also stores the normalized resume text itself. Rows saved
+    before it existed are backfilled once with filename and skills only.
+    """
+    if not FTS5_AVAILABLE:
+        return
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'")
+    exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS history_fts
+        USING fts5(filename, skills, resume_text, tokenize = 'porter unicode61')
+    ''')
+    if exists:
+        return
+    cursor.execute('''
+        INSERT INTO history_fts (rowid, filename, skills, resume_text)
+        SELECT id, filename,
+               (SELECT group_concat(skill, ' ') FROM analysis_skills
+                WHERE analysis_id = history.id AND kind = 'keyword_matched'),
+               ''
+        FROM history
+    ''')
+
+def normalize_resume_text(text):
+    return ' '.join((text or '').split())
+
+def _fts_row(analysis_id, filename, results, resume_text):
+    matched = (results.get('keyword_coverage') or {}).get('matched', [])
+    return (analysis_id, filename, ' '.join(matched), normalize_resume_text(resume_text))
+
+INSERT_FTS_SQL = 'INSERT INTO history_fts (rowid, filename, skills, resume_text) VALUES (?, ?, ?, ?)'
+
+def _insert_fingerprints(cursor, fingerprints):
+    """Store (analysis_id, fingerprint) pairs produced by utils.dedup.fingerprint."""
+    cursor.executemany(
+        'INSERT INTO resume_signatures (analysis_id, content_hash, signature) VALUES (?, ?, ?)',
+        [(analysis_id, fp['content_hash'], fp['signature']) for analysis_id, fp in fingerprints],
+    )
+    cursor.executemany(
+        'INSERT INTO lsh_buckets (band, bucket, analysis_id) VALUES (?, ?, ?)',
+        [(band, bucket, analysis_id)
+         for analysis_id, fp in fingerprints
+         for band, bucket in enumerate(fp['bands'])],
+    )
+
+def get_lsh_candidates(bands):
+    """(analysis_id, signature) of every analysis sharing a band bucket, newest first."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(
+        f'''
+        SELECT analysis_id, signature FROM resume_signatures
+        WHERE analysis_id IN (
+            SELECT analysis_id FROM lsh_buckets
+            WHERE (band, bucket) IN (VALUES {', '.join(['(?, ?)'] * len(bands))})
+        )
+        ORDER BY analysis_id DESC
+        ''',
+        [value for pair in enumerate(bands) for value in pair],
+    )
+    candidates = cursor.fetchall()
+    conn.close()
+    return candidates
+
+def get_analysis_by_content_hash(content_hash):
+    """Most recent analysis of exactly the same resume and job description, if any."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(
+        'SELECT MAX(analysis_id) FROM resume_signatures WHERE content_hash = ?',
+        (content_hash,),
+    )
+    analysis_id = cursor.fetchone()[0]
+    conn.close()
+    return get_analysis_by_id(analysis_id) if analysis_id else None
+
+def _compact_results(results, cursor):
+    """Swap embedded recommendation objects for knowledge-base references.
+
+    Recommendations are SKILL_DB text, so only the skill ids and the
+    knowledge-base version are stored in the row. The text itself is kept
+    once per version and skill in kb_recommendations, so _rehydrate_results
+    can show what the analysis showed after the knowledge base changes.
+    Results whose recommendations do not match the version in service (the
+    knowledge base was reloaded mid-analysis, or an imported row) keep
+    them embedded.
+    """
+    recommendations = results.get('recommendations')
+    missing_skills = results.get('missing_skills')
+    if not isinstance(recommendations, list) or not isinstance(missing_skills, list):
+        return results
+    if len(recommendations) != len(missing_skills):
+        return results
+
+    from utils import skills_kb
+    from utils.analyzer import get_recommendations
+    kb = skills_kb.current()
+    if recommendations != get_recommendations(missing_skills, kb):
+        return results
+    cursor.executemany(
+        'INSERT OR IGNORE INTO kb_recommendations (kb_version, skill, recommendation) VALUES (?, ?, ?)',
+        [(kb.version, skill, json.dumps(rec)) for skill, rec in zip(missing_skills, recommendations)],
+    )
+    compact = {k: v for k, v in results.items() if k != 'recommendations'}
+    compact['recommendation_refs'] = {
+        'kb_version': kb.version,
+        'skills': list(missing_skills),
+    }
+    return compact
+
+def _rehydrate_results(results, cursor):
+    """Rebuild recommendations as they were under the row's knowledge-base version.
+
+    The version in service is rebuilt from memory; older versions are read
+    from kb_recommendations. Skills with no stored text (rows compacted
+    before it existed, or imported from another instance) follow the live
+    knowledge base. Rows written before references were introduced still
+    carry the full recommendation objects and are returned unchanged.
+    """
+    refs = results.pop('recommendation_refs', None)
+    if refs is None:
+        return results
+
+    from utils import skills_kb
+    from utils.analyzer import get_recommendations
+    kb = skills_kb.current()
+    skills = refs.get('skills', [])
+    if refs.get('kb_version') == kb.version:
+        results['recommendations'] = get_recommendations(skills, kb)
+        return results
+    cursor.execute(
+        'SELECT skill, recommendation FROM kb_recommendations'
+        ' WHERE kb_version = ? AND skill IN (SELECT value FROM json_each(?))',
+        (refs.get('kb_version'), json.dumps(skills)),
+    )
+    stored = {skill: json.loads(rec) for skill, rec in cursor.fetchall()}
+    results['recommendations'] = [
+        stored[skill] if skill in stored else get_recommendations([skill], kb)[0] for skill in skills
+    ]
+    return results
+
+def save_analysis(filename, score, ats_score, health_score, missing_skills, results, resume_text=None, fingerprint=None,
+                  upload_sha256=None):
+    """Persist an analysis run and return its new primary key ID.
+
+    `upload_sha256` names the stored upload it was analyzed from; the row
+    holds a reference to it until the row is deleted.
+    """
+    now = datetime.now()
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute(
         '''
-        INSERT INTO history (filename, timestamp, score, ats_score, health_score, missing_skills, results_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO history (filename, timestamp, created_at, score, ats_score, health_score, missing_skills, results_json,
+                             upload_sha256)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''',
         (
             filename,
-            datetime.now().strftime('%d/%m/%Y'),
+            now.strftime('%d/%m/%Y'),
+            now.isoformat(timespec='seconds'),
             score,
             ats_score,
             health_score,
             json.dumps(missing_skills),
-            json.dumps(results),
+            json.dumps(_compact_results(results, cursor)),
+            upload_sha256,
         ),
     )
     analysis_id = cursor.lastrowid
+    if upload_sha256:
+        cursor.execute(
+            'UPDATE upload_blobs SET refcount = refcount + 1, last_used = ? WHERE sha256 = ?',
+            (now.isoformat(timespec='seconds'), upload_sha256),
+        )
+    cursor.executemany(
+        INSERT_SKILLS_SQL,
+        _skill_rows(analysis_id, now.isoformat(timespec='seconds'), missing_skills, results),
+    )
+    if FTS5_AVAILABLE:
+        cursor.execute(INSERT_FTS_SQL, _fts_row(analysis_id, filename, results, resume_text))
+    if fingerprint:
+        _insert_fingerprints(cursor, [(analysis_id, fingerprint)])
     conn.commit()
     conn.close()
+    _bump_page_cache()
+    if resume_text:
+        _index_resumes([analysis_id], [resume_text])
     return analysis_id
 
+ANALYSIS_JOB_TTL_MINUTES = 60
+
+def create_analysis_job(filename, file_path, jd_text, upload_sha256=None):
+    """Park an uploaded resume until its event stream picks it up; returns the job id."""
+    job_id = secrets.token_urlsafe(16)
+    now = datetime.now()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(
+        'DELETE FROM analysis_jobs WHERE created_at < ?',
+        ((now - timedelta(minutes=ANALYSIS_JOB_TTL_MINUTES)).isoformat(timespec='seconds'),),
+    )
+    conn.execute(
+        'INSERT INTO analysis_jobs (job_id, filename, file_path, jd_text, created_at, upload_sha256) VALUES (?, ?, ?, ?, ?, ?)',
+        (job_id, filename, file_path, jd_text, now.isoformat(timespec='seconds'), upload_sha256),
+    )
+    conn.commit()
+    conn.close()
+    return job_id
+
+def claim_analysis_job(job_id):
+    """Remove and return a pending job, so each upload is analyzed by exactly one stream."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(
+        'DELETE FROM analysis_jobs WHERE job_id = ? RETURNING filename, file_path, jd_text, upload_sha256', (job_id,)
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return dict(row) if row else None
+
 def get_history():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -62,19 +421,25 @@ def get_history():
         history.append(d)
     return history
 
+def analysis_exists(analysis_id):
+    conn = sqlite3.connect(DB_PATH)
+    row = conn.execute('SELECT 1 FROM history WHERE id = ?', (analysis_id,)).fetchone()
+    conn.close()
+    return row is not None
+
 def get_analysis_by_id(analysis_id):
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM history WHERE id = ?', (analysis_id,))
     row = cursor.fetchone()
-    conn.close()
-    
     if not row:
+        conn.close()
         return None
 
     d = dict(row)
-    results = json.loads(d['results_json'])
+    results = _rehydrate_results(json.loads(d['results_json']), cursor)
+    conn.close()
     # Attach the primary key so templates can build URLs like /download-report/<id>
     results['analysis_id'] = d['id']
     return results
@@ -111,9 +476,395 @@ def get_dashboard_stats():
         'recent': recent
     }
 
+def _window_start(days):
+    return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%dT00:00:00')
+
+TREND_BUCKETS = {
+    'daily': "substr(created_at, 1, 10)",
+    # Monday the week starts on: a week that spans New Year stays one bucket
+    'weekly': "date(created_at, 'weekday 0', '-6 days')",
+}
+
+def get_score_trends(days=30):
+    """Aggregate analyses per day and per week over the last `days` days.
+
+    Everything is computed in SQL over the created_at index; p90 is the
+    nearest-rank percentile of `score` within each bucket.
+    """
+    since = _window_start(days)
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    trends = {'days': days, 'since': since}
+    for name, bucket in TREND_BUCKETS.items():
+        cursor.execute(f'''
+            WITH ranked AS (
+                SELECT {bucket} AS bucket, score, ats_score,
+                       ROW_NUMBER() OVER (PARTITION BY {bucket} ORDER BY score) AS score_rank,
+                       COUNT(*) OVER (PARTITION BY {bucket}) AS bucket_size
+                FROM history
+                WHERE created_at >= ?
+            )
+            SELECT bucket,
+                   COUNT(*) AS count,
+                   ROUND(AVG(score), 1) AS avg_score,
+                   ROUND(AVG(ats_score), 1) AS avg_ats_score,
+                   MIN(CASE WHEN score_rank >= 0.9 * bucket_size THEN score END) AS p90_score
+            FROM ranked
+            GROUP BY bucket
+            ORDER BY bucket
+        ''', (since,))
+        trends[name] = [dict(row) for row in cursor.fetchall()]
+
+    conn.close()
+    return trends
+
+def get_top_skill_gaps(days=30, limit=10, kind='missing'):
+    """Return the `limit` most frequent skills of `kind` over the last `days` days.
+
+    days=0 aggregates the whole history straight off the (kind, skill) index.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    if days:
+        since = _window_start(days)
+        cursor.execute('''
+            SELECT skill, COUNT(*) AS count
+            FROM analysis_skills INDEXED BY idx_analysis_skills_kind_time
+            WHERE kind = ? AND created_at >= ?
+            GROUP BY skill
+            ORDER BY count DESC, skill
+            LIMIT ?
+        ''', (kind, since, limit))
+    else:
+        cursor.execute('''
+            SELECT skill, COUNT(*) AS count
+            FROM analysis_skills
+            WHERE kind = ?
+            GROUP BY skill
+            ORDER BY count DESC, skill
+            LIMIT ?
+        ''', (kind, limit))
+    gaps = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return gaps
+
+SNIPPET_OPEN, SNIPPET_CLOSE = '\x02', '\x03'
+
+def search_history(query, limit=20):
+    """Full-text search over stored analyses, best bm25 match first.
+
+    Every word in `query` must appear (in any column); filename hits weigh
+    more than skill hits, which weigh more than resume body hits. Each result
+    carries an HTML-escaped `snippet` with matches wrapped in <mark>.
+    """
+    terms = re.findall(r'\w+', query or '')
+    if not FTS5_AVAILABLE or not terms:
+        return []
+    match = ' '.join('"' + term + '"' for term in terms)
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(
+        '''
+        SELECT history.id, history.filename, history.timestamp, history.score, history.ats_score,
+               history.missing_skills,
+               snippet(history_fts, -1, ?, ?, '…', 16) AS snippet,
+               bm25(history_fts, 10.0, 5.0, 1.0) AS rank
+        FROM history_fts
+        JOIN history ON history.id = history_fts.rowid
+        WHERE history_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+        ''',
+        (SNIPPET_OPEN, SNIPPET_CLOSE, match, limit),
+    )
+    rows = cursor.fetchall()
+    conn.close()
+
+    results = []
+    for row in rows:
+        d = dict(row)
+        d['missing_skills'] = json.loads(d['missing_skills'] or '[]')
+        d['snippet'] = escape(d['snippet'] or '').replace(SNIPPET_OPEN, '<mark>').replace(SNIPPET_CLOSE, '</mark>')
+        results.append(d)
+    return results
+
+def get_history_summaries(ids):
+    """History list rows for the given ids, keyed by id; ids that no longer exist are absent."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(
+        f'''
+        SELECT id, filename, timestamp, score, ats_score, missing_skills
+        FROM history WHERE id IN ({','.join('?' * len(ids))})
+        ''',
+        ids,
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    summaries = {}
+    for row in rows:
+        d = dict(row)
+        d['missing_skills'] = json.loads(d['missing_skills'] or '[]')
+        summaries[d['id']] = d
+    return summaries
+
+def iter_resume_texts(batch_size=5000):
+    """Yield (analysis_id, resume_text) batches from the search index, oldest first."""
+    if not FTS5_AVAILABLE:
+        return
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT rowid, resume_text FROM history_fts WHERE resume_text != '' ORDER BY rowid")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
+    finally:
+        conn.close()
+
+def _bump_page_cache():
+    """Retire cached dashboard/history/detail pages after a committed write.
+
+    The write has already succeeded, so a locked or broken cache file must
+    not fail it; pages cached before it can then be served until they reach
+    PAGE_CACHE_TTL_SECONDS.
+    """
+    from utils import page_cache
+    try:
+        page_cache.bump_data_version()
+    except sqlite3.Error as e:
+        print(f"Warning: could not retire cached pages after a history write: {e}")
+
+def _index_resumes(ids, texts):
+    """Add committed resumes to the candidate retrieval index.
+
+    The history row is already saved, so a failure here only leaves the
+    index behind; `python manage.py reindex` catches it up.
+    """
+    from utils import candidate_index
+    try:
+        candidate_index.add(ids, texts)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not add {len(ids)} resume(s) to the candidate index: {e}")
+
+def _delete_analyses(cursor, ids):
+    """Delete history rows and everything derived from them."""
+    params = [(item_id,) for item_id in ids]
+    cursor.executemany('DELETE FROM analysis_skills WHERE analysis_id = ?', params)
+    cursor.executemany('DELETE FROM resume_signatures WHERE analysis_id = ?', params)
+    cursor.executemany('DELETE FROM lsh_buckets WHERE analysis_id = ?', params)
+    if FTS5_AVAILABLE:
+        cursor.executemany('DELETE FROM history_fts WHERE rowid = ?', params)
+    # Unreferenced uploads are removed by uploads.collect() once their grace period is over
+    cursor.executemany(
+        'UPDATE upload_blobs SET refcount = refcount - 1 WHERE sha256 = (SELECT upload_sha256 FROM history WHERE id = ?)',
+        params,
+    )
+    cursor.executemany('DELETE FROM history WHERE id = ?', params)
+
 def delete_history_item(item_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute('DELETE FROM history WHERE id = ?', (item_id,))
+    _delete_analyses(cursor, [item_id])
     conn.commit()
     conn.close()
+    _bump_page_cache()
+
+EXPORT_COLUMNS = ('id', 'filename', 'timestamp', 'created_at', 'score', 'ats_score', 'health_score')
+
+def _iter_export_records(cursor, where='', params=(), batch_size=500):
+    resume_text = "(SELECT resume_text FROM history_fts WHERE rowid = history.id)" if FTS5_AVAILABLE else "NULL"
+    cursor.execute(
+        f"""SELECT {', '.join(EXPORT_COLUMNS)}, {resume_text}, missing_skills, results_json
+            FROM history {where} ORDER BY id""",
+        params,
+    )
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS, row))
+            record['resume_text'] = row[-3]
+            record['missing_skills'] = json.loads(row[-2] or '[]')
+            record['results'] = json.loads(row[-1] or '{}')
+            yield record
+
+def select_analysis_ids(ids=None, query=None, days=None, min_score=None, max_score=None, limit=1000):
+    """Return ids of stored analyses matching every given filter, newest first.
+
+    `ids` restricts to an explicit selection (unknown ids are dropped) and
+    `query` to full-text search hits; the remaining filters apply to
+    created_at and the match score.
+    """
+    clauses, params = [], []
+    if query:
+        ids = [hit['id'] for hit in search_history(query, limit=limit)
+               if ids is None or hit['id'] in set(ids)]
+    if ids is not None:
+        clauses.append('id IN (SELECT value FROM json_each(?))')
+        params.append(json.dumps([int(i) for i in ids]))
+    if days:
+        clauses.append('created_at >= ?')
+        params.append(_window_start(days))
+    if min_score is not None:
+        clauses.append('score >= ?')
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append('score <= ?')
+        params.append(max_score)
+    where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+
+    conn = sqlite3.connect(DB_PATH)
+    rows = conn.execute(f'SELECT id FROM history {where} ORDER BY id DESC LIMIT ?', (*params, limit)).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+def get_export_records(ids):
+    """Export records for `ids` in one short read, oldest first."""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return list(_iter_export_records(
+            conn.cursor(), 'WHERE id IN (SELECT value FROM json_each(?))', (json.dumps([int(i) for i in ids]),)
+        ))
+    finally:
+        conn.close()
+
+def iter_history_export(batch_size=500):
+    """Yield every history row as an export record, oldest first.
+
+    Rows are pulled from the cursor `batch_size` at a time, so memory use
+    stays flat regardless of history size. `results` is exported in its
+    stored (compact) form.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        yield from _iter_export_records(conn.cursor(), batch_size=batch_size)
+    finally:
+        conn.close()
+
+class HistoryImportError(ValueError):
+    """A record could not be read; `rows` were already committed by earlier batches."""
+
+    def __init__(self, message, rows):
+        super().__init__(message)
+        self.rows = rows
+
+def read_import_lines(lines):
+    """Parse NDJSON export lines, rejecting any that is not an analysis object.
+
+    Errors are ValueErrors naming the line, so import_history_records()
+    reports them as HistoryImportError with the rows already committed.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+        if (not isinstance(record, dict) or not isinstance(record.get('filename'), str)
+                or not isinstance(record.get('missing_skills') or [], list)
+                or not isinstance(record.get('results') or {}, dict)):
+            raise ValueError(f"line {number}: expected an analysis object with a filename")
+        yield record
+
+def import_history_records(records, batch_size=5000):
+    """Bulk-insert export records, one transaction per `batch_size` rows.
+
+    Imported rows get fresh ids (the source ids are not preserved) and are
+    indexed into analysis_skills, the search index and, when the record
+    carries resume text, the near-duplicate index in the same transaction.
+    Resume texts are added to the candidate index as one segment per batch.
+    Returns the row count, elapsed seconds and rows per second. A ValueError
+    from the records iterator stops the import before the batch it falls in
+    and is raised again as HistoryImportError, carrying the committed count.
+    """
+    from utils import dedup
+
+    started = time.perf_counter()
+    total = 0
+    records = iter(records)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.cursor()
+        while True:
+            try:
+                batch = list(islice(records, batch_size))
+            except ValueError as e:
+                raise HistoryImportError(str(e), total) from e
+            if not batch:
+                break
+            cursor.execute('BEGIN IMMEDIATE')
+            # Ids are allocated up front, under the write lock, so the skill
+            # rows can reference them without a lastrowid round-trip per row.
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'history'")
+            seq = cursor.fetchone()
+            cursor.execute('SELECT MAX(id) FROM history')
+            next_id = max(seq[0] if seq else 0, cursor.fetchone()[0] or 0) + 1
+
+            history_rows = []
+            skill_rows = []
+            fts_rows = []
+            fingerprints = []
+            indexed = []
+            now = datetime.now()
+            for analysis_id, record in enumerate(batch, start=next_id):
+                missing_skills = record.get('missing_skills') or []
+                results = record.get('results') or {}
+                created_at = record.get('created_at') or now.isoformat(timespec='seconds')
+                history_rows.append((
+                    analysis_id,
+                    record.get('filename'),
+                    record.get('timestamp') or now.strftime('%d/%m/%Y'),
+                    created_at,
+                    record.get('score'),
+                    record.get('ats_score'),
+                    record.get('health_score'),
+                    json.dumps(missing_skills),
+                    json.dumps(_compact_results(results, cursor)),
+                ))
+                skill_rows.extend(_skill_rows(analysis_id, created_at, missing_skills, results))
+                fts_rows.append(_fts_row(analysis_id, record.get('filename'), results, record.get('resume_text')))
+                if record.get('resume_text'):
+                    # The JD is not exported, so imported rows are never reused as exact matches.
+                    fingerprints.append((analysis_id, dedup.fingerprint(record['resume_text'])))
+                    indexed.append((analysis_id, record['resume_text']))
+
+            cursor.executemany(
+                '''
+                INSERT INTO history (id, filename, timestamp, created_at, score, ats_score, health_score, missing_skills, results_json)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                history_rows,
+            )
+            cursor.executemany(INSERT_SKILLS_SQL, skill_rows)
+            if FTS5_AVAILABLE:
+                cursor.executemany(INSERT_FTS_SQL, fts_rows)
+            _insert_fingerprints(cursor, fingerprints)
+            conn.commit()
+            total += len(batch)
+            if indexed:
+                _index_resumes(*zip(*indexed))
+    finally:
+        conn.close()
+        if total:
+            _bump_page_cache()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': total,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(total / elapsed) if elapsed else total,
+    }
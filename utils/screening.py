@@ -0,0 +1,262 @@
+"""Offline bulk screening: every resume in a directory against one or more job descriptions.
+
+Each resume file is one task for a process pool. The worker extracts the
+text once and runs the analyzer chain against every job description. As
+tasks finish, the parent writes their rows as CSV or NDJSON and, with
+`save`, stores them in the history through import_history_records, one
+transaction per batch. After each batch it appends the finished files to a
+checkpoint next to the output. A rerun with the same output skips those
+files, so an interrupted run picks up where it stopped and redoes at most
+the batch in flight. The checkpoint records which job descriptions it was
+made for, and resuming with different ones is refused.
+
+Workers share nothing and send back only small result dicts, so throughput
+grows with the number of processes until the cores run out. Each process
+gets `cores // workers` native math threads, so they do not oversubscribe
+the CPU. Batch runs have no time budget unless one is given.
+"""
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils import native_threads, resume_db
+from utils.parser import get_analysis_text, truncate_text
+from utils.pipeline import Budget, analyze_texts
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+CSV_FIELDS = ('resume', 'job_description', 'score', 'ats_score', 'health_score', 'keyword_coverage',
+              'missing_skills', 'degraded', 'input_truncated', 'error')
+PROGRESS_EVERY_SECONDS = 5
+_CHECKPOINT_HEADER = '# job descriptions '
+
+class CheckpointError(ValueError):
+    pass
+
+def find_resumes(directory):
+    """Paths of every PDF/DOCX under the directory, relative to it, in a stable order."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return found
+
+def load_job_descriptions(paths):
+    """Read job description text files; returns [(name, text)], named after the file."""
+    jds = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if len(text.strip()) < 20:
+            raise ValueError(f"{path}: job description is empty or too short")
+        jds.append((os.path.splitext(os.path.basename(path))[0], text))
+    names = [name for name, _ in jds]
+    if len(set(names)) != len(names):
+        raise ValueError("job description file names must be unique")
+    return jds
+
+def jobs_signature(jds):
+    digest = hashlib.sha256()
+    for name, text in jds:
+        digest.update(name.encode('utf-8') + b'\0' + text.encode('utf-8') + b'\0')
+    return digest.hexdigest()[:16]
+
+def read_checkpoint(path, signature):
+    """Resume paths already finished by an earlier run with the same job descriptions."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return set()
+    if lines and lines[0] != _CHECKPOINT_HEADER + signature:
+        raise CheckpointError(f"{path} was written for other job descriptions; pass a new output or --restart")
+    return set(lines[1:])
+
+# Set in each pool process by _init_worker
+_jds = ()
+_time_budget_ms = 0
+_keep_records = False
+
+def _init_worker(jds, time_budget_ms, keep_records):
+    global _jds, _time_budget_ms, _keep_records
+    _jds, _time_budget_ms, _keep_records = jds, time_budget_ms, keep_records
+    native_threads.apply_worker_budget()
+
+def _row(resume, jd_name, results=None, error=None):
+    results = results or {}
+    return {
+        'resume': resume,
+        'job_description': jd_name,
+        'score': results.get('score'),
+        'ats_score': results.get('ats_score'),
+        'health_score': results.get('health_score'),
+        'keyword_coverage': (results.get('keyword_coverage') or {}).get('coverage'),
+        'missing_skills': sorted(results.get('missing_skills') or []),
+        'degraded': sorted(results.get('degraded') or {}),
+        'input_truncated': results.get('input_truncated'),
+        'error': error,
+    }
+
+def screen_resume(directory, resume):
+    """Analyze one resume against every job description; runs in a pool process.
+
+    Returns (resume, rows, history records). Records are only built when
+    the run saves to the history, to keep resume text off the pipe otherwise.
+    """
+    try:
+        resume_text, truncated = get_analysis_text(os.path.join(directory, resume))
+    except Exception as e:
+        resume_text, truncated, error = '', False, f"could not read the file: {e}"
+    else:
+        error = None if resume_text else "could not extract text from the resume"
+    if error:
+        return resume, [_row(resume, name, error=error) for name, _ in _jds], []
+
+    rows, records = [], []
+    for name, jd_text in _jds:
+        jd_text, jd_truncated = truncate_text(jd_text)
+        try:
+            with native_threads.limited():
+                results = analyze_texts(resume_text, jd_text, os.path.basename(resume), Budget(total_ms=_time_budget_ms))
+        except Exception as e:
+            # One bad pair is a row with an error, not the end of the run
+            rows.append(_row(resume, name, error=f"analysis failed: {type(e).__name__}: {e}"))
+            continue
+        results['input_truncated'] = truncated or jd_truncated
+        rows.append(_row(resume, name, results))
+        if _keep_records:
+            records.append({
+                'filename': os.path.basename(resume),
+                'score': results['score'],
+                'ats_score': results['ats_score'],
+                'health_score': results['health_score'],
+                'missing_skills': results['missing_skills'],
+                'results': results,
+                'resume_text': resume_text,
+            })
+    return resume, rows, records
+
+class _Writer:
+    """Appends rows as CSV or NDJSON and makes them durable before the checkpoint moves on."""
+
+    def __init__(self, path, fmt):
+        self.file = open(path, 'a', encoding='utf-8', newline='')
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            if self.file.tell() == 0:
+                self.csv.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            self.csv.writerow(dict(row, missing_skills=';'.join(row['missing_skills']), degraded=';'.join(row['degraded'])))
+        else:
+            self.file.write(json.dumps(row) + '\n')
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+def run(resume_dir, jd_paths, output, fmt=None, workers=None, save=False, batch_size=100,
+        time_budget_ms=0, checkpoint=None, restart=False, log=sys.stderr):
+    """Screen every resume in resume_dir against the job descriptions; returns run statistics."""
+    jds = load_job_descriptions(jd_paths)
+    fmt = fmt or ('csv' if output.lower().endswith('.csv') else 'ndjson')
+    checkpoint = checkpoint or output + '.checkpoint'
+    workers = max(1, workers or native_threads.available_cores())
+    if restart:
+        for path in (output, checkpoint):
+            if os.path.exists(path):
+                os.remove(path)
+
+    signature = jobs_signature(jds)
+    done = read_checkpoint(checkpoint, signature)
+    todo = [resume for resume in find_resumes(resume_dir) if resume not in done]
+    stats = {'resumes': 0, 'rows': 0, 'errors': 0, 'saved': 0, 'skipped': len(done)}
+    started = last_progress = time.perf_counter()
+
+    # Spawned processes read these before numpy loads; each gets its share of the cores
+    os.environ['WEB_CONCURRENCY'] = str(workers)
+    native_threads.export_env_defaults()
+
+    writer = _Writer(output, fmt)
+    marks = open(checkpoint, 'a', encoding='utf-8')
+    batch = []
+
+    def flush():
+        """Save, write and fsync a batch, and only then mark its files finished."""
+        records = [record for _, _, file_records in batch for record in file_records]
+        if records:
+            resume_db.import_history_records(records, batch_size=len(records))
+            stats['saved'] += len(records)
+        for _, rows, _ in batch:
+            for row in rows:
+                writer.write(row)
+                stats['rows'] += 1
+                stats['errors'] += row['error'] is not None
+        writer.sync()
+        for resume, _, _ in batch:
+            marks.write(resume + '\n')
+        marks.flush()
+        os.fsync(marks.fileno())
+        stats['resumes'] += len(batch)
+        batch.clear()
+
+    try:
+        if marks.tell() == 0:
+            marks.write(_CHECKPOINT_HEADER + signature + '\n')
+        if not todo:
+            return dict(stats, seconds=0.0, resumes_per_sec=0)
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # spawn, not fork: children start clean, without the parent's open files and SQLite handles
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(jds, time_budget_ms, save),
+        )
+        with pool:
+            pending = set()
+            queued = iter(todo)
+            window = workers * 4
+            try:
+                while True:
+                    for resume in queued:
+                        pending.add(pool.submit(screen_resume, resume_dir, resume))
+                        if len(pending) >= window:
+                            break
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    errors = [future.exception() for future in finished if future.exception()]
+                    batch.extend(future.result() for future in finished if not future.exception())
+                    if errors:
+                        raise errors[0]
+                    if len(batch) >= batch_size:
+                        flush()
+                    now = time.perf_counter()
+                    if log and now - last_progress >= PROGRESS_EVERY_SECONDS:
+                        last_progress = now
+                        finished_count = stats['resumes'] + len(batch)
+                        print(f"{finished_count}/{len(todo)} resumes, {finished_count / (now - started):.1f}/s",
+                              file=log)
+            except BaseException:
+                # Interrupted or a worker died: keep what already finished; the rerun starts after it
+                pool.shutdown(wait=False, cancel_futures=True)
+                flush()
+                raise
+        flush()
+    finally:
+        writer.close()
+        marks.close()
+
+    elapsed = time.perf_counter() - started
+    return dict(stats, seconds=round(elapsed, 3), resumes_per_sec=round(stats['resumes'] / elapsed, 2))
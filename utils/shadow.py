@@ -0,0 +1,317 @@
+"""Shadow-mode comparison of candidate analyzer engines against the live ones.
+
+A candidate engine is a module that defines any of `calculate_similarity`,
+`calculate_keyword_coverage` and `identify_missing_skills` with the same
+signatures as utils.analyzer. Set SHADOW_ENGINE to its dotted module path
+(or to a built-in name from ENGINES) and SHADOW_SAMPLE_RATE to the fraction
+of freshly analyzed uploads to compare. Users always get the live engine's
+results. A sampled analysis hands its texts to a single background thread
+once the response is ready. There, the live function and the candidate run
+back to back on the same full texts, taking turns to go first. Their
+latencies are therefore measured under the same conditions, and a
+time-budget cut on the request cannot show up as a difference.
+
+Each compared function gets one row in a SQLite table next to the history
+database. The row holds:
+- both values (the score, the coverage percent, the number of missing
+  skills) and their delta;
+- the items only one side found;
+- both latencies, or the candidate's error.
+`summary()` aggregates the rows per engine and function in SQL, over the
+last SHADOW_SUMMARY_DAYS days by default.
+
+At most MAX_PENDING comparisons wait at a time. Beyond that, new samples are
+dropped and counted, so a slow candidate cannot build up a backlog or hold
+the CPU for long after the traffic that caused it.
+"""
+import functools
+import importlib
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from utils import analyzer, native_threads, resume_db, skills_kb
+
+SAMPLE_RATE = float(os.environ.get('SHADOW_SAMPLE_RATE', 0))
+ENGINE = os.environ.get('SHADOW_ENGINE', '')
+SHADOW_DB_PATH = os.environ.get('SHADOW_DB_PATH')
+MAX_PENDING = int(os.environ.get('SHADOW_MAX_PENDING', 4))
+MAX_ROWS = int(os.environ.get('SHADOW_MAX_ROWS', 100000))
+SUMMARY_DAYS = int(os.environ.get('SHADOW_SUMMARY_DAYS', 7))  # Default report window; 0 reports every kept row
+FUNCTIONS = ('calculate_similarity', 'calculate_keyword_coverage', 'identify_missing_skills')
+# Built-in candidates, by name
+ENGINES = {
+    # The cheap similarity variant the time budget falls back to: is it close enough to run by default?
+    'plain': SimpleNamespace(calculate_similarity=functools.partial(analyzer.calculate_similarity, lemmatize=False)),
+}
+
+_executor = None
+_engines = {}
+_pending = 0
+_counts = {'sampled': 0, 'dropped': 0, 'failed': 0}
+_lock = threading.Lock()
+# Which side runs first alternates, so warm caches favour neither on average
+_live_first = itertools.cycle((True, False))
+
+def db_path():
+    # Next to the history database by default, like the page cache
+    return SHADOW_DB_PATH or os.path.splitext(resume_db.DB_PATH)[0] + '.shadow.db'
+
+def _connect():
+    conn = sqlite3.connect(db_path(), timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shadow_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL,
+            engine TEXT NOT NULL,
+            function TEXT NOT NULL,
+            analysis_id INTEGER,
+            chars INTEGER NOT NULL,
+            live_value REAL,
+            candidate_value REAL,
+            delta REAL,
+            only_live TEXT,
+            only_candidate TEXT,
+            live_ms REAL,
+            candidate_ms REAL,
+            error TEXT
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_shadow_runs_engine ON shadow_runs (engine, function, created_at)')
+    return conn
+
+def load_engine(name):
+    """The candidate module (or built-in) called `name`; it must define at least one of FUNCTIONS."""
+    if name not in _engines:
+        engine = ENGINES[name] if name in ENGINES else importlib.import_module(name)
+        if not any(callable(getattr(engine, function, None)) for function in FUNCTIONS):
+            raise ValueError(f"shadow engine {name} defines none of {', '.join(FUNCTIONS)}")
+        _engines[name] = engine
+    return _engines[name]
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    with native_threads.limited():
+        output = func(*args)
+    return output, round((time.perf_counter() - started) * 1000, 2)
+
+def _compare(function, live, candidate):
+    """(live value, candidate value, only live, only candidate) for one function's outputs."""
+    if function == 'calculate_similarity':
+        return float(live), float(candidate), set(), set()
+    if function == 'calculate_keyword_coverage':
+        live_matched, candidate_matched = set(live['matched']), set(candidate['matched'])
+        return live['coverage'], candidate['coverage'], live_matched - candidate_matched, candidate_matched - live_matched
+    live, candidate = set(live), set(candidate)
+    return len(live), len(candidate), live - candidate, candidate - live
+
+def compare(engine_name, resume_text, jd_text, analysis_id=None):
+    """Run the live and candidate engines on the same texts and record one row per function; returns the rows."""
+    engine = load_engine(engine_name)
+    kb = skills_kb.current()  # Both sides detect skills against the same snapshot
+    rows = []
+    for function in FUNCTIONS:
+        candidate_func = getattr(engine, function, None)
+        if not callable(candidate_func):
+            continue
+        args = (resume_text, jd_text, kb) if function == 'identify_missing_skills' else (resume_text, jd_text)
+        live_first = next(_live_first)
+        if live_first:
+            live, live_ms = _timed(getattr(analyzer, function), *args)
+        row = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'engine': engine_name,
+            'function': function,
+            'analysis_id': analysis_id,
+            'chars': len(resume_text) + len(jd_text),
+            'live_value': None, 'candidate_value': None, 'delta': None,
+            'only_live': None, 'only_candidate': None,
+            'live_ms': None, 'candidate_ms': None, 'error': None,
+        }
+        try:
+            candidate, row['candidate_ms'] = _timed(candidate_func, *args)
+        except Exception as e:
+            row['error'] = f"{type(e).__name__}: {e}"
+        if not live_first:
+            live, live_ms = _timed(getattr(analyzer, function), *args)
+        row['live_ms'] = live_ms
+        if row['error']:
+            row['live_value'] = _compare(function, live, live)[0]
+        else:
+            live_value, candidate_value, only_live, only_candidate = _compare(function, live, candidate)
+            row.update(
+                live_value=live_value,
+                candidate_value=candidate_value,
+                # Rounded so float noise in an otherwise identical score does not count as a change
+                delta=round(candidate_value - live_value, 6),
+                only_live=json.dumps(sorted(only_live)),
+                only_candidate=json.dumps(sorted(only_candidate)),
+            )
+        rows.append(row)
+
+    conn = _connect()
+    columns = list(rows[0])
+    conn.executemany(
+        f"INSERT INTO shadow_runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [tuple(row[column] for column in columns) for row in rows],
+    )
+    if MAX_ROWS:
+        last_id = conn.execute('SELECT MAX(id) FROM shadow_runs').fetchone()[0]
+        conn.execute('DELETE FROM shadow_runs WHERE id <= ?', (last_id - MAX_ROWS,))
+    conn.commit()
+    conn.close()
+    return rows
+
+def _run(engine_name, resume_text, jd_text, analysis_id):
+    global _pending
+    try:
+        return compare(engine_name, resume_text, jd_text, analysis_id)
+    except Exception as e:
+        with _lock:
+            _counts['failed'] += 1
+        print(f"Warning: shadow comparison with {engine_name} failed: {e}")
+        return []
+    finally:
+        with _lock:
+            _pending -= 1
+
+def maybe_compare(resume_text, jd_text, analysis_id=None):
+    """Sample a fresh analysis for comparison in the background; returns the Future, or None if not sampled."""
+    global _executor, _pending
+    if not ENGINE or random.random() >= SAMPLE_RATE:
+        return None
+    with _lock:
+        if _pending >= MAX_PENDING:
+            _counts['dropped'] += 1
+            return None
+        _pending += 1
+        _counts['sampled'] += 1
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-compare')
+    return _executor.submit(_run, ENGINE, resume_text, jd_text, analysis_id)
+
+def _window(engine, days):
+    """WHERE clause and parameters for one engine (or all) over the last `days` days (0: all rows)."""
+    where, params = [], []
+    if engine:
+        where.append('engine = ?')
+        params.append(engine)
+    if days:
+        where.append('created_at >= ?')
+        params.append((datetime.now() - timedelta(days=days)).isoformat(timespec='seconds'))
+    return where, params
+
+def _percentiles(conn, column, where, params):
+    """{(engine, function): (p50, p95)} of a latency column, picked out by SQLite rather than sorted here."""
+    where = ' AND '.join(where + [f'{column} IS NOT NULL'])
+    return {
+        (engine, function): (p50, p95)
+        for engine, function, p50, p95 in conn.execute(
+            f'''
+            WITH ranked AS (
+                SELECT engine, function, {column} AS ms,
+                       ROW_NUMBER() OVER (PARTITION BY engine, function ORDER BY {column}) - 1 AS i,
+                       COUNT(*) OVER (PARTITION BY engine, function) AS n
+                FROM shadow_runs WHERE {where}
+            )
+            SELECT engine, function,
+                   MAX(CASE WHEN i = MIN(CAST(n * 0.5 AS INTEGER), n - 1) THEN ms END),
+                   MAX(CASE WHEN i = MIN(CAST(n * 0.95 AS INTEGER), n - 1) THEN ms END)
+            FROM ranked GROUP BY engine, function
+            ''',
+            params,
+        )
+    }
+
+def _top_items(conn, column, where, params, top):
+    """{(engine, function): [(item, count), …]}, the `top` items most often in a JSON list column."""
+    where = ' AND '.join(where + ['error IS NULL'])
+    items = {}
+    for engine, function, item, count in conn.execute(
+        f'''
+        WITH counted AS (
+            SELECT engine, function, json_each.value AS item, COUNT(*) AS count
+            FROM shadow_runs, json_each(shadow_runs.{column})
+            WHERE {where} GROUP BY engine, function, item
+        )
+        SELECT engine, function, item, count FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY engine, function ORDER BY count DESC, item) AS rank FROM counted
+        ) WHERE rank <= ? ORDER BY engine, function, rank
+        ''',
+        params + [top],
+    ):
+        items.setdefault((engine, function), []).append((item, count))
+    return items
+
+def summary(engine=None, days=None, top=5):
+    """Per engine and function: how often the candidate disagreed, by how much, and how fast each side was.
+
+    Covers the last SUMMARY_DAYS days unless `days` is given (0 for every
+    kept row). The counts, deltas, percentiles and top items are all
+    computed by SQLite, so no comparison rows are loaded into Python.
+    """
+    if not os.path.exists(db_path()):
+        return []
+    where, params = _window(engine, SUMMARY_DAYS if days is None else days)
+    conn = _connect()
+    try:
+        groups = conn.execute(
+            '''
+            SELECT engine, function, COUNT(*), COUNT(error),
+                   SUM(error IS NULL AND (delta != 0 OR only_live != '[]' OR only_candidate != '[]')),
+                   AVG(ABS(delta)), MAX(ABS(delta))
+            FROM shadow_runs''' + (f" WHERE {' AND '.join(where)}" if where else '') + '''
+            GROUP BY engine, function ORDER BY engine, function
+            ''',
+            params,
+        ).fetchall()
+        live_ms = _percentiles(conn, 'live_ms', where, params)
+        # Failed runs have no candidate latency, so only successful ones count
+        candidate_ms = _percentiles(conn, 'candidate_ms', where, params)
+        only_live = _top_items(conn, 'only_live', where, params, top)
+        only_candidate = _top_items(conn, 'only_candidate', where, params, top)
+    finally:
+        conn.close()
+
+    report = []
+    for engine_name, function, runs, errors, changed, mean_delta, max_delta in groups:
+        key = (engine_name, function)
+        ok = runs - errors
+        live_p50, live_p95 = live_ms.get(key, (None, None))
+        candidate_p50, candidate_p95 = candidate_ms.get(key, (None, None))
+        report.append({
+            'engine': engine_name,
+            'function': function,
+            'runs': runs,
+            'errors': errors,
+            'changed': changed,
+            'changed_pct': round(changed / ok * 100, 1) if ok else None,
+            'mean_abs_delta': round(mean_delta, 4) if mean_delta is not None else None,
+            'max_abs_delta': round(max_delta, 4) if max_delta is not None else None,
+            'live_ms': {'p50': live_p50, 'p95': live_p95},
+            'candidate_ms': {'p50': candidate_p50, 'p95': candidate_p95},
+            'speedup': round(live_p50 / candidate_p50, 2) if live_p50 and candidate_p50 else None,
+            'top_only_live': only_live.get(key, []),
+            'top_only_candidate': only_candidate.get(key, []),
+        })
+    return report
+
+def stats():
+    with _lock:
+        return dict(_counts, engine=ENGINE or None, sample_rate=SAMPLE_RATE, pending=_pending)
+
+def _reset_after_fork():
+    # The executor's thread does not survive fork; a preforked worker starts its own
+    global _executor, _pending
+    _executor = None
+    _pending = 0
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,160 @@
+"""Skill knowledge base: the skills we detect and the advice we give for each.
+
+The entries live in a JSON file (data/skills_kb.json, or SKILLS_KB_PATH):
+
+    {"version": 2,
+     "skills": {"kubernetes": {"aliases": ["k8s"], "tips": "...",
+                               "resources": ["..."], "interview": "...",
+                               "roadmap": ["..."]}}}
+
+Loading validates the file (including duplicate keys, which plain JSON
+parsing would silently collapse) and builds an immutable Snapshot: the
+entries, an alias -> canonical index and one compiled regex matching every
+name and alias. `current()` re-checks the file at most every
+SKILLS_KB_CHECK_SECONDS and swaps a new snapshot in with a single
+assignment. Callers take one snapshot per analysis, so a reload mid-request
+never mixes two versions. A file that fails validation is reported and
+ignored, and the previous snapshot stays in service.
+
+`version` is SKILL_DB_VERSION: stored analyses and exact-match reuse are
+keyed on it, so bump it whenever detection or advice changes.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+KB_PATH = os.environ.get('SKILLS_KB_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'skills_kb.json'
+)
+CHECK_INTERVAL_SECONDS = float(os.environ.get('SKILLS_KB_CHECK_SECONDS', 2))
+REQUIRED_FIELDS = ('tips', 'resources', 'interview')
+# Characters that continue a skill name, so "java" does not match inside "javascript" and "c" not inside "c++"
+_NAME_CHARS = r'\w+#'
+
+class KnowledgeBaseError(ValueError):
+    pass
+
+class Snapshot:
+    """One loaded, validated version of the knowledge base. Never mutated after construction."""
+    __slots__ = ('version', 'skills', 'aliases', 'matcher', 'signature', 'loaded_at')
+
+    def __init__(self, version, skills, aliases, signature=None):
+        self.version = version
+        self.skills = skills
+        self.aliases = aliases
+        self.signature = signature
+        self.loaded_at = time.time()
+        # Longest names first, so "machine learning" wins over a shorter name starting at the same place
+        terms = sorted(aliases, key=len, reverse=True)
+        alternatives = '|'.join(re.escape(term).replace(r'\ ', r'\s+') for term in terms) or r'(?!)'
+        # The lookahead keeps matches overlapping: every position can start a skill
+        self.matcher = re.compile(rf'(?<![{_NAME_CHARS}])(?=({alternatives})(?![{_NAME_CHARS}]))')
+
+    def find(self, text):
+        """Canonical names of every skill mentioned in the text."""
+        return {
+            self.aliases[_normalize(match.group(1))]
+            for match in self.matcher.finditer((text or '').lower())
+        }
+
+    def summary(self):
+        return {'version': self.version, 'skills': len(self.skills), 'aliases': len(self.aliases) - len(self.skills),
+                'loaded_at': self.loaded_at}
+
+def _normalize(name):
+    return ' '.join(name.lower().split())
+
+def _reject_duplicates(pairs):
+    seen = set()
+    for key, _ in pairs:
+        if key in seen:
+            raise KnowledgeBaseError(f"duplicate key {key!r}")
+        seen.add(key)
+    return dict(pairs)
+
+def parse(raw, signature=None):
+    """Validate knowledge-base JSON text and build a Snapshot; raises KnowledgeBaseError."""
+    try:
+        data = json.loads(raw, object_pairs_hook=_reject_duplicates)
+    except json.JSONDecodeError as e:
+        raise KnowledgeBaseError(f"invalid JSON: {e}") from None
+    version = data.get('version') if isinstance(data, dict) else None
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        raise KnowledgeBaseError("'version' must be a positive integer")
+    entries = data.get('skills')
+    if not isinstance(entries, dict) or not entries:
+        raise KnowledgeBaseError("'skills' must be a non-empty object")
+
+    skills, aliases = {}, {}
+    for name, entry in entries.items():
+        canonical = _normalize(name)
+        if canonical != name or not canonical:
+            raise KnowledgeBaseError(f"skill {name!r} must be lower case with single spaces")
+        if not isinstance(entry, dict):
+            raise KnowledgeBaseError(f"skill {name!r} must be an object")
+        for field in REQUIRED_FIELDS:
+            if field not in entry:
+                raise KnowledgeBaseError(f"skill {name!r} is missing {field!r}")
+        if not isinstance(entry['tips'], str) or not isinstance(entry['interview'], str):
+            raise KnowledgeBaseError(f"skill {name!r}: 'tips' and 'interview' must be strings")
+        for field in ('resources', 'roadmap', 'aliases'):
+            value = entry.get(field, [])
+            if not isinstance(value, list) or not all(isinstance(item, str) and item.strip() for item in value):
+                raise KnowledgeBaseError(f"skill {name!r}: {field!r} must be a list of strings")
+        for term in [canonical] + [_normalize(alias) for alias in entry.get('aliases', [])]:
+            if term in aliases:
+                raise KnowledgeBaseError(f"{term!r} is used by both {aliases[term]!r} and {canonical!r}")
+            aliases[term] = canonical
+        skills[canonical] = {field: value for field, value in entry.items() if field != 'aliases'}
+    return Snapshot(version, skills, aliases, signature)
+
+def _signature(path):
+    stat = os.stat(path)
+    # Inode too: editors and deploys usually replace the file by renaming a new one over it
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def load(path=None):
+    path = path or KB_PATH
+    signature = _signature(path)
+    with open(path, encoding='utf-8') as f:
+        return parse(f.read(), signature)
+
+_snapshot = None
+_rejected = None
+_next_check = 0.0
+_reload_lock = threading.Lock()
+
+def current():
+    """The knowledge base in service; hold on to the result for the rest of the analysis."""
+    if _snapshot is None or time.monotonic() >= _next_check:
+        reload()
+    return _snapshot
+
+def reload(force=False):
+    """Load the file again if it changed; returns True if a new snapshot was swapped in."""
+    global _snapshot, _rejected, _next_check
+    # One thread checks the file; the others keep using the snapshot they already have
+    if not _reload_lock.acquire(blocking=_snapshot is None):
+        return False
+    try:
+        _next_check = time.monotonic() + CHECK_INTERVAL_SECONDS
+        signature = None
+        try:
+            signature = _signature(KB_PATH)
+            if not force and _snapshot is not None and signature in (_snapshot.signature, _rejected):
+                return False
+            snapshot = load(KB_PATH)
+        except (OSError, KnowledgeBaseError) as e:
+            if _snapshot is None:
+                raise
+            # Warn once per bad file, not on every check
+            if (signature or str(e)) != _rejected:
+                print(f"Warning: keeping skills knowledge base v{_snapshot.version}; {KB_PATH}: {e}")
+                _rejected = signature or str(e)
+            return False
+        _snapshot, _rejected = snapshot, None
+        return True
+    finally:
+        _reload_lock.release()
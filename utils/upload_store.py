@@ -0,0 +1,146 @@
+"""Content-addressed store for uploaded resumes.
+
+Each upload is saved once per SHA-256 of its bytes, as
+<store>/ab/cd/abcd….pdf, next to the history database rather than under
+the publicly served static/ folder. The same resume uploaded twice
+shares one file, and user-chosen names can neither collide nor overwrite
+each other. The two levels of 256 shards keep every directory small.
+
+The upload_blobs table in the history database tracks each file's size,
+when it was last used, and how many history rows were analyzed from it.
+save_analysis() and row deletion update that count in the same
+transaction as the row itself. `collect()` runs after every upload and in
+the scheduled maintenance. It keeps disk use bounded without scanning a
+directory:
+- Files no row refers to are deleted once they have been idle for
+  UPLOAD_GRACE_MINUTES, the time an upload is allowed to wait for its
+  analysis. An upload parked for /analyze/stream counts as referenced
+  until its job is claimed or expires.
+- If the store is still over UPLOAD_QUOTA_MB, the least recently used
+  files are evicted until it fits. Their history rows and results stay.
+  Only the original file is gone, and uploading it again restores it.
+Files used within the grace period or held by a pending job are never
+removed. So the quota can be exceeded briefly, by at most the uploads of
+the last few minutes.
+
+Writes and removals happen under the database's write lock, so a file
+cannot be evicted while an identical upload is claiming it.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from utils import resume_db
+
+UPLOAD_STORE_DIR = os.environ.get('UPLOAD_FOLDER')
+QUOTA_BYTES = int(float(os.environ.get('UPLOAD_QUOTA_MB', 1024)) * 1024 * 1024)  # 0 disables the quota
+GRACE_MINUTES = float(os.environ.get('UPLOAD_GRACE_MINUTES', 10))
+CHUNK_SIZE = 1 << 16
+
+def store_dir():
+    # Next to the history database by default, so each database has its own store
+    return UPLOAD_STORE_DIR or os.path.splitext(resume_db.DB_PATH)[0] + '.uploads'
+
+def blob_path(sha256, extension):
+    return os.path.join(store_dir(), sha256[:2], sha256[2:4], sha256 + extension)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def put(stream, extension):
+    """Store an upload read from a binary stream; returns (sha256, path).
+
+    The content is hashed while it is copied to a temporary file, so large
+    uploads are never held in memory. If the store already has the
+    content, the copy is dropped and the stored file is used, under the
+    extension it was first stored with.
+    """
+    directory = store_dir()
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    tmp = os.path.join(directory, f"incoming-{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        now = datetime.now().isoformat(timespec='seconds')
+        conn = sqlite3.connect(resume_db.DB_PATH, timeout=30)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT extension, present FROM upload_blobs WHERE sha256 = ?', (sha256,)).fetchone()
+            extension = row[0] if row else extension.lower()
+            path = blob_path(sha256, extension)
+            if not (row and row[1] and os.path.exists(path)):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+            conn.execute(
+                '''
+                INSERT INTO upload_blobs (sha256, extension, size, present, last_used) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (sha256) DO UPDATE SET present = 1, last_used = excluded.last_used
+                ''',
+                (sha256, extension, size, now),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    finally:
+        _remove(tmp)
+    collect()
+    return sha256, path
+
+def collect(quota_bytes=None, grace_minutes=None):
+    """Delete unreferenced uploads past the grace period, then evict the least recently used down to the quota."""
+    quota_bytes = QUOTA_BYTES if quota_bytes is None else quota_bytes
+    grace_minutes = GRACE_MINUTES if grace_minutes is None else grace_minutes
+    cutoff = (datetime.now() - timedelta(minutes=grace_minutes)).isoformat(timespec='seconds')
+    conn = sqlite3.connect(resume_db.DB_PATH, timeout=30)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        # A streamed upload waits in analysis_jobs for up to ANALYSIS_JOB_TTL_MINUTES, longer than the grace period
+        job_cutoff = (datetime.now() - timedelta(minutes=resume_db.ANALYSIS_JOB_TTL_MINUTES)).isoformat(timespec='seconds')
+        pending = 'sha256 NOT IN (SELECT upload_sha256 FROM analysis_jobs WHERE upload_sha256 IS NOT NULL AND created_at >= ?)'
+        orphans = conn.execute(
+            f'SELECT sha256, extension, present FROM upload_blobs WHERE refcount <= 0 AND last_used < ? AND {pending}',
+            (cutoff, job_cutoff),
+        ).fetchall()
+        for sha256, extension, present in orphans:
+            if present:
+                _remove(blob_path(sha256, extension))
+        conn.executemany('DELETE FROM upload_blobs WHERE sha256 = ?', [(sha256,) for sha256, _, _ in orphans])
+
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM upload_blobs WHERE present = 1').fetchone()[0]
+        evicted = []
+        if quota_bytes and total > quota_bytes:
+            for sha256, extension, size in conn.execute(
+                f'SELECT sha256, extension, size FROM upload_blobs WHERE present = 1 AND last_used < ? AND {pending}'
+                ' ORDER BY last_used, sha256',
+                (cutoff, job_cutoff),
+            ).fetchall():
+                if total <= quota_bytes:
+                    break
+                _remove(blob_path(sha256, extension))
+                evicted.append((sha256,))
+                total -= size
+            # The row stays: history rows still count on it, and a re-upload brings the file back
+            conn.executemany('UPDATE upload_blobs SET present = 0 WHERE sha256 = ?', evicted)
+        conn.commit()
+    finally:
+        conn.close()
+    return {'removed': sum(1 for _, _, present in orphans if present), 'evicted': len(evicted), 'bytes': total}
+
+def stats():
+    conn = sqlite3.connect(resume_db.DB_PATH)
+    files, size, references = conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refcount), 0) FROM upload_blobs WHERE present = 1'
+    ).fetchone()
+    conn.close()
+    return {'directory': store_dir(), 'files': files, 'bytes': size, 'references': references, 'quota_bytes': QUOTA_BYTES}